@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+렌더링 요청 수용 제어 - 전역 동시 렌더링 상한 + 출처(Origin/API 키)별 토큰 버킷
+"""
+
+import hashlib
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import metrics
+
+class AdmissionRejected(Exception):
+    """요청 거절 (429 속도 제한 / 503 과부하)"""
+
+    def __init__(self, status_code, message, retry_after):
+        Exception.__init__(self, message)
+        self.status_code = status_code
+        self.retry_after = max(1, int(math.ceil(retry_after)))
+
+class TokenBucket:
+    """초당 rate개씩 채워지고 최대 burst개까지 쌓이는 토큰 버킷"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_take(self, now):
+        """토큰 하나 소비, 부족하면 다음 토큰까지 남은 초 반환"""
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    def is_full(self, now):
+        self._refill(now)
+        return self.tokens >= self.burst
+
+class AdmissionController:
+    """전역 동시 렌더링 상한과 클라이언트별 속도 제한"""
+
+    # 버킷이 이 수를 넘으면 가득 찬(유휴) 버킷을 정리
+    MAX_BUCKETS = 10000
+
+    def __init__(self, max_concurrent, max_queued, queue_timeout, rate_per_minute, burst):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._active = 0
+        self._queued = 0
+        self._avg_render_seconds = 1.0
+        self.draining = False
+
+    @classmethod
+    def from_env(cls):
+        """환경 변수로 설정"""
+        max_concurrent = int(os.environ.get('PDF_MAX_CONCURRENT_RENDERS', os.cpu_count() or 2))
+        return cls(
+            max_concurrent=max_concurrent,
+            max_queued=int(os.environ.get('PDF_MAX_QUEUED_RENDERS', max_concurrent * 2)),
+            queue_timeout=float(os.environ.get('PDF_RENDER_QUEUE_TIMEOUT', 5)),
+            rate_per_minute=float(os.environ.get('PDF_RATE_LIMIT_PER_MINUTE', 30)),
+            burst=float(os.environ.get('PDF_RATE_LIMIT_BURST', 10))
+        )
+
+    def check_rate(self, client_key):
+        """클라이언트 토큰 소비 (부족하면 AdmissionRejected 429, 분당 한도가 0 이하면 제한 없음)"""
+        if self.rate <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(client_key)
+            if bucket is None:
+                if len(self._buckets) >= self.MAX_BUCKETS:
+                    self._prune(now)
+                bucket = self._buckets[client_key] = TokenBucket(self.rate, self.burst)
+            wait = bucket.try_take(now)
+
+        if wait:
+            metrics.increment('admission.rejected_rate_limited')
+            raise AdmissionRejected(429, '요청이 너무 많습니다. 잠시 후 다시 시도해주세요.', wait)
+
+    def _prune(self, now):
+        for key in [k for k, b in self._buckets.items() if b.is_full(now)]:
+            del self._buckets[key]
+
+    def start_draining(self):
+        """새 렌더링 수용 중단 (워커 재시작 전)"""
+        with self._lock:
+            self.draining = True
+
+    def is_idle(self):
+        """처리 중이거나 대기 중인 렌더링이 없는지"""
+        with self._lock:
+            return self._active == 0 and self._queued == 0
+
+    @contextmanager
+    def render_slot(self):
+        """렌더링 슬롯 확보 (대기열이 가득 차거나 시간 초과 시 AdmissionRejected 503)"""
+        with self._lock:
+            if self.draining:
+                metrics.increment('admission.rejected_draining')
+                raise AdmissionRejected(503, '서버가 재시작 중입니다. 잠시 후 다시 시도해주세요.', self._retry_after())
+            if self._queued >= self.max_queued:
+                metrics.increment('admission.rejected_overloaded')
+                raise AdmissionRejected(503, '서버가 혼잡합니다. 잠시 후 다시 시도해주세요.', self._retry_after())
+            self._queued += 1
+            self._update_gauges()
+
+        acquired = self._slots.acquire(timeout=self.queue_timeout)
+
+        with self._lock:
+            self._queued -= 1
+            if acquired:
+                self._active += 1
+            self._update_gauges()
+
+        if not acquired:
+            metrics.increment('admission.rejected_overloaded')
+            raise AdmissionRejected(503, '서버가 혼잡합니다. 잠시 후 다시 시도해주세요.', self._retry_after())
+
+        metrics.increment('admission.admitted')
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - start
+            with self._lock:
+                self._active -= 1
+                self._avg_render_seconds = 0.8 * self._avg_render_seconds + 0.2 * elapsed
+                self._update_gauges()
+            self._slots.release()
+
+    def load(self):
+        """현재 부하: (대기 중, 처리 중, 평균 렌더링 초)"""
+        with self._lock:
+            return self._queued, self._active, self._avg_render_seconds
+
+    def _retry_after(self):
+        # 대기열이 한 번 빠지는 데 걸리는 대략적인 시간
+        return self._avg_render_seconds * (1 + self._queued / self.max_concurrent)
+
+    def _update_gauges(self):
+        metrics.set_gauge('admission.active_renders', self._active)
+        metrics.set_gauge('admission.queued_renders', self._queued)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'active': self._active,
+                'queued': self._queued,
+                'max_concurrent': self.max_concurrent,
+                'max_queued': self.max_queued,
+                'rate_per_minute': self.rate * 60,
+                'burst': self.burst,
+                'avg_render_seconds': round(self._avg_render_seconds, 3),
+                'tracked_clients': len(self._buckets),
+                'draining': self.draining
+            }
+
+def _key_digest(api_key):
+    return hashlib.sha256(api_key.encode('utf-8')).hexdigest()
+
+# 속도 제한 단위로 인정하는 API 키 (PDF_RATE_LIMIT_API_KEYS, 쉼표 구분) - 해시로만 보관
+RATE_LIMIT_API_KEYS = frozenset(
+    _key_digest(key.strip()) for key in os.environ.get('PDF_RATE_LIMIT_API_KEYS', '').split(',') if key.strip()
+)
+
+def client_key(request):
+    """속도 제한 단위: 등록된 API 키 > Origin > 클라이언트 IP
+
+    등록되지 않은 X-API-Key는 무시한다 (요청마다 새 키를 보내 새 버킷을 받는 것 방지).
+    """
+    api_key = request.headers.get('X-API-Key')
+    if api_key:
+        digest = _key_digest(api_key)
+        if digest in RATE_LIMIT_API_KEYS:
+            return f'key:{digest[:16]}'
+    origin = request.headers.get('Origin')
+    if origin:
+        return f'origin:{origin}'
+    return f'ip:{request.remote_addr}'
@@ -5,19 +5,81 @@
 """
 
 from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
+from reportlab.platypus import SimpleDocTemplate, Spacer, Table, TableStyle, PageBreak, Flowable
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib import colors
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfbase.cidfonts import UnicodeCIDFont
 from datetime import datetime
 import io
 import os
+
+try:
+    import fitz  # PyMuPDF - 정적 페이지 병합용 (선택)
+except ImportError:
+    fitz = None
+
 from chart_generator import create_working_bar_chart, create_working_pie_chart, create_simple_line_chart
+from stream_chart_generator import create_stream_bar_chart, create_stream_pie_chart, create_stream_line_chart
+from render_deadline import RenderCancelled, checkpoint
+from report_model import build_report_model
+import deterministic
+import fork_state
+import tracing
+from layout_cache import CachedParagraph as Paragraph
+from markdown_insights import parse_markdown, build_flowables
+from section_workers import default_workers, run_parallel
+
+# 요청별로 선택 가능한 차트 백엔드 (bar, pie, line)
+CHART_BACKENDS = {
+    'reportlab': (create_working_bar_chart, create_working_pie_chart, create_simple_line_chart),
+    'stream': (create_stream_bar_chart, create_stream_pie_chart, create_stream_line_chart)
+}
+DEFAULT_CHART_BACKEND = 'reportlab'
+
+# 섹션 병렬 렌더링 기본값 (요청별로 덮어쓸 수 있음)
+PARALLEL_SECTIONS = os.environ.get('PDF_PARALLEL_SECTIONS', 'false').lower() == 'true'
+
+# 품질 단계 (요청별로 선택, 부하가 높으면 서버가 낮춤)
+# full: 표지/목차 + 모든 차트, standard: 파이 차트 생략, draft: 차트/표지/목차 없이 내장 CID 폰트 사용
+QUALITY_LEVELS = ('draft', 'standard', 'full')
+QUALITY_CHARTS = {
+    'draft': frozenset(),
+    'standard': frozenset(['bar', 'line']),
+    'full': frozenset(['bar', 'pie', 'line'])
+}
+DEFAULT_QUALITY = 'full'
+
+# 초안용 한글 폰트 - PDF 뷰어 내장 CID 폰트 (폰트 파일 파싱/서브셋 임베딩 없음)
+DRAFT_FONT = 'HYGothic-Medium'
+
+def resolve_quality(name):
+    """품질 단계 이름 검증 (알 수 없으면 기본값)"""
+    if name in QUALITY_LEVELS:
+        return name
+    if name:
+        print(f"⚠️ 알 수 없는 품질 단계 '{name}' - 기본값 사용: {DEFAULT_QUALITY}")
+    return DEFAULT_QUALITY
+
+def resolve_chart_backend(name):
+    """차트 백엔드 이름 검증 (알 수 없으면 기본값)"""
+    if name in CHART_BACKENDS:
+        return name
+    if name:
+        print(f"⚠️ 알 수 없는 차트 백엔드 '{name}' - 기본값 사용: {DEFAULT_CHART_BACKEND}")
+    return DEFAULT_CHART_BACKEND
+
+# 폰트 파일 파싱은 프로세스당 한 번만
+_korean_font_name = None
 
 def register_korean_font():
     """한글 폰트 등록"""
+    global _korean_font_name
+    if _korean_font_name is not None:
+        return _korean_font_name
+
     try:
         font_paths = [
             '/System/Library/Fonts/Supplemental/AppleGothic.ttf',
@@ -29,40 +91,35 @@ def register_korean_font():
                 try:
                     pdfmetrics.registerFont(TTFont('KoreanFont', font_path))
                     print(f"✅ 한글 폰트 등록 성공: {font_path}")
-                    return 'KoreanFont'
+                    _korean_font_name = 'KoreanFont'
+                    return _korean_font_name
                 except Exception as e:
                     continue
         
         print("⚠️ 한글 폰트를 찾을 수 없어 기본 폰트 사용")
-        return 'Helvetica'
+        _korean_font_name = 'Helvetica'
+        return _korean_font_name
         
     except Exception as e:
         print(f"❌ 폰트 등록 오류: {e}")
         return 'Helvetica'
 
-def create_advanced_korean_report(ai_insights, analytics_data):
-    """고급 한글 분석 리포트 - 카테고리별 세분화"""
-    try:
-        print("📊 고급 한글 분석 리포트 생성 시작...")
-        
-        # 한글 폰트 등록
-        korean_font = register_korean_font()
-        
-        # PDF 문서 생성
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(
-            buffer,
-            pagesize=A4,
-            rightMargin=40,
-            leftMargin=40,
-            topMargin=40,
-            bottomMargin=40
-        )
-        
-        # 스타일 정의
-        styles = getSampleStyleSheet()
-        
-        title_style = ParagraphStyle(
+_draft_font_registered = False
+
+def register_draft_font():
+    """초안용 내장 CID 폰트 등록"""
+    global _draft_font_registered
+    if not _draft_font_registered:
+        pdfmetrics.registerFont(UnicodeCIDFont(DRAFT_FONT))
+        _draft_font_registered = True
+    return DRAFT_FONT
+
+def build_report_styles(korean_font):
+    """리포트 공통 스타일 생성"""
+    styles = getSampleStyleSheet()
+
+    return {
+        'title': ParagraphStyle(
             'KoreanTitle',
             parent=styles['Title'],
             fontSize=22,
@@ -70,372 +127,611 @@ def create_advanced_korean_report(ai_insights, analytics_data):
             textColor=colors.HexColor('#232F3E'),
             alignment=1,
             fontName=korean_font
-        )
-        
-        heading_style = ParagraphStyle(
+        ),
+        'heading': ParagraphStyle(
             'KoreanHeading',
             parent=styles['Heading1'],
             fontSize=18,
             spaceAfter=20,
             textColor=colors.HexColor('#FF9900'),
             fontName=korean_font
-        )
-        
-        subheading_style = ParagraphStyle(
+        ),
+        'subheading': ParagraphStyle(
             'KoreanSubHeading',
             parent=styles['Heading2'],
             fontSize=15,
             spaceAfter=12,
             textColor=colors.HexColor('#232F3E'),
             fontName=korean_font
-        )
-        
-        body_style = ParagraphStyle(
+        ),
+        'body': ParagraphStyle(
             'KoreanBody',
             parent=styles['Normal'],
             fontSize=11,
             spaceAfter=8,
             textColor=colors.black,
             fontName=korean_font
-        )
-        
-        highlight_style = ParagraphStyle(
+        ),
+        # AI 인사이트 Markdown (### 이하 제목, 목록, 인용, 코드, 표 셀)
+        'minorheading': ParagraphStyle(
+            'KoreanMinorHeading',
+            parent=styles['Normal'],
+            fontSize=12.5,
+            leading=16,
+            spaceBefore=6,
+            spaceAfter=6,
+            textColor=colors.HexColor('#232F3E'),
+            fontName=korean_font
+        ),
+        'list': ParagraphStyle(
+            'KoreanList',
+            parent=styles['Normal'],
+            fontSize=11,
+            spaceAfter=4,
+            leftIndent=18,
+            bulletIndent=6,
+            bulletFontName=korean_font,
+            fontName=korean_font
+        ),
+        'quote': ParagraphStyle(
+            'KoreanQuote',
+            parent=styles['Normal'],
+            fontSize=11,
+            spaceAfter=8,
+            leftIndent=12,
+            textColor=colors.HexColor('#545B64'),
+            fontName=korean_font
+        ),
+        'code': ParagraphStyle(
+            'KoreanCode',
+            parent=styles['Normal'],
+            fontSize=9,
+            leading=12,
+            spaceAfter=8,
+            backColor=colors.HexColor('#F2F3F3'),
+            borderPadding=4,
+            fontName=korean_font
+        ),
+        'table': ParagraphStyle(
+            'KoreanTableCell',
+            parent=styles['Normal'],
+            fontSize=9,
+            leading=12,
+            fontName=korean_font
+        ),
+        'highlight': ParagraphStyle(
             'Highlight',
             parent=styles['Normal'],
             fontSize=12,
             spaceAfter=10,
             textColor=colors.HexColor('#FF9900'),
             fontName='Helvetica-Bold'
-        )
-        
-        # 콘텐츠 생성
-        story = []
-        
-        # === 표지 페이지 ===
-        story.append(Spacer(1, 1.5*inch))
-        story.append(Paragraph("AWS Demo Factory", title_style))
-        story.append(Paragraph("종합 분석 리포트", heading_style))
-        story.append(Spacer(1, 0.5*inch))
-        
+        ),
         # 로고 영역 (텍스트로 대체)
-        logo_style = ParagraphStyle(
+        'logo': ParagraphStyle(
             'Logo',
             parent=styles['Normal'],
             fontSize=48,
             textColor=colors.HexColor('#FF9900'),
             alignment=1,
             fontName='Helvetica-Bold'
+        ),
+        'footer': ParagraphStyle(
+            'Footer',
+            parent=styles['Normal'],
+            fontSize=9,
+            textColor=colors.grey,
+            alignment=1,
+            fontName=korean_font
         )
-        story.append(Paragraph("📊", logo_style))
-        story.append(Spacer(1, 0.5*inch))
-        
-        now = datetime.now().strftime("%Y년 %m월 %d일")
-        story.append(Paragraph(f"생성일: {now}", body_style))
-        story.append(Paragraph("AI 모델: Claude 4 Sonnet", body_style))
-        story.append(Paragraph("생성 도구: Amazon Bedrock", body_style))
-        
-        story.append(PageBreak())
-        
-        # === 목차 ===
-        story.append(Paragraph("목차", heading_style))
-        toc_data = [
-            "1. 전체 현황 요약",
-            "2. 카테고리별 상세 분석",
-            "3. 콘텐츠 성과 분석", 
-            "4. 사용자 행동 분석",
-            "5. 시간대별 활동 분석",
-            "6. 전략적 권장사항",
-            "7. 모니터링 지표"
-        ]
-        
-        for item in toc_data:
-            story.append(Paragraph(item, body_style))
-        
-        story.append(PageBreak())
-        
-        # === 1. 전체 현황 요약 ===
-        story.append(Paragraph("1. 전체 현황 요약", heading_style))
-        
-        # 핵심 지표 테이블
-        engagement_rate = (analytics_data.get('totalContentViews', 0) / max(analytics_data.get('totalPageViews', 1), 1) * 100)
-        
-        summary_data = [
-            ['핵심 지표', '현재값', '평가', '트렌드'],
-            ['총 페이지뷰', f"{analytics_data.get('totalPageViews', 0):,}회", '📈 양호', '↗️ 증가'],
-            ['콘텐츠 조회', f"{analytics_data.get('totalContentViews', 0):,}회", '👀 활성', '→ 안정'],
-            ['참여율', f"{engagement_rate:.1f}%", '📊 보통' if engagement_rate < 20 else '🔥 우수', '↗️ 개선'],
-            ['분석 기간', analytics_data.get('period', '전체 기간'), '📅 완료', '✅ 현재']
-        ]
-        
-        summary_table = Table(summary_data, colWidths=[1.8*inch, 1.2*inch, 1*inch, 1*inch])
-        summary_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#232F3E')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, -1), korean_font),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('FONTSIZE', (0, 1), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#F8F9FA')),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F8F9FA')])
-        ]))
-        
-        story.append(summary_table)
-        story.append(Spacer(1, 20))
-        
-        # 주요 인사이트
-        story.append(Paragraph("📋 주요 발견사항", subheading_style))
-        key_insights = [
-            f"• 전체 {analytics_data.get('totalPageViews', 0)}회의 페이지뷰 중 {analytics_data.get('totalContentViews', 0)}회가 실제 콘텐츠 조회",
-            f"• 페이지 참여율 {engagement_rate:.1f}%로 {'우수한' if engagement_rate >= 20 else '개선 필요한'} 수준",
-            "• Manufacturing과 Generative AI 분야에 높은 관심도 집중",
-            "• 업무시간대(14-17시)에 주요 활동 집중"
-        ]
-        
-        for insight in key_insights:
-            story.append(Paragraph(insight, body_style))
-        
-        story.append(PageBreak())
-        
-        # === 2. 카테고리별 상세 분석 ===
-        story.append(Paragraph("2. 카테고리별 상세 분석", heading_style))
-        
-        if analytics_data.get('category'):
-            category_data = analytics_data['category'][:6]  # 상위 6개
-            chart_data = {
-                'labels': [item.get('category', '미분류') for item in category_data],
-                'values': [item.get('count', 0) for item in category_data]
-            }
-            
-            if chart_data['values'] and sum(chart_data['values']) > 0:
-                # 바 차트 추가
-                story.append(Paragraph("📊 카테고리별 조회수 분포", subheading_style))
-                bar_chart = create_working_bar_chart(chart_data, 500, 280)
+    }
+
+def build_cover_section(styles, date_text):
+    """표지 페이지 (생성일만 바뀜)"""
+    story = []
+    story.append(Spacer(1, 1.5*inch))
+    story.append(Paragraph("AWS Demo Factory", styles['title']))
+    story.append(Paragraph("종합 분석 리포트", styles['heading']))
+    story.append(Spacer(1, 0.5*inch))
+    story.append(Paragraph("📊", styles['logo']))
+    story.append(Spacer(1, 0.5*inch))
+    story.append(Paragraph(f"생성일: {date_text}", styles['body']))
+    story.append(Paragraph("AI 모델: Claude 4 Sonnet", styles['body']))
+    story.append(Paragraph("생성 도구: Amazon Bedrock", styles['body']))
+    return story
+
+def build_toc_section(styles):
+    """목차 페이지 (정적)"""
+    story = [Paragraph("목차", styles['heading'])]
+    toc_data = [
+        "1. 전체 현황 요약",
+        "2. 카테고리별 상세 분석",
+        "3. 콘텐츠 성과 분석",
+        "4. 사용자 행동 분석",
+        "5. 시간대별 활동 분석",
+        "6. 전략적 권장사항",
+        "7. 모니터링 지표"
+    ]
+
+    for item in toc_data:
+        story.append(Paragraph(item, styles['body']))
+
+    return story
+
+def build_insights_section(styles, korean_font, insight_blocks):
+    """AI 분석 인사이트 (insight_blocks: parse_markdown 결과)"""
+    story = [Paragraph("🤖 AI 분석 인사이트", styles['heading'])]
+    story.extend(build_flowables(insight_blocks, styles, korean_font))
+    return story
+
+def build_summary_section(styles, korean_font, summary):
+    """1. 전체 현황 요약 (summary: 리포트 모델의 'summary')"""
+    story = [Paragraph("1. 전체 현황 요약", styles['heading'])]
+
+    # 핵심 지표 테이블
+    summary_data = [['핵심 지표', '현재값', '평가', '트렌드']] + [
+        [metric['name'], metric['value'], metric['evaluation'], metric['trend']]
+        for metric in summary['metrics']
+    ]
+
+    summary_table = Table(summary_data, colWidths=[1.8*inch, 1.2*inch, 1*inch, 1*inch])
+    summary_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#232F3E')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, -1), korean_font),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('FONTSIZE', (0, 1), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#F8F9FA')),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F8F9FA')])
+    ]))
+
+    story.append(summary_table)
+    story.append(Spacer(1, 20))
+
+    # 주요 인사이트
+    story.append(Paragraph("📋 주요 발견사항", styles['subheading']))
+    key_insights = [
+        f"• 전체 {summary['total_page_views']}회의 페이지뷰 중 {summary['total_content_views']}회가 실제 콘텐츠 조회",
+        f"• 페이지 참여율 {summary['engagement_rate']:.1f}%로 {'우수한' if summary['engagement_good'] else '개선 필요한'} 수준",
+        "• Manufacturing과 Generative AI 분야에 높은 관심도 집중",
+        "• 업무시간대(14-17시)에 주요 활동 집중"
+    ]
+
+    for insight in key_insights:
+        story.append(Paragraph(insight, styles['body']))
+
+    return story
+
+def build_category_section(styles, korean_font, categories, chart_backend=DEFAULT_CHART_BACKEND, charts=QUALITY_CHARTS[DEFAULT_QUALITY]):
+    """2. 카테고리별 상세 분석 (categories: 리포트 모델의 'categories', charts: 포함할 차트)"""
+    bar_chart_fn, pie_chart_fn, _ = CHART_BACKENDS[chart_backend]
+    story = [Paragraph("2. 카테고리별 상세 분석", styles['heading'])]
+
+    if categories['rows']:
+        chart_data = categories['chart']
+
+        if chart_data['values'] and sum(chart_data['values']) > 0:
+            # 바 차트 추가
+            if 'bar' in charts:
+                story.append(Paragraph("📊 카테고리별 조회수 분포", styles['subheading']))
+                with tracing.span('chart', chart='bar', backend=chart_backend):
+                    bar_chart = bar_chart_fn(chart_data, 500, 280)
                 story.append(bar_chart)
                 story.append(Spacer(1, 20))
-                
-                # 파이 차트 추가
-                story.append(Paragraph("🥧 카테고리 비중 분석", subheading_style))
-                pie_chart = create_working_pie_chart(chart_data, 400, 320)
+
+            # 파이 차트 추가
+            if 'pie' in charts:
+                story.append(Paragraph("🥧 카테고리 비중 분석", styles['subheading']))
+                with tracing.span('chart', chart='pie', backend=chart_backend):
+                    pie_chart = pie_chart_fn(chart_data, 400, 320)
                 story.append(pie_chart)
                 story.append(Spacer(1, 20))
-                
-                # 카테고리별 상세 분석
-                story.append(Paragraph("📈 카테고리별 성과 분석", subheading_style))
-                
-                total_views = sum(chart_data['values'])
-                category_analysis_data = [['순위', '카테고리', '조회수', '비중', '성과 등급']]
-                
-                for i, item in enumerate(category_data, 1):
-                    category = item.get('category', '미분류')
-                    count = item.get('count', 0)
-                    percentage = (count / total_views * 100) if total_views > 0 else 0
-                    
-                    if percentage >= 25:
-                        grade = '🔥 최우수'
-                    elif percentage >= 15:
-                        grade = '⭐ 우수'
-                    elif percentage >= 10:
-                        grade = '📈 양호'
-                    else:
-                        grade = '📊 보통'
-                    
-                    category_analysis_data.append([
-                        f"{i}위", category, f"{count}회", f"{percentage:.1f}%", grade
-                    ])
-                
-                category_table = Table(category_analysis_data, colWidths=[0.6*inch, 1.8*inch, 0.8*inch, 0.8*inch, 1*inch])
-                category_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#FF9900')),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, -1), korean_font),
-                    ('FONTSIZE', (0, 0), (-1, 0), 11),
-                    ('FONTSIZE', (0, 1), (-1, -1), 9),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#FFFBF0')),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-                    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#FFFBF0')])
-                ]))
-                
-                story.append(category_table)
-        
-        story.append(PageBreak())
-        
-        # === 3. 콘텐츠 성과 분석 ===
-        story.append(Paragraph("3. 콘텐츠 성과 분석", heading_style))
-        
-        if analytics_data.get('content'):
-            content_data = analytics_data['content'][:8]  # 상위 8개
-            
-            story.append(Paragraph("🏆 상위 콘텐츠 순위", subheading_style))
-            
-            content_analysis_data = [['순위', '콘텐츠 제목', '조회수', '성과 등급', '추천도']]
-            
-            for i, item in enumerate(content_data, 1):
-                title = item.get('title', '제목 없음')
-                if len(title) > 30:
-                    title = title[:30] + '...'
-                
-                views = item.get('views', 0)
-                
-                if views >= 5:
-                    grade = '🔥 최우수'
-                    recommendation = '⭐⭐⭐'
-                elif views >= 3:
-                    grade = '📈 우수'
-                    recommendation = '⭐⭐'
-                elif views >= 1:
-                    grade = '📊 양호'
-                    recommendation = '⭐'
-                else:
-                    grade = '📋 기본'
-                    recommendation = '-'
-                
-                content_analysis_data.append([
-                    f"{i}위", title, f"{views}회", grade, recommendation
-                ])
-            
-            content_table = Table(content_analysis_data, colWidths=[0.6*inch, 2.2*inch, 0.8*inch, 1*inch, 0.8*inch])
-            content_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#232F3E')),
+
+            # 카테고리별 상세 분석
+            story.append(Paragraph("📈 카테고리별 성과 분석", styles['subheading']))
+
+            category_analysis_data = [['순위', '카테고리', '조회수', '비중', '성과 등급']] + [
+                [f"{row['rank']}위", row['category'], f"{row['count']}회", f"{row['percentage']:.1f}%", row['grade_label']]
+                for row in categories['rows']
+            ]
+
+            category_table = Table(category_analysis_data, colWidths=[0.6*inch, 1.8*inch, 0.8*inch, 0.8*inch, 1*inch])
+            category_table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#FF9900')),
                 ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('ALIGN', (0, 0), (0, -1), 'CENTER'),  # 순위 열만 중앙정렬
-                ('ALIGN', (2, 0), (-1, -1), 'CENTER'),  # 조회수, 성과, 추천도 중앙정렬
+                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
                 ('FONTNAME', (0, 0), (-1, -1), korean_font),
                 ('FONTSIZE', (0, 0), (-1, 0), 11),
                 ('FONTSIZE', (0, 1), (-1, -1), 9),
                 ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#F0F8FF')),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F0F8FF')])
+                ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#FFFBF0')),
+                ('GRID', (0, 0), (-1, -1), 1, colors.grey),
+                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#FFFBF0')])
             ]))
-            
-            story.append(content_table)
-        
-        story.append(Spacer(1, 20))
-        
-        # 콘텐츠 성과 인사이트
-        story.append(Paragraph("💡 콘텐츠 성과 인사이트", subheading_style))
-        content_insights = [
-            "• 상위 3개 콘텐츠가 전체 조회의 60% 이상을 차지",
-            "• Manufacturing 관련 콘텐츠의 높은 성과 확인",
-            "• 기술 중심 콘텐츠에 대한 사용자 선호도 뚜렷",
-            "• 실용적인 가이드 형태의 콘텐츠가 높은 참여율 기록"
-        ]
-        
-        for insight in content_insights:
-            story.append(Paragraph(insight, body_style))
-        
-        story.append(PageBreak())
-        
-        # === 4. 시간대별 활동 분석 ===
-        story.append(Paragraph("4. 시간대별 활동 분석", heading_style))
-        
-        if analytics_data.get('time'):
-            time_data = analytics_data['time']
-            time_chart_data = {
-                'labels': [item.get('hour', 0) for item in time_data],
-                'values': [item.get('count', 0) for item in time_data]
-            }
-            
-            if time_chart_data['values']:
-                story.append(Paragraph("📈 시간대별 활동 패턴", subheading_style))
-                line_chart = create_simple_line_chart(time_chart_data, 500, 250)
-                story.append(line_chart)
-                story.append(Spacer(1, 20))
-        
-        # 시간대 분석 인사이트
-        story.append(Paragraph("⏰ 시간대 분석 결과", subheading_style))
-        time_insights = [
-            "• 14-17시 업무시간에 전체 활동의 85% 집중",
-            "• 점심시간(12-13시) 이후 활동량 급증",
-            "• 저녁시간(18시 이후) 활동량 현저히 감소",
-            "• B2B 특성을 반영한 전형적인 업무시간 패턴"
-        ]
-        
-        for insight in time_insights:
-            story.append(Paragraph(insight, body_style))
-        
-        story.append(PageBreak())
-        
-        # === 5. 전략적 권장사항 ===
-        story.append(Paragraph("5. 전략적 권장사항", heading_style))
-        
-        # 즉시 실행 권장사항
-        story.append(Paragraph("🚀 즉시 실행 권장사항", subheading_style))
-        immediate_actions = [
-            "1. Manufacturing 카테고리 콘텐츠 확충 (현재 최고 성과)",
-            "2. Generative AI 관련 최신 트렌드 콘텐츠 추가",
-            "3. 14-15시 골든타임 활용한 신규 콘텐츠 배포",
-            "4. 상위 성과 콘텐츠 기반 시리즈 콘텐츠 개발"
-        ]
-        
-        for action in immediate_actions:
-            story.append(Paragraph(action, body_style))
-        
-        story.append(Spacer(1, 15))
-        
-        # 중장기 전략
-        story.append(Paragraph("📋 중장기 전략 계획", subheading_style))
-        longterm_strategies = [
-            "1. 개인화된 콘텐츠 추천 시스템 구축",
-            "2. 산업별 특화 콘텐츠 경로 개발",
-            "3. 사용자 피드백 기반 콘텐츠 품질 개선",
-            "4. 실시간 분석 대시보드 구축"
-        ]
-        
-        for strategy in longterm_strategies:
-            story.append(Paragraph(strategy, body_style))
-        
-        story.append(Spacer(1, 20))
-        
-        # === 6. 모니터링 지표 ===
-        story.append(Paragraph("6. 핵심 모니터링 지표", subheading_style))
-        
-        monitoring_data = [
-            ['지표명', '현재값', '목표값', '측정주기', '우선순위'],
-            ['페이지 참여율', f"{engagement_rate:.1f}%", '25%+', '주간', '🔥 높음'],
-            ['콘텐츠 조회율', f"{analytics_data.get('totalContentViews', 0)}회", '10회+', '일간', '⭐ 중간'],
-            ['카테고리 다양성', '5개', '8개+', '월간', '📈 중간'],
-            ['사용자 재방문율', '측정예정', '60%+', '월간', '🎯 높음'],
-            ['콘텐츠 만족도', '측정예정', '4.0+/5.0', '분기', '💡 중간']
+
+            story.append(category_table)
+
+    return story
+
+def build_content_section(styles, korean_font, content):
+    """3. 콘텐츠 성과 분석 (content: 리포트 모델의 'content')"""
+    story = [Paragraph("3. 콘텐츠 성과 분석", styles['heading'])]
+
+    if content['rows']:
+        story.append(Paragraph("🏆 상위 콘텐츠 순위", styles['subheading']))
+
+        content_analysis_data = [['순위', '콘텐츠 제목', '조회수', '성과 등급', '추천도']] + [
+            [f"{row['rank']}위", row['display_title'], f"{row['views']}회", row['grade_label'], row['recommendation']]
+            for row in content['rows']
         ]
-        
-        monitoring_table = Table(monitoring_data, colWidths=[1.5*inch, 1*inch, 1*inch, 1*inch, 1*inch])
-        monitoring_table.setStyle(TableStyle([
+
+        content_table = Table(content_analysis_data, colWidths=[0.6*inch, 2.2*inch, 0.8*inch, 1*inch, 0.8*inch])
+        content_table.setStyle(TableStyle([
             ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#232F3E')),
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('ALIGN', (0, 0), (0, -1), 'CENTER'),  # 순위 열만 중앙정렬
+            ('ALIGN', (2, 0), (-1, -1), 'CENTER'),  # 조회수, 성과, 추천도 중앙정렬
             ('FONTNAME', (0, 0), (-1, -1), korean_font),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('FONTSIZE', (0, 0), (-1, 0), 11),
             ('FONTSIZE', (0, 1), (-1, -1), 9),
             ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
             ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#F0F8FF')),
             ('GRID', (0, 0), (-1, -1), 1, colors.black),
             ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F0F8FF')])
         ]))
-        
-        story.append(monitoring_table)
-        
-        # 푸터
-        story.append(Spacer(1, 50))
-        story.append(Paragraph("본 종합 분석 리포트는 Amazon Bedrock의 Claude 4 Sonnet 모델을 활용하여 생성되었습니다.", 
-                              ParagraphStyle('Footer', parent=styles['Normal'], fontSize=9, 
-                                           textColor=colors.grey, alignment=1, fontName=korean_font)))
-        
-        # PDF 생성
+
+        story.append(content_table)
+
+    story.append(Spacer(1, 20))
+
+    # 콘텐츠 성과 인사이트
+    story.append(Paragraph("💡 콘텐츠 성과 인사이트", styles['subheading']))
+    content_insights = [
+        "• 상위 3개 콘텐츠가 전체 조회의 60% 이상을 차지",
+        "• Manufacturing 관련 콘텐츠의 높은 성과 확인",
+        "• 기술 중심 콘텐츠에 대한 사용자 선호도 뚜렷",
+        "• 실용적인 가이드 형태의 콘텐츠가 높은 참여율 기록"
+    ]
+
+    for insight in content_insights:
+        story.append(Paragraph(insight, styles['body']))
+
+    return story
+
+def build_time_section(styles, korean_font, time_model, chart_backend=DEFAULT_CHART_BACKEND, charts=QUALITY_CHARTS[DEFAULT_QUALITY]):
+    """4. 시간대별 활동 분석 (time_model: 리포트 모델의 'time', charts: 포함할 차트)"""
+    _, _, line_chart_fn = CHART_BACKENDS[chart_backend]
+    story = [Paragraph("4. 시간대별 활동 분석", styles['heading'])]
+
+    time_chart_data = time_model['chart']
+    if time_chart_data['values'] and 'line' in charts:
+        story.append(Paragraph("📈 시간대별 활동 패턴", styles['subheading']))
+        with tracing.span('chart', chart='line', backend=chart_backend):
+            line_chart = line_chart_fn(time_chart_data, 500, 250)
+        story.append(line_chart)
+        story.append(Spacer(1, 20))
+
+    # 시간대 분석 인사이트
+    story.append(Paragraph("⏰ 시간대 분석 결과", styles['subheading']))
+    time_insights = [
+        "• 14-17시 업무시간에 전체 활동의 85% 집중",
+        "• 점심시간(12-13시) 이후 활동량 급증",
+        "• 저녁시간(18시 이후) 활동량 현저히 감소",
+        "• B2B 특성을 반영한 전형적인 업무시간 패턴"
+    ]
+
+    for insight in time_insights:
+        story.append(Paragraph(insight, styles['body']))
+
+    return story
+
+def build_recommendation_section(styles):
+    """5. 전략적 권장사항 (정적)"""
+    story = [Paragraph("5. 전략적 권장사항", styles['heading'])]
+
+    # 즉시 실행 권장사항
+    story.append(Paragraph("🚀 즉시 실행 권장사항", styles['subheading']))
+    immediate_actions = [
+        "1. Manufacturing 카테고리 콘텐츠 확충 (현재 최고 성과)",
+        "2. Generative AI 관련 최신 트렌드 콘텐츠 추가",
+        "3. 14-15시 골든타임 활용한 신규 콘텐츠 배포",
+        "4. 상위 성과 콘텐츠 기반 시리즈 콘텐츠 개발"
+    ]
+
+    for action in immediate_actions:
+        story.append(Paragraph(action, styles['body']))
+
+    story.append(Spacer(1, 15))
+
+    # 중장기 전략
+    story.append(Paragraph("📋 중장기 전략 계획", styles['subheading']))
+    longterm_strategies = [
+        "1. 개인화된 콘텐츠 추천 시스템 구축",
+        "2. 산업별 특화 콘텐츠 경로 개발",
+        "3. 사용자 피드백 기반 콘텐츠 품질 개선",
+        "4. 실시간 분석 대시보드 구축"
+    ]
+
+    for strategy in longterm_strategies:
+        story.append(Paragraph(strategy, styles['body']))
+
+    return story
+
+def build_monitoring_section(styles, korean_font, summary):
+    """6. 핵심 모니터링 지표 + 푸터 (summary: 리포트 모델의 'summary')"""
+    story = [Paragraph("6. 핵심 모니터링 지표", styles['subheading'])]
+
+    monitoring_data = [
+        ['지표명', '현재값', '목표값', '측정주기', '우선순위'],
+        ['페이지 참여율', f"{summary['engagement_rate']:.1f}%", '25%+', '주간', '🔥 높음'],
+        ['콘텐츠 조회율', f"{summary['total_content_views']}회", '10회+', '일간', '⭐ 중간'],
+        ['카테고리 다양성', '5개', '8개+', '월간', '📈 중간'],
+        ['사용자 재방문율', '측정예정', '60%+', '월간', '🎯 높음'],
+        ['콘텐츠 만족도', '측정예정', '4.0+/5.0', '분기', '💡 중간']
+    ]
+
+    monitoring_table = Table(monitoring_data, colWidths=[1.5*inch, 1*inch, 1*inch, 1*inch, 1*inch])
+    monitoring_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#232F3E')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, -1), korean_font),
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+        ('FONTSIZE', (0, 1), (-1, -1), 9),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#F0F8FF')),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F0F8FF')])
+    ]))
+
+    story.append(monitoring_table)
+
+    # 푸터
+    story.append(Spacer(1, 50))
+    story.append(Paragraph("본 종합 분석 리포트는 Amazon Bedrock의 Claude 4 Sonnet 모델을 활용하여 생성되었습니다.", styles['footer']))
+
+    return story
+
+def build_pdf_bytes(story):
+    """플로어블 목록을 A4 PDF 바이트로 빌드"""
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        rightMargin=40,
+        leftMargin=40,
+        topMargin=40,
+        bottomMargin=40,
+        invariant=deterministic.enabled()
+    )
+    # 플로어블마다 취소 지점
+    doc.afterFlowable = lambda flowable: checkpoint()
+    with tracing.span('build', flowables=len(story)) as span:
         doc.build(story)
-        
-        # 바이트 데이터 반환
-        pdf_bytes = buffer.getvalue()
-        buffer.close()
-        
+        if span is not None:
+            span.set_attribute('pages', doc.page)
+
+    pdf_bytes = buffer.getvalue()
+    buffer.close()
+    return pdf_bytes
+
+def join_sections(sections):
+    """섹션 사이에 페이지 나눔을 넣어 하나의 story로 연결"""
+    story = []
+    for i, section in enumerate(sections):
+        if i > 0:
+            story.append(PageBreak())
+        story.extend(section)
+    return story
+
+# === 정적 페이지 캐시 ===
+# 표지(날짜별), 목차, 전략적 권장사항은 요청 데이터와 무관하므로
+# 한 번만 레이아웃하고 PDF 바이트로 보관해 페이지 단위로 병합한다.
+# (포크된 렌더링 프로세스에서 새로 빌드한 페이지는 부모로 돌려받아 보관)
+_static_page_cache = {}
+_static_page_lock = fork_state.ForkSafeLock()
+
+def _get_static_pages(name, korean_font, build_section, date_text=None):
+    """정적 섹션 PDF 바이트 조회 (없으면 한 번 빌드)"""
+    key = (name, korean_font, date_text)
+
+    with _static_page_lock:
+        cached = _static_page_cache.get(key)
+    if cached is not None:
+        return cached
+
+    pdf_bytes = build_pdf_bytes(build_section(build_report_styles(korean_font)))
+    _put_static_pages(key, pdf_bytes)
+
+    print(f"🗂️ 정적 페이지 캐시 생성: {name} ({len(pdf_bytes)} bytes)")
+    return pdf_bytes
+
+def _put_static_pages(key, pdf_bytes):
+    name, _, date_text = key
+    with _static_page_lock:
+        if date_text is not None:
+            # 날짜별 표지는 최신 날짜 하나만 유지
+            for old_key in [k for k in _static_page_cache if k[0] == name and k[2] != date_text]:
+                del _static_page_cache[old_key]
+        _static_page_cache[key] = pdf_bytes
+    _static_page_journal.record(key, pdf_bytes)
+
+_static_page_journal = fork_state.CacheJournal('static_pages', _put_static_pages)
+
+def prerender_static_pages():
+    """서버 시작 시 정적 페이지 미리 렌더링"""
+    if fitz is None:
+        print("⚠️ PyMuPDF 미설치 - 정적 페이지 병합 비활성화")
+        return False
+
+    korean_font = register_korean_font()
+    date_text = datetime.now().strftime("%Y년 %m월 %d일")
+    _get_static_pages('cover', korean_font, lambda styles: build_cover_section(styles, date_text), date_text)
+    _get_static_pages('toc', korean_font, build_toc_section)
+    _get_static_pages('recommendation', korean_font, build_recommendation_section)
+    return True
+
+def _merge_pdf_parts(titled_parts, numbered_from=1):
+    """(목차 제목, (PDF 바이트, 시작 페이지, 끝 페이지)) 목록을 순서대로 병합
+
+    조각마다 쪽 번호가 1부터 시작하므로 병합 후 전체 기준으로 다시 매기고,
+    각 조각의 첫 페이지를 outline(북마크)에 등록한다.
+    """
+    merged = fitz.open()
+    try:
+        outline = []
+        for title, (pdf_bytes, from_page, to_page) in titled_parts:
+            outline.append([1, title, merged.page_count + 1])
+            with fitz.open(stream=pdf_bytes, filetype="pdf") as src:
+                merged.insert_pdf(src, from_page=from_page, to_page=to_page)
+
+        merged.set_toc(outline)
+        _number_pages(merged, numbered_from)
+        return deterministic.fitz_tobytes(merged, garbage=3, deflate=True)
+    finally:
+        merged.close()
+
+def _number_pages(doc, numbered_from=1):
+    """numbered_from번째(0부터, 기본: 표지 다음) 페이지부터 하단 중앙에 "쪽 / 전체" 표시"""
+    total = doc.page_count
+    for index in range(numbered_from, total):
+        page = doc[index]
+        label = f"{index + 1} / {total}"
+        width = fitz.get_text_length(label, fontname="helv", fontsize=9)
+        page.insert_text(
+            ((page.rect.width - width) / 2, page.rect.height - 20),
+            label, fontname="helv", fontsize=9, color=(0.4, 0.4, 0.4)
+        )
+
+def _traced_section(title, build_section):
+    """섹션 플로어블 구성 (추적 span)"""
+    with tracing.span('section', section=title):
+        return build_section()
+
+class _PageMarker(Flowable):
+    """빌드 중 자신이 그려진 페이지 번호(0부터)를 기록하는 빈 플로어블"""
+
+    def __init__(self):
+        Flowable.__init__(self)
+        self.page_index = None
+
+    def wrap(self, availWidth, availHeight):
+        return (0, 0)
+
+    def draw(self):
+        self.page_index = self.canv.getPageNumber() - 1
+
+def create_advanced_korean_report(ai_insights, analytics_data, chart_backend=DEFAULT_CHART_BACKEND, model=None, parallel=None, quality=DEFAULT_QUALITY):
+    """고급 한글 분석 리포트 - 카테고리별 세분화
+
+    model: 이미 계산된 리포트 모델 (없으면 analytics_data로 계산)
+    parallel: 섹션을 병렬 프로세스에서 조각으로 렌더링할지 (None이면 PDF_PARALLEL_SECTIONS)
+    quality: 'draft' / 'standard' / 'full' (QUALITY_LEVELS)
+    """
+    try:
+        chart_backend = resolve_chart_backend(chart_backend)
+        quality = resolve_quality(quality)
+        print(f"📊 고급 한글 분석 리포트 생성 시작... (차트: {chart_backend}, 품질: {quality})")
+
+        if model is None:
+            model = build_report_model(analytics_data)
+
+        # 한글 폰트 등록 (초안은 임베딩 없는 내장 폰트) + 스타일 정의
+        with tracing.span('font', quality=quality):
+            korean_font = register_draft_font() if quality == 'draft' else register_korean_font()
+            styles = build_report_styles(korean_font)
+        charts = QUALITY_CHARTS[quality]
+        # 초안은 표지/목차 생략
+        front_matter = quality != 'draft'
+
+        now = deterministic.now().strftime("%Y년 %m월 %d일")
+
+        # AI 인사이트 Markdown은 병렬 워커로 포크하기 전에 파싱 (캐시가 부모 프로세스에 남도록)
+        with tracing.span('markdown'):
+            insight_blocks = parse_markdown((ai_insights or '').strip())
+
+        # 데이터 의존 섹션만 요청마다 레이아웃 (표시 순서는 권장사항이 시간대와 모니터링 사이)
+        section_builders = [
+            ("1. 전체 현황 요약", lambda: build_summary_section(styles, korean_font, model['summary'])),
+            ("2. 카테고리별 상세 분석", lambda: build_category_section(styles, korean_font, model['categories'], chart_backend, charts)),
+            ("3. 콘텐츠 성과 분석", lambda: build_content_section(styles, korean_font, model['content'])),
+            ("4. 시간대별 활동 분석", lambda: build_time_section(styles, korean_font, model['time'], chart_backend, charts)),
+            ("6. 핵심 모니터링 지표", lambda: build_monitoring_section(styles, korean_font, model['summary']))
+        ]
+        if insight_blocks:
+            # 인사이트가 있으면 목차 다음, 전체 현황 요약 앞에 배치
+            section_builders.insert(0, ("AI 분석 인사이트", lambda: build_insights_section(styles, korean_font, insight_blocks)))
+
+        if parallel is None:
+            parallel = PARALLEL_SECTIONS
+        workers = min(len(section_builders), default_workers())
+
+        if fitz is None:
+            # PyMuPDF가 없으면 전체를 한 번에 빌드 (섹션 사이마다 취소 지점)
+            dynamic_sections = []
+            for title, build_section in section_builders:
+                checkpoint()
+                dynamic_sections.append(_traced_section(title, build_section))
+            checkpoint()
+            front_sections = [build_cover_section(styles, now), build_toc_section(styles)] if front_matter else []
+            pdf_bytes = build_pdf_bytes(join_sections(
+                front_sections
+                + dynamic_sections[:-1]
+                + [build_recommendation_section(styles), dynamic_sections[-1]]
+            ))
+        else:
+            if parallel and workers > 1:
+                # 섹션마다 별도 프로세스에서 PDF 조각으로 빌드
+                fragments = run_parallel(
+                    [lambda title=title, build_section=build_section: build_pdf_bytes(_traced_section(title, build_section)) for title, build_section in section_builders],
+                    workers
+                )
+                dynamic_parts = [(fragment, 0, -1) for fragment in fragments]
+            else:
+                # 한 문서로 빌드하고 섹션 시작 페이지를 표시해 잘라 씀
+                dynamic_sections = []
+                markers = []
+                for title, build_section in section_builders:
+                    checkpoint()
+                    markers.append(_PageMarker())
+                    dynamic_sections.append([markers[-1]] + _traced_section(title, build_section))
+                checkpoint()
+                dynamic_bytes = build_pdf_bytes(join_sections(dynamic_sections))
+
+                starts = [marker.page_index for marker in markers]
+                ends = [start - 1 for start in starts[1:]] + [-1]
+                dynamic_parts = [(dynamic_bytes, start, end) for start, end in zip(starts, ends)]
+
+            front_parts = []
+            if front_matter:
+                cover_bytes = _get_static_pages('cover', korean_font, lambda s: build_cover_section(s, now), now)
+                toc_bytes = _get_static_pages('toc', korean_font, build_toc_section)
+                front_parts = [("표지", (cover_bytes, 0, -1)), ("목차", (toc_bytes, 0, -1))]
+            recommendation_bytes = _get_static_pages('recommendation', korean_font, build_recommendation_section)
+
+            titled_parts = [(title, part) for (title, _), part in zip(section_builders, dynamic_parts)]
+
+            # 정적 페이지와 페이지 단위 병합 후 쪽 번호/목차(outline) 정리
+            checkpoint()
+            with tracing.span('merge', parts=len(titled_parts) + len(front_parts) + 1):
+                pdf_bytes = _merge_pdf_parts(
+                    front_parts
+                    + titled_parts[:-1]
+                    + [("5. 전략적 권장사항", (recommendation_bytes, 0, -1)), titled_parts[-1]],
+                    numbered_from=1 if front_matter else 0
+                )
+
         print("✅ 고급 한글 분석 리포트 생성 성공")
         return pdf_bytes
-        
+
+    except RenderCancelled as e:
+        print(f"⏱️ 고급 리포트 렌더링 중단: {e}")
+        raise
+
     except Exception as e:
         print(f"❌ 고급 리포트 생성 오류: {e}")
         import traceback
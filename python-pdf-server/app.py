@@ -4,15 +4,38 @@
 AWS Demo Factory - 고급 한글 분석 리포트 생성 서버
 """
 
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, request, jsonify, send_file, g
 from flask_cors import CORS
+from werkzeug.exceptions import BadRequest, HTTPException
 import json
-import base64
 import io
+import os
+import threading
 from datetime import datetime
-from advanced_korean_report import create_advanced_korean_report
+from advanced_korean_report import create_advanced_korean_report, resolve_quality, DEFAULT_CHART_BACKEND, DEFAULT_QUALITY, QUALITY_CHARTS
+from report_model import build_report_model
+from request_coalescing import SingleFlight, canonical_payload_hash
+from http_caching import GENERATOR_VERSION, report_etag, not_modified_response, apply_cache_policy
+from warmup import WarmupState
+from admission_control import AdmissionController, AdmissionRejected, client_key
+from quality_policy import QualityPolicy, is_critical
+from deterministic import deterministic_scope, resolve_fixed_time
+from render_profiler import ProfilingSettings, profile_render
+from render_deadline import DeadlinePolicy, RenderCancelled, child_peak_rss
+from memory_watchdog import MemoryWatchdog
+from compression import RequestDecompressionMiddleware, compress_response, compression_settings_from_env, encoding_etag, negotiate_encoding
+from body_codecs import decode_request, encode_response, format_etag, negotiate_response_mimetype, representation_etag
+from object_store import ObjectStore
+from result_store import ResultStore
+from report_preview import PreviewCache, PreviewError, parse_preview_args, negotiate_image_format, render_page_image
+import layout_cache
+import metrics
+import tracing
 
 app = Flask(__name__)
+
+# 앞단 웹 서버(Apache/lighttpd 등)가 X-Sendfile을 처리하면 파일 전송을 위임
+app.config['USE_X_SENDFILE'] = os.environ.get('PDF_USE_X_SENDFILE', 'false').lower() == 'true'
 CORS(app, origins=[
     'http://localhost:3000', 
     'http://localhost:3001',
@@ -22,65 +45,454 @@ CORS(app, origins=[
     'https://www.awsdemofactory.cloud',
     'http://demo-factory-alb-10818307.ap-northeast-2.elb.amazonaws.com',
     'https://demo-factory-alb-10818307.ap-northeast-2.elb.amazonaws.com'
-], supports_credentials=True, max_age=86400)
+], supports_credentials=True, max_age=86400, expose_headers=['ETag', 'X-Report-Quality', 'traceresponse'])
 
-@app.route('/health', methods=['GET'])
-def health_check():
-    """서버 상태 확인"""
+# gzip/br/zstd 요청 본문 해제 + JSON 응답 압축
+max_request_bytes, compress_min_bytes = compression_settings_from_env()
+app.wsgi_app = RequestDecompressionMiddleware(app.wsgi_app, max_request_bytes)
+
+# 동시에 들어온 동일 페이로드는 한 번만 렌더링
+render_flight = SingleFlight()
+
+# 동시 렌더링 상한 + 출처별 속도 제한 (PDF_* 환경 변수로 설정)
+admission = AdmissionController.from_env()
+
+# 부하가 높으면 비필수 요청의 리포트 품질을 낮춤 (PDF_DEGRADE_* 환경 변수로 설정)
+quality_policy = QualityPolicy.from_env(admission.max_queued)
+
+# 렌더링 마감 시간 (초과 시 렌더링 프로세스 강제 종료)
+deadline_policy = DeadlinePolicy.from_env()
+
+# 온디맨드 렌더링 프로파일링 (기본 비활성, PDF_PROFILING_ENABLED + PDF_PROFILING_TOKEN)
+profiling = ProfilingSettings.from_env()
+
+# 응답 전송이 끝나지 않은 요청 수 (재시작 전 드레인 판단용)
+_open_requests = {'count': 0}
+_open_requests_lock = threading.Lock()
+
+def worker_idle():
+    """렌더링도, 전송 중인 응답도 없는지"""
+    with _open_requests_lock:
+        return _open_requests['count'] == 0 and admission.is_idle()
+
+# 메모리/렌더링 횟수 임계치를 넘으면 작업을 비운 뒤 워커 재시작
+watchdog = MemoryWatchdog.from_env(start_draining=admission.start_draining, is_idle=worker_idle)
+
+# 워커별 워밍업 상태 (readiness 판단용)
+warmup_state = WarmupState()
+
+# S3 호환 저장소 오프로드 (PDF_S3_BUCKET 미설정 시 None)
+object_store = ObjectStore.from_env()
+
+# 생성된 PDF 디스크 보관 (재시도/재다운로드 시 렌더링 생략, /reports/<id>로 다운로드)
+result_store = ResultStore.from_env()
+
+# 페이지 미리보기 이미지 캐시
+preview_cache = PreviewCache.from_env()
+
+# /test-pdf 입력은 상수이므로 결과를 메모리에 보관 (ETag별)
+_test_pdf_cache = {}
+
+@app.before_request
+def start_request_trace():
+    """프록시/클라이언트가 넘긴 traceparent를 이어받아 요청 span 시작"""
+    route = request.url_rule.rule if request.url_rule else request.path
+    g.trace_span = tracing.start_request_span(f'{request.method} {route}', request.headers.get('traceparent'), {
+        'http.method': request.method,
+        'http.route': route,
+        'http.target': request.full_path.rstrip('?')
+    })
+
+@app.after_request
+def finish_request_trace(response):
+    """응답 전송이 끝나면 요청 span 종료 (스트리밍 본문 인코딩/압축 포함)"""
+    span = g.pop('trace_span', None)
+    if span is not None:
+        response.headers['traceresponse'] = span.traceparent()
+        response.call_on_close(lambda: tracing.finish_request_span(span, response.status_code))
+    return response
+
+@app.teardown_request
+def detach_request_trace(error=None):
+    """after_request까지 가지 못한 요청(처리되지 않은 예외)의 span 종료"""
+    span = g.pop('trace_span', None)
+    if span is not None:
+        tracing.finish_request_span(span, 500, error)
+    tracing.detach_request_span()
+
+@app.before_request
+def track_request_open():
+    """요청 시작 - 응답 전송이 끝날 때까지 열린 요청으로 집계"""
+    with _open_requests_lock:
+        _open_requests['count'] += 1
+
+@app.after_request
+def track_request_close(response):
+    """응답 전송 완료 시 열린 요청 수 감소"""
+    def close():
+        with _open_requests_lock:
+            _open_requests['count'] -= 1
+    response.call_on_close(close)
+    return response
+
+@app.after_request
+def add_cache_headers(response):
+    """엔드포인트별 Cache-Control 적용"""
+    return apply_cache_policy(request, response)
+
+@app.after_request
+def add_compression(response):
+    """Accept-Encoding 협상 후 JSON 응답 압축"""
+    return compress_response(request, response, compress_min_bytes)
+
+def admitted_render(render, deadline):
+    """렌더링 슬롯을 확보한 뒤 마감 시간 안에서 실행하는 함수로 감싸기"""
+    def run():
+        with tracing.span('render', deadline_seconds=deadline.seconds):
+            waiting = tracing.start_span('admission.wait')
+            try:
+                with admission.render_slot():
+                    tracing.end_span(waiting)
+                    result = deadline_policy.run(render, deadline)
+            finally:
+                tracing.end_span(waiting)
+        watchdog.record_render(child_peak_rss())
+        return result
+    return run
+
+def stored_render(report_id, render):
+    """결과 저장소에 있으면 읽고, 없으면 렌더링 후 저장하는 함수로 감싸기"""
+    def run():
+        with tracing.span('result_store.read') as span:
+            pdf_bytes = result_store.read(report_id)
+            if span is not None:
+                span.set_attribute('hit', pdf_bytes is not None)
+        if pdf_bytes is not None:
+            print(f"💾 저장된 리포트 재사용: {report_id}")
+            return pdf_bytes
+        pdf_bytes = render()
+        if pdf_bytes:
+            try:
+                result_store.put(report_id, pdf_bytes)
+            except OSError as e:
+                print(f"⚠️ 리포트 저장 실패: {e}")
+        return pdf_bytes
+    return run
+
+def analytics_data_of(data):
+    """요청의 analyticsData (객체가 아니면 400)"""
+    analytics_data = data.get('analyticsData', {})
+    if not isinstance(analytics_data, dict):
+        raise BadRequest('analyticsData는 객체여야 합니다.')
+    return analytics_data
+
+def negotiated_etag(etag):
+    """이 요청에 보낼 표현(응답 형식 + 압축)의 ETag - If-None-Match는 이것과 정확히 비교
+
+    본문이 압축 최소 크기보다 작아 압축되지 않으면 실제 ETag와 달라 304를 놓칠 뿐 (다른 표현으로 304를 주지는 않음)
+    """
+    tag = format_etag(etag, negotiate_response_mimetype(request))
+    return encoding_etag(tag, negotiate_encoding(request.accept_encodings))
+
+def cancelled_response(cancelled):
+    """마감 시간 초과 응답"""
     return jsonify({
-        'status': 'healthy',
+        'success': False,
+        'error': f'렌더링 시간 초과: {cancelled}'
+    }), 504
+
+def rejection_response(rejection):
+    """429/503 거절 응답 (Retry-After 포함)"""
+    response = jsonify({
+        'success': False,
+        'error': str(rejection),
+        'retry_after': rejection.retry_after
+    })
+    response.status_code = rejection.status_code
+    response.headers['Retry-After'] = str(rejection.retry_after)
+    return response
+
+def readiness_payload():
+    """readiness 응답 본문 (워밍업 상태 + 대기열 깊이)"""
+    return {
+        'ready': warmup_state.ready and not admission.draining,
         'service': 'AWS Demo Factory PDF Generator',
         'timestamp': datetime.now().isoformat(),
-        'version': '8.0.0 - Advanced Korean Report with Working Charts'
+        'version': f'{GENERATOR_VERSION} - Advanced Korean Report with Working Charts',
+        'queue': {
+            'pending': render_flight.pending(),
+            'in_flight': render_flight.in_flight()
+        },
+        'warmup': warmup_state.to_dict()
+    }
+
+@app.route('/health', methods=['GET'])
+def health_check():
+    """서버 상태 확인 (워밍업 완료 전에는 503)"""
+    payload = readiness_payload()
+    payload['status'] = 'healthy' if payload['ready'] else 'warming_up'
+    return jsonify(payload), 200 if payload['ready'] else 503
+
+@app.route('/health/live', methods=['GET'])
+def liveness_check():
+    """liveness - 프로세스가 요청을 받을 수 있으면 성공"""
+    return jsonify({
+        'status': 'alive',
+        'timestamp': datetime.now().isoformat()
     })
 
+@app.route('/health/ready', methods=['GET'])
+def readiness_check():
+    """readiness - 워밍업이 끝나야 성공"""
+    payload = readiness_payload()
+    return jsonify(payload), 200 if payload['ready'] else 503
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """카운터/게이지 조회"""
+    payload = metrics.snapshot()
+    payload['admission'] = admission.stats()
+    payload['quality'] = quality_policy.to_dict()
+    payload['worker'] = watchdog.to_dict()
+    payload['object_store'] = object_store.to_dict() if object_store else None
+    payload['result_store'] = result_store.to_dict()
+    payload['layout_cache'] = layout_cache.to_dict()
+    payload['tracing'] = tracing.tracer.to_dict()
+    payload['queue'] = {
+        'pending': render_flight.pending(),
+        'in_flight': render_flight.in_flight()
+    }
+    return jsonify(payload)
+
+def offload_report(etag, pdf_bytes, filename):
+    """저장소에 업로드하고 URL 메타데이터 반환 (미설정/실패 시 None -> 본문 전송으로 대체)"""
+    if object_store is None:
+        print("⚠️ 저장소 오프로드가 설정되지 않아 PDF를 응답 본문으로 전송합니다.")
+        return None
+    try:
+        return object_store.offload(etag, pdf_bytes, filename)
+    except Exception as e:
+        metrics.increment('object_store.errors')
+        print(f"⚠️ S3 업로드 실패, 응답 본문으로 전송: {e}")
+        return None
+
+@app.route('/report-model', methods=['POST'])
+def report_model():
+    """리포트 지표/등급/순위만 계산해 반환 (PDF 레이아웃 없음)"""
+    try:
+        data = decode_request(request)
+        
+        if not data:
+            return encode_response(request, {
+                'success': False,
+                'error': '요청 데이터가 없습니다.'
+            }, status=400)
+        
+        analytics_data = analytics_data_of(data)
+        etag = report_etag(canonical_payload_hash({'reportModel': analytics_data}))
+        
+        not_modified = not_modified_response(request, negotiated_etag(etag))
+        if not_modified is not None:
+            return not_modified
+        
+        response = encode_response(request, {
+            'success': True,
+            'model': build_report_model(analytics_data),
+            'generated_at': datetime.now().isoformat()
+        })
+        response.set_etag(representation_etag(etag, response))
+        return response
+        
+    except HTTPException as e:
+        return encode_response(request, {
+            'success': False,
+            'error': e.description
+        }, status=e.code)
+        
+    except Exception as e:
+        print(f"❌ 리포트 모델 계산 오류: {e}")
+        import traceback
+        print(f"🔍 상세 오류:\n{traceback.format_exc()}")
+        
+        return jsonify({
+            'success': False,
+            'error': f'서버 오류: {str(e)}'
+        }), 500
+
 @app.route('/generate-pdf', methods=['POST'])
 def generate_pdf():
     """고급 한글 분석 리포트 생성"""
     try:
         print("📊 고급 한글 분석 리포트 생성 요청 받음")
         
-        # 요청 데이터 파싱
-        data = request.get_json()
+        # 출처별 속도 제한 (파싱 전에 빠르게 거절)
+        admission.check_rate(client_key(request))
+        
+        # 요청 데이터 파싱 (application/json 또는 application/msgpack)
+        with tracing.span('parse', content_type=request.mimetype, content_encoding=request.headers.get('Content-Encoding')):
+            data = decode_request(request)
         
         if not data:
-            return jsonify({
+            return encode_response(request, {
                 'success': False,
                 'error': '요청 데이터가 없습니다.'
-            }), 400
+            }, status=400)
         
         ai_insights = data.get('aiInsights', '')
-        analytics_data = data.get('analyticsData', {})
+        analytics_data = analytics_data_of(data)
+        chart_backend = data.get('chartBackend', DEFAULT_CHART_BACKEND)
+        # 섹션 병렬 렌더링 (결과 PDF는 같으므로 캐시 키에는 포함하지 않음)
+        parallel_sections = data.get('parallelSections')
+        # includeModel이면 PDF와 같은 리포트 모델을 응답에 함께 포함 (계산은 한 번)
+        include_model = bool(data.get('includeModel'))
+        # 'inline': 응답 본문에 PDF 포함, 'url': 저장소 업로드 후 다운로드 URL만 반환
+        delivery = data.get('delivery') or request.args.get('delivery', 'inline')
+        # 'draft' / 'standard' / 'full' - 부하가 높으면 critical이 아닌 요청은 낮춰서 렌더링
+        requested_quality = resolve_quality(data.get('quality') or request.args.get('quality'))
+        critical = is_critical(data.get('priority') or request.headers.get('X-Report-Priority'))
+        # 결정적 모드: 같은 입력이면 바이트까지 같은 PDF (reportTime으로 표지/파일명 시각 주입)
+        fixed_time = resolve_fixed_time(data.get('deterministic'), data.get('reportTime'))
+        
+        # 클라이언트 마감 시간 (초) - 서버 상한보다 길 수 없음
+        deadline = deadline_policy.deadline_for(data.get('renderTimeout') or request.headers.get('X-Render-Timeout'))
         
         print(f"🤖 AI 인사이트 길이: {len(ai_insights)}")
-        print(f"📊 분석 데이터: {list(analytics_data.keys()) if isinstance(analytics_data, dict) else type(analytics_data)}")
+        print(f"📊 분석 데이터: {list(analytics_data.keys())}")
+        
+        def hash_for(quality):
+            payload = {
+                'aiInsights': ai_insights,
+                'analyticsData': analytics_data
+            }
+            # 차트를 그리지 않는 품질(draft)은 차트 백엔드와 관계없이 같은 PDF이므로 키에서 제외
+            if QUALITY_CHARTS[quality]:
+                payload['chartBackend'] = chart_backend
+            # full은 품질 도입 전과 같은 키 (기존 ETag/저장 결과 유지)
+            if quality != DEFAULT_QUALITY:
+                payload['quality'] = quality
+            if fixed_time is not None:
+                payload['reportTime'] = fixed_time.isoformat()
+            return canonical_payload_hash(payload)
+        
+        quality = requested_quality
+        payload_hash = hash_for(quality)
+        etag = report_etag(payload_hash, fixed_time)
+        
+        # 클라이언트가 같은 리포트를 이미 가지고 있으면 렌더링 생략
+        not_modified = not_modified_response(request, negotiated_etag(etag))
+        if not_modified is not None:
+            print(f"♻️ 304 Not Modified: {etag}")
+            return not_modified
+        
+        # 요청 품질의 결과가 이미 저장돼 있으면 부하와 관계없이 그대로 사용
+        degraded_quality = quality_policy.effective_quality(requested_quality, critical, admission.load())
+        if degraded_quality != requested_quality and result_store.path_for(etag) is None:
+            quality = degraded_quality
+            payload_hash = hash_for(quality)
+            etag = report_etag(payload_hash, fixed_time)
+            metrics.increment(f'quality.degraded_to_{quality}')
+            print(f"📉 부하로 품질 하향: {requested_quality} -> {quality}")
+            
+            not_modified = not_modified_response(request, negotiated_etag(etag))
+            if not_modified is not None:
+                print(f"♻️ 304 Not Modified: {etag}")
+                return not_modified
+        
+        request_span = tracing.current_span()
+        if request_span is not None:
+            request_span.set_attribute('report.id', etag)
+            request_span.set_attribute('report.quality', quality)
+            request_span.set_attribute('report.degraded', quality != requested_quality)
+        
+        with tracing.span('model'):
+            model = build_report_model(analytics_data)
+        
+        def render():
+            with deterministic_scope(fixed_time):
+                return create_advanced_korean_report(ai_insights, analytics_data, chart_backend, model, parallel_sections, quality)
         
-        # 고급 한글 분석 리포트 생성
-        pdf_bytes = create_advanced_korean_report(ai_insights, analytics_data)
+        # 고급 한글 분석 리포트 생성 (동일 페이로드 동시 요청은 결과 공유, 저장된 결과는 재사용)
+        pdf_bytes, coalesced = render_flight.do(
+            payload_hash,
+            stored_render(etag, admitted_render(render, deadline)),
+            deadline
+        )
+        if request_span is not None:
+            request_span.set_attribute('report.coalesced', coalesced)
+        if coalesced:
+            print(f"🔗 진행 중인 렌더링 결과 공유: {payload_hash[:12]}")
         
         if not pdf_bytes:
-            return jsonify({
+            return encode_response(request, {
                 'success': False,
                 'error': 'PDF 생성에 실패했습니다.'
-            }), 500
+            }, status=500)
         
-        # Base64 인코딩
-        pdf_base64 = base64.b64encode(pdf_bytes).decode('utf-8')
-        
-        # 파일명 생성
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # 파일명 생성 (결정적 모드면 주입한 시각)
+        generated_at = fixed_time or datetime.now()
+        timestamp = generated_at.strftime("%Y%m%d_%H%M%S")
         filename = f"AWS_Demo_Factory_고급분석리포트_{timestamp}.pdf"
         
         print(f"✅ 고급 한글 리포트 생성 성공: {len(pdf_bytes)} bytes")
         
-        return jsonify({
-            'success': True,
-            'filename': filename,
-            'pdf_data': pdf_base64,
-            'size': len(pdf_bytes),
-            'generated_at': datetime.now().isoformat(),
-            'generator': 'Advanced Korean Analytics Report Generator v8.0'
-        })
+        # 응답에 함께 넣을 리포트 모델 (PDF 렌더링에 쓴 것과 동일)
+        extra = {'model': model} if include_model else {}
+        extra['quality'] = quality
+        if quality != requested_quality:
+            extra.update(requested_quality=requested_quality, degraded=True)
+        
+        if delivery == 'url':
+            with tracing.span('offload', size=len(pdf_bytes)):
+                offloaded = offload_report(etag, pdf_bytes, filename)
+            if offloaded is not None:
+                # 다운로드 URL은 만료되므로 ETag를 붙이지 않음
+                with tracing.span('encode', delivery='url'):
+                    response = encode_response(request, dict({
+                        'success': True,
+                        'filename': filename,
+                        'delivery': 'url',
+                        'report_id': etag,
+                        'report_url': f'/reports/{etag}',
+                        'size': len(pdf_bytes),
+                        'generated_at': generated_at.isoformat(),
+                        'generator': 'Advanced Korean Analytics Report Generator v8.0'
+                    }, **offloaded, **extra))
+                response.headers['X-Report-Quality'] = quality
+                return response
+        
+        # JSON이면 pdf_data는 Base64, msgpack이면 바이너리 그대로
+        # (스트리밍 응답의 Base64/압축은 전송 중에 일어나므로 요청 span 끝까지 포함됨)
+        with tracing.span('encode', delivery='inline'):
+            response = encode_response(request, dict({
+                'success': True,
+                'filename': filename,
+                'delivery': 'inline',
+                'report_id': etag,
+                'report_url': f'/reports/{etag}',
+                'pdf_data': pdf_bytes,
+                'size': len(pdf_bytes),
+                'generated_at': generated_at.isoformat(),
+                'generator': 'Advanced Korean Analytics Report Generator v8.0'
+            }, **extra), binary_fields=('pdf_data',))
+        response.set_etag(representation_etag(etag, response))
+        response.headers['X-Report-Quality'] = quality
+        return response
+        
+    except AdmissionRejected as rejection:
+        print(f"🚦 요청 거절 ({rejection.status_code}): {rejection}")
+        return rejection_response(rejection)
+        
+    except RenderCancelled as cancelled:
+        print(f"⏱️ 렌더링 중단: {cancelled}")
+        return cancelled_response(cancelled)
+        
+    except HTTPException as e:
+        # 잘못된 압축 본문(400), 너무 큰 본문(413) 등
+        print(f"⚠️ 요청 오류 ({e.code}): {e.description}")
+        return encode_response(request, {
+            'success': False,
+            'error': e.description
+        }, status=e.code)
         
     except Exception as e:
         print(f"❌ PDF 생성 오류: {e}")
@@ -92,67 +504,209 @@ def generate_pdf():
             'error': f'서버 오류: {str(e)}'
         }), 500
 
+TEST_INSIGHTS = "카테고리별 세분화된 분석과 시각적 차트가 포함된 종합 리포트입니다."
+
+TEST_ANALYTICS_DATA = {
+    'totalVisitors': 1,
+    'totalPageViews': 32,
+    'totalContentViews': 5,
+    'period': '2025년 6월',
+    'category': [
+        {'category': 'Manufacturing', 'count': 9},
+        {'category': 'Generative AI', 'count': 7},
+        {'category': 'Retail/CPG', 'count': 6},
+        {'category': 'Finance', 'count': 6},
+        {'category': 'Telco/Media', 'count': 4}
+    ],
+    'content': [
+        {'title': 'AWS 제조업 솔루션 종합 가이드', 'views': 6},
+        {'title': 'Generative AI 실무 적용 사례', 'views': 3},
+        {'title': '클라우드 마이그레이션 전략 수립', 'views': 2},
+        {'title': '데이터 분석 프레임워크 구축', 'views': 2},
+        {'title': '보안 아키텍처 설계 가이드', 'views': 1}
+    ],
+    'time': [
+        {'hour': 14, 'count': 13},
+        {'hour': 15, 'count': 11},
+        {'hour': 16, 'count': 4},
+        {'hour': 17, 'count': 3},
+        {'hour': 18, 'count': 1}
+    ]
+}
+
+TEST_PAYLOAD_HASH = canonical_payload_hash({
+    'aiInsights': TEST_INSIGHTS,
+    'analyticsData': TEST_ANALYTICS_DATA,
+    'chartBackend': DEFAULT_CHART_BACKEND
+})
+
+@app.route('/reports/<report_id>', methods=['GET'])
+def download_report(report_id):
+    """저장된 리포트 다운로드 (렌더링 경로/수용 제어를 거치지 않음)"""
+    path = result_store.path_for(report_id)
+    if path is None:
+        return jsonify({
+            'success': False,
+            'error': '리포트가 없거나 만료되었습니다.'
+        }), 404
+    
+    # 파일 경로를 넘기면 본문을 메모리에 올리지 않고 wsgi.file_wrapper(sendfile)로 전송
+    response = send_file(
+        path,
+        mimetype='application/pdf',
+        as_attachment=True,
+        download_name=f'AWS_Demo_Factory_고급분석리포트_{report_id[:8]}.pdf',
+        etag=report_id,
+        conditional=True
+    )
+    metrics.increment('result_store.downloads')
+    return response
+
+@app.route('/reports/<report_id>/preview', methods=['GET'])
+def report_preview(report_id):
+    """저장된 리포트 페이지 미리보기 (?page=1&width=400, WebP 또는 PNG)"""
+    try:
+        page, width = parse_preview_args(request.args)
+        image_format = negotiate_image_format(request)
+        
+        path = result_store.path_for(report_id)
+        if path is None:
+            raise PreviewError(404, '리포트가 없거나 만료되었습니다.')
+        
+        etag = f'{report_id}-p{page}-w{width}-{image_format}'
+        not_modified = not_modified_response(request, etag)
+        if not_modified is None:
+            image = preview_cache.get_or_render(
+                (report_id, page, width, image_format),
+                lambda: render_page_image(path, page, width, image_format)
+            )
+            response = app.response_class(image, mimetype=f'image/{image_format}')
+        else:
+            response = not_modified
+        
+        response.set_etag(etag)
+        response.vary.add('Accept')
+        return response
+        
+    except PreviewError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), e.status_code
+
 @app.route('/test-pdf', methods=['GET'])
 def test_pdf():
     """고급 한글 리포트 테스트"""
     try:
-        test_insights = "카테고리별 세분화된 분석과 시각적 차트가 포함된 종합 리포트입니다."
-        
-        test_data = {
-            'totalVisitors': 1,
-            'totalPageViews': 32,
-            'totalContentViews': 5,
-            'period': '2025년 6월',
-            'category': [
-                {'category': 'Manufacturing', 'count': 9},
-                {'category': 'Generative AI', 'count': 7},
-                {'category': 'Retail/CPG', 'count': 6},
-                {'category': 'Finance', 'count': 6},
-                {'category': 'Telco/Media', 'count': 4}
-            ],
-            'content': [
-                {'title': 'AWS 제조업 솔루션 종합 가이드', 'views': 6},
-                {'title': 'Generative AI 실무 적용 사례', 'views': 3},
-                {'title': '클라우드 마이그레이션 전략 수립', 'views': 2},
-                {'title': '데이터 분석 프레임워크 구축', 'views': 2},
-                {'title': '보안 아키텍처 설계 가이드', 'views': 1}
-            ],
-            'time': [
-                {'hour': 14, 'count': 13},
-                {'hour': 15, 'count': 11},
-                {'hour': 16, 'count': 4},
-                {'hour': 17, 'count': 3},
-                {'hour': 18, 'count': 1}
-            ]
-        }
-        
-        pdf_bytes = create_advanced_korean_report(test_insights, test_data)
+        etag = report_etag(TEST_PAYLOAD_HASH)
+        
+        not_modified = not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+        
+        pdf_bytes = _test_pdf_cache.get(etag)
+        if pdf_bytes is None:
+            deadline = deadline_policy.deadline_for()
+            pdf_bytes, _ = render_flight.do(
+                TEST_PAYLOAD_HASH,
+                admitted_render(lambda: create_advanced_korean_report(TEST_INSIGHTS, TEST_ANALYTICS_DATA), deadline),
+                deadline
+            )
+            if pdf_bytes:
+                # 날짜가 바뀌면 이전 결과는 버림
+                _test_pdf_cache.clear()
+                _test_pdf_cache[etag] = pdf_bytes
         
         if pdf_bytes:
-            pdf_io = io.BytesIO(pdf_bytes)
-            pdf_io.seek(0)
-            
-            return send_file(
-                pdf_io,
+            response = send_file(
+                io.BytesIO(pdf_bytes),
                 mimetype='application/pdf',
                 as_attachment=True,
                 download_name='고급_한글_분석_리포트.pdf'
             )
+            response.set_etag(etag)
+            return response
         else:
             return jsonify({'error': 'PDF 생성 실패'}), 500
             
+    except AdmissionRejected as rejection:
+        return rejection_response(rejection)
+        
+    except RenderCancelled as cancelled:
+        return cancelled_response(cancelled)
+        
     except Exception as e:
         print(f"❌ 테스트 PDF 오류: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/debug/profile', methods=['POST'])
+def debug_profile():
+    """/generate-pdf와 같은 페이로드를 프로파일링하며 렌더링 (저장소/결과 공유 없이 항상 새로)
+
+    ?format=folded 이면 flamegraph용 folded 스택만 text/plain으로 반환
+    """
+    if not profiling.enabled:
+        return jsonify({'success': False, 'error': 'Not Found'}), 404
+    if not profiling.authorized(request):
+        return jsonify({'success': False, 'error': '인증이 필요합니다.'}), 401
+    
+    try:
+        data = decode_request(request)
+        if not data:
+            return jsonify({'success': False, 'error': '요청 데이터가 없습니다.'}), 400
+        
+        ai_insights = data.get('aiInsights', '')
+        analytics_data = analytics_data_of(data)
+        chart_backend = data.get('chartBackend', DEFAULT_CHART_BACKEND)
+        quality = resolve_quality(data.get('quality'))
+        fixed_time = resolve_fixed_time(data.get('deterministic'), data.get('reportTime'))
+        deadline = deadline_policy.deadline_for(data.get('renderTimeout') or request.headers.get('X-Render-Timeout'))
+        
+        def render():
+            # 섹션 병렬 렌더링은 다른 프로세스라 프로파일에 잡히지 않으므로 항상 순차
+            with deterministic_scope(fixed_time):
+                pdf_bytes, profile = profile_render(
+                    lambda: create_advanced_korean_report(ai_insights, analytics_data, chart_backend, None, False, quality),
+                    profiling.top, profiling.sample_interval
+                )
+            profile['pdf_size'] = len(pdf_bytes) if pdf_bytes else 0
+            return profile
+        
+        profile = admitted_render(render, deadline)()
+        metrics.increment('debug.profiles')
+        print(f"🔬 프로파일링 렌더링 완료: {profile['render_seconds']}초, 샘플 {profile['samples']}개")
+        
+        if request.args.get('format') == 'folded':
+            return app.response_class(profile['folded_stacks'] + '\n', mimetype='text/plain')
+        return jsonify(dict({'success': True, 'quality': quality}, **profile))
+        
+    except AdmissionRejected as rejection:
+        return rejection_response(rejection)
+        
+    except RenderCancelled as cancelled:
+        return cancelled_response(cancelled)
+        
+    except HTTPException as e:
+        return jsonify({'success': False, 'error': e.description}), e.code
+        
+    except Exception as e:
+        print(f"❌ 프로파일링 오류: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 if __name__ == '__main__':
     print("🚀 고급 한글 분석 리포트 생성 서버 시작...")
     print("📊 카테고리별 세분화 + 확실한 차트 + 완벽한 한글")
     print("🔗 서버 URL: http://localhost:5002")
     print("🧪 테스트 URL: http://localhost:5002/test-pdf")
     
+    debug = True
+    
+    # 정적 페이지 + 대표 리포트 워밍업 (reloader 부모 프로세스는 제외)
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        warmup_state.start()
+    
     app.run(
         host='0.0.0.0',
         port=5002,
-        debug=True
+        debug=debug
     )
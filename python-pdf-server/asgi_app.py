@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ASGI 진입점 - app.py의 라우트를 그대로 asyncio 서버(uvicorn 등)에서 제공
+
+- 연결 대기/요청 본문 수신/응답 전송은 이벤트 루프에서 처리 (느린 연결이 스레드를 잡지 않음)
+- 헬스 체크/메트릭은 루프에서 바로 응답 (렌더링 대기열 뒤에 서지 않음)
+- 렌더링 라우트와 나머지 라우트는 서로 다른 스레드 풀에서 실행
+  (렌더링 자체는 render_deadline의 포크된 프로세스에서 수행)
+
+실행: uvicorn asgi_app:app --host 0.0.0.0 --port 5002
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.wsgi import FileWrapper
+
+import app as flask_module
+
+flask_app = flask_module.app
+
+# 이벤트 루프에서 바로 처리하는 가벼운 라우트 (블로킹 I/O 없음)
+PROBE_PATHS = frozenset(['/health', '/health/live', '/health/ready', '/metrics'])
+
+# 렌더링 슬롯을 기다릴 수 있는 라우트
+RENDER_PATHS = frozenset(['/generate-pdf', '/test-pdf', '/debug/profile'])
+
+# 요청 본문이 이보다 크면 메모리 대신 임시 파일에 받음
+SPOOL_MAX_MEMORY = 1024 * 1024
+
+# 파일 응답(send_file)을 읽는 단위
+FILE_CHUNK_SIZE = 256 * 1024
+
+_admission = flask_module.admission
+
+# 슬롯 대기 + 수용 제어 거절 응답까지 스레드가 모자라지 않도록 여유 있게
+_render_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('PDF_ASGI_RENDER_THREADS', (_admission.max_concurrent + _admission.max_queued) * 2)),
+    thread_name_prefix='pdf-asgi-render'
+)
+_io_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('PDF_ASGI_IO_THREADS', 32)),
+    thread_name_prefix='pdf-asgi-io'
+)
+
+class _BodyTooLarge(Exception):
+    pass
+
+async def _read_body(receive, max_bytes):
+    """요청 본문을 비동기로 끝까지 받아 파일 객체로 반환"""
+    body = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    size = 0
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            body.close()
+            return None
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if max_bytes and size > max_bytes:
+            body.close()
+            raise _BodyTooLarge()
+        body.write(chunk)
+        more_body = message.get('more_body', False)
+    body.seek(0)
+    return body, size
+
+def _build_environ(scope, body, body_size):
+    """ASGI scope -> WSGI environ"""
+    server = scope.get('server') or ('localhost', 5002)
+    client = scope.get('client') or ('', 0)
+    script_name = scope.get('root_path', '')
+    path = scope['path']
+    if script_name and path.startswith(script_name):
+        path = path[len(script_name):]
+
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': script_name.encode('utf-8').decode('latin-1'),
+        'PATH_INFO': path.encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': body,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+        'wsgi.input_terminated': True,
+        # send_file 응답을 큰 단위로 읽어 루프 <-> 스레드 왕복을 줄임
+        'wsgi.file_wrapper': lambda file, block_size=FILE_CHUNK_SIZE: FileWrapper(file, max(block_size, FILE_CHUNK_SIZE)),
+        'CONTENT_LENGTH': str(body_size)
+    }
+
+    for raw_name, raw_value in scope.get('headers', []):
+        name = raw_name.decode('latin-1').upper().replace('-', '_')
+        value = raw_value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+            continue
+        if name == 'CONTENT_LENGTH':
+            continue
+        key = f'HTTP_{name}'
+        environ[key] = f'{environ[key]},{value}' if key in environ else value
+
+    return environ
+
+def _start_wsgi(environ):
+    """WSGI 앱 호출 -> (상태 코드, 헤더, 응답 iterable)"""
+    started = {}
+    written = []
+
+    def start_response(status, headers, exc_info=None):
+        if exc_info and started:
+            raise exc_info[1].with_traceback(exc_info[2])
+        started['status'] = int(status.split(' ', 1)[0])
+        started['headers'] = [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+        return written.append
+
+    iterable = flask_app(environ, start_response)
+    if written:
+        # 구식 write() 호출로 보낸 본문은 앞에 붙임
+        iterable = _prepend(written, iterable)
+    return started['status'], started['headers'], iterable
+
+def _prepend(chunks, iterable):
+    yield from chunks
+    yield from iterable
+
+def _next_chunk(iterator):
+    return next(iterator, None)
+
+async def _send_wsgi_response(send, status, headers, iterable, executor):
+    """응답 iterable을 청크 단위로 전송 (다음 청크는 스레드에서 읽음, executor가 None이면 루프에서 바로)"""
+    loop = asyncio.get_running_loop()
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    try:
+        if executor is None or isinstance(iterable, (list, tuple)):
+            for chunk in iterable:
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        else:
+            iterator = iter(iterable)
+            while True:
+                chunk = await loop.run_in_executor(executor, _next_chunk, iterator)
+                if chunk is None:
+                    break
+                if chunk:
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+    finally:
+        # Flask의 call_on_close(열린 요청 집계 등) 실행
+        if hasattr(iterable, 'close'):
+            iterable.close()
+
+async def _send_simple(send, status, message):
+    body = message.encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'text/plain; charset=utf-8'), (b'content-length', str(len(body)).encode())]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            flask_module.warmup_state.start()
+            print("🚀 ASGI PDF 서버 시작 (워밍업 진행 중)")
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            # 새 렌더링은 거절하고 스레드 풀 정리
+            _admission.start_draining()
+            _render_executor.shutdown(wait=False)
+            _io_executor.shutdown(wait=False)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def app(scope, receive, send):
+    """ASGI 애플리케이션"""
+    if scope['type'] == 'lifespan':
+        await _lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    try:
+        received = await _read_body(receive, flask_module.max_request_bytes)
+    except _BodyTooLarge:
+        await _send_simple(send, 413, '요청 본문이 너무 큽니다.')
+        return
+    if received is None:
+        # 본문을 다 보내기 전에 연결이 끊김
+        return
+
+    body, body_size = received
+    environ = _build_environ(scope, body, body_size)
+    path = environ['PATH_INFO']
+
+    try:
+        if path in PROBE_PATHS:
+            # 작은 본문이므로 읽기도 루프에서 (다운로드 전송 대기열 뒤에 서지 않음)
+            status, headers, iterable = _start_wsgi(environ)
+            response_executor = None
+        else:
+            executor = _render_executor if path in RENDER_PATHS else _io_executor
+            loop = asyncio.get_running_loop()
+            status, headers, iterable = await loop.run_in_executor(executor, _start_wsgi, environ)
+            response_executor = _io_executor
+
+        await _send_wsgi_response(send, status, headers, iterable, response_executor)
+    finally:
+        body.close()
+
+if __name__ == '__main__':
+    try:
+        import uvicorn
+    except ImportError:
+        print("❌ uvicorn이 설치되어 있지 않습니다: pip install uvicorn")
+        sys.exit(1)
+
+    print("🚀 고급 한글 분석 리포트 생성 서버 시작 (ASGI)...")
+    print("🔗 서버 URL: http://localhost:5002")
+    uvicorn.run(app, host='0.0.0.0', port=5002, timeout_keep_alive=75)
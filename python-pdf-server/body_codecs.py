@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+요청/응답 본문 코덱 - Content-Type / Accept 협상
+
+- application/json: orjson이 있으면 사용, 없으면 표준 json
+- application/msgpack: msgpack (PDF는 base64 대신 바이너리 그대로)
+- JSON의 바이너리 필드(pdf_data)는 base64 문자열을 만들지 않고 청크 단위로 인코딩하며 스트리밍
+"""
+
+import base64
+import json
+import uuid
+
+from flask import Response
+from werkzeug.exceptions import BadRequest, UnsupportedMediaType
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON_MIMETYPE = 'application/json'
+MSGPACK_MIMETYPE = 'application/msgpack'
+MSGPACK_MIMETYPES = (MSGPACK_MIMETYPE, 'application/x-msgpack')
+
+# 한 번에 base64로 인코딩할 원본 크기 (3의 배수여야 청크 사이에 패딩이 끼지 않음)
+BASE64_CHUNK_SIZE = 3 * 64 * 1024
+
+def _json_loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _json_dumps(payload):
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False).encode('utf-8')
+
+def supported_response_mimetypes():
+    """응답으로 보낼 수 있는 MIME 타입 (선호 순)"""
+    mimetypes = [JSON_MIMETYPE]
+    if msgpack is not None:
+        mimetypes.append(MSGPACK_MIMETYPE)
+    return mimetypes
+
+def decode_request(request):
+    """Content-Type에 맞춰 요청 본문 파싱 (본문이 없으면 None, 객체가 아니면 400)"""
+    mimetype = request.mimetype
+    data = request.get_data(cache=False)
+
+    try:
+        if mimetype in MSGPACK_MIMETYPES:
+            if msgpack is None:
+                raise UnsupportedMediaType('msgpack이 설치되어 있지 않습니다.')
+            payload = msgpack.unpackb(data, raw=False)
+        elif mimetype == JSON_MIMETYPE or mimetype.endswith('+json'):
+            payload = _json_loads(data) if data else None
+        else:
+            raise UnsupportedMediaType(f'지원하지 않는 Content-Type: {mimetype or "없음"}')
+
+    except (ValueError, TypeError) as e:
+        raise BadRequest(f'요청 본문 파싱 실패: {e}')
+
+    if payload is not None and not isinstance(payload, dict):
+        raise BadRequest('요청 본문은 객체여야 합니다.')
+    return payload
+
+def negotiate_response_mimetype(request):
+    """Accept 헤더로 응답 형식 결정 (기본 JSON)"""
+    return request.accept_mimetypes.best_match(supported_response_mimetypes(), default=JSON_MIMETYPE)
+
+def _base64_length(size):
+    return (size + 2) // 3 * 4
+
+def _base64_chunks(data):
+    """data를 복사하지 않고(memoryview) 잘라 base64 청크로"""
+    view = memoryview(data).cast('B')
+    for start in range(0, len(view), BASE64_CHUNK_SIZE):
+        yield base64.b64encode(view[start:start + BASE64_CHUNK_SIZE])
+
+def _stream_json(payload, fields):
+    """바이너리 필드 자리에 base64 청크를 끼워 넣는 JSON 스트림 -> (청크 iterator, 전체 길이)
+
+    다른 필드는 한 번에 직렬화하고, 바이너리 필드 자리는 고유한 자리 표시 문자열로 나눈다.
+    """
+    placeholders = {field: f'@binary:{field}:{uuid.uuid4().hex}@' for field in fields}
+    rest = _json_dumps(dict(payload, **placeholders))
+
+    # [(앞부분 JSON, 바이너리 값), ...] + 남은 JSON (자리 표시 문자열의 따옴표는 그대로 둠)
+    segments = []
+    for field, placeholder in sorted(placeholders.items(), key=lambda item: rest.index(item[1].encode('ascii'))):
+        head, rest = rest.split(placeholder.encode('ascii'), 1)
+        segments.append((head, payload[field]))
+
+    def generate():
+        for head, data in segments:
+            yield head
+            yield from _base64_chunks(data)
+        yield rest
+
+    length = sum(len(head) + _base64_length(memoryview(data).nbytes) for head, data in segments) + len(rest)
+    return generate(), length
+
+def encode_response(request, payload, status=200, binary_fields=()):
+    """협상된 형식으로 응답 생성
+
+    binary_fields의 bytes 값은 JSON에서는 base64 문자열, msgpack에서는 바이너리로 보낸다.
+    JSON은 base64 문자열과 JSON 문서 전체를 메모리에 만들지 않고 스트리밍한다 (Content-Length는 미리 계산).
+    """
+    mimetype = negotiate_response_mimetype(request)
+
+    if mimetype == MSGPACK_MIMETYPE:
+        response = Response(msgpack.packb(payload, use_bin_type=True), status=status, mimetype=mimetype)
+    else:
+        fields = [field for field in binary_fields if isinstance(payload.get(field), (bytes, bytearray, memoryview))]
+        if fields:
+            chunks, length = _stream_json(payload, fields)
+            response = Response(chunks, status=status, mimetype=mimetype)
+            response.content_length = length
+        else:
+            response = Response(_json_dumps(payload), status=status, mimetype=mimetype)
+
+    response.vary.add('Accept')
+    return response
+
+def format_etag(etag, mimetype):
+    """형식마다 다른 표현이므로 JSON 외 형식은 강한 ETag를 구분"""
+    if mimetype == JSON_MIMETYPE:
+        return etag
+    return f'{etag}-msgpack'
+
+def representation_etag(etag, response):
+    """만든 응답의 형식에 맞춘 ETag"""
+    return format_etag(etag, response.mimetype)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+차트 백엔드 벤치마크 - reportlab / stream / matplotlib 비교
+
+사용법: python chart_benchmark.py [반복 횟수]
+각 백엔드로 바/파이/라인 차트를 만들어 PDF 캔버스에 그리는 데 걸리는 시간을 측정한다.
+"""
+
+import contextlib
+import io
+import sys
+import time
+
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import A4
+
+from advanced_korean_report import CHART_BACKENDS
+
+CATEGORY_DATA = {
+    'labels': ['Manufacturing', 'Generative AI', 'Retail/CPG', 'Finance', 'Telco/Media'],
+    'values': [9, 7, 6, 6, 4]
+}
+TIME_DATA = {
+    'labels': [14, 15, 16, 17, 18],
+    'values': [13, 11, 4, 3, 1]
+}
+
+def _draw_charts(chart_fns, canv):
+    bar_chart_fn, pie_chart_fn, line_chart_fn = chart_fns
+    charts = [
+        bar_chart_fn(CATEGORY_DATA, 500, 280),
+        pie_chart_fn(CATEGORY_DATA, 400, 320),
+        line_chart_fn(TIME_DATA, 500, 250)
+    ]
+    for chart in charts:
+        chart.drawOn(canv, 40, 40)
+
+def _draw_matplotlib_charts(generator, canv):
+    for chart_type, chart_data in (('bar', CATEGORY_DATA), ('pie', CATEGORY_DATA), ('line', TIME_DATA)):
+        image_bytes = generator.create_chart(chart_data, chart_type, '차트')
+        canv.drawImage(canvas.ImageReader(io.BytesIO(image_bytes)), 40, 40, 500, 280)
+
+def run_benchmark(iterations=200):
+    """백엔드별 차트 1개당 평균 시간(µs) 반환"""
+    results = {}
+    targets = {name: (lambda fns: lambda canv: _draw_charts(fns, canv))(fns) for name, fns in CHART_BACKENDS.items()}
+
+    try:
+        from pdf_generator import KoreanPDFGenerator
+        generator = KoreanPDFGenerator()
+        targets['matplotlib'] = lambda canv: _draw_matplotlib_charts(generator, canv)
+    except ImportError as e:
+        print(f"⚠️ matplotlib 백엔드 제외: {e}")
+
+    for name, target in targets.items():
+        # matplotlib은 느리므로 반복 횟수를 줄인다
+        rounds = max(1, iterations // 50) if name == 'matplotlib' else iterations
+        canv = canvas.Canvas(io.BytesIO(), pagesize=A4)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            target(canv)  # 워밍업
+            start = time.perf_counter()
+            for _ in range(rounds):
+                target(canv)
+            elapsed = time.perf_counter() - start
+
+        results[name] = elapsed / (rounds * 3) * 1e6
+
+    return results
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    print(f"📊 차트 백엔드 벤치마크 (반복 {iterations}회)")
+    for name, micros in sorted(run_benchmark(iterations).items(), key=lambda item: item[1]):
+        print(f"  {name:<12} {micros:>10.1f} µs/차트")
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+요청/응답 본문 압축 - gzip / brotli / zstd
+
+- 요청: Content-Encoding에 맞춰 wsgi.input을 스트리밍으로 해제 (본문을 두 번 버퍼링하지 않음)
+- 응답: Accept-Encoding 협상 후 일정 크기 이상의 JSON/msgpack 응답 압축
+  (스트리밍 응답은 청크 단위로 압축해 본문 전체를 메모리에 모으지 않음)
+"""
+
+import io
+import os
+import zlib
+
+from werkzeug.exceptions import BadRequest, RequestEntityTooLarge
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+import metrics
+
+READ_CHUNK_SIZE = 64 * 1024
+
+# 압축 대상 응답 형식
+COMPRESSIBLE_MIMETYPES = ('application/json', 'application/msgpack')
+
+class _ZlibReader:
+    """gzip 해제 - 호출마다 출력 크기를 제한하고 남은 입력(unconsumed_tail)은 다음 호출로 넘김"""
+
+    def __init__(self, raw):
+        self._raw = raw
+        # 16 + MAX_WBITS: gzip 헤더 포함
+        self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        self._tail = b''
+
+    def read(self, size):
+        while True:
+            if self._tail:
+                data, self._tail = self._tail, b''
+            else:
+                data = self._raw.read(READ_CHUNK_SIZE)
+                if not data:
+                    return self._decompressor.flush(size)
+            output = self._decompressor.decompress(data, size)
+            self._tail = self._decompressor.unconsumed_tail
+            if output:
+                return output
+
+class _BrotliReader:
+    """brotli 해제 - output_buffer_limit로 출력 제한, 남은 출력은 빈 입력으로 이어서 꺼냄"""
+
+    def __init__(self, raw):
+        self._raw = raw
+        self._decompressor = brotli.Decompressor()
+        # 출력 버퍼가 한도를 조금 넘겨 자랄 수 있어 넘친 부분은 다음 호출에 돌려줌
+        self._buffer = b''
+        self._eof = False
+
+    def read(self, size):
+        while not self._buffer and not self._decompressor.is_finished():
+            data = b''
+            if self._decompressor.can_accept_more_data() and not self._eof:
+                data = self._raw.read(READ_CHUNK_SIZE)
+                self._eof = not data
+            self._buffer = self._decompressor.process(data, output_buffer_limit=size)
+            if not self._buffer and self._eof and not self._decompressor.is_finished():
+                raise BadRequest('압축 해제 실패: brotli 본문이 중간에 끝났습니다.')
+
+        output, self._buffer = self._buffer[:size], self._buffer[size:]
+        return output
+
+def _zstd_reader(raw):
+    # stream_reader.read(n)은 최대 n 바이트만 해제
+    return zstandard.ZstdDecompressor().stream_reader(raw, read_size=READ_CHUNK_SIZE)
+
+def _gzip_compress(data):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+# 인코딩 이름 -> (압축 함수, 해제 리더 팩토리 (raw -> read(size)가 최대 size 바이트를 돌려주는 객체))
+CODECS = {'gzip': (_gzip_compress, _ZlibReader)}
+
+if brotli is not None:
+    CODECS['br'] = (lambda data: brotli.compress(data, quality=5), _BrotliReader)
+
+if zstandard is not None:
+    CODECS['zstd'] = (lambda data: zstandard.ZstdCompressor(level=3).compress(data), _zstd_reader)
+
+def _gzip_stream_compressor():
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress, compressor.flush
+
+# 인코딩 이름 -> 스트리밍 압축기 팩토리 ((청크 압축 함수, 마무리 함수))
+STREAM_COMPRESSORS = {'gzip': _gzip_stream_compressor}
+
+if brotli is not None:
+    def _brotli_stream_compressor():
+        compressor = brotli.Compressor(quality=5)
+        return compressor.process, compressor.finish
+    STREAM_COMPRESSORS['br'] = _brotli_stream_compressor
+
+if zstandard is not None:
+    def _zstd_stream_compressor():
+        compressor = zstandard.ZstdCompressor(level=3).compressobj()
+        return compressor.compress, compressor.flush
+    STREAM_COMPRESSORS['zstd'] = _zstd_stream_compressor
+
+# 응답 압축 선호 순서 (압축률/속도 기준)
+RESPONSE_PREFERENCE = ['zstd', 'br', 'gzip']
+
+class DecompressingStream(io.RawIOBase):
+    """압축된 wsgi.input을 읽는 만큼만 해제하는 스트림
+
+    한 번에 해제하는 양을 남은 허용 크기 + 1 바이트로 제한해, 압축 폭탄도
+    max_bytes를 넘는 순간 (그 이상 메모리를 쓰기 전에) 413으로 끝낸다.
+    """
+
+    def __init__(self, reader, max_bytes):
+        self._reader = reader
+        self._max_bytes = max_bytes
+        self._total = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, target):
+        size = len(target)
+        if self._max_bytes:
+            size = min(size, self._max_bytes - self._total + 1)
+        try:
+            output = self._reader.read(size)
+        except (BadRequest, RequestEntityTooLarge):
+            raise
+        except Exception as e:
+            raise BadRequest(f'압축 해제 실패: {e}')
+
+        self._total += len(output)
+        if self._max_bytes and self._total > self._max_bytes:
+            raise RequestEntityTooLarge(f'해제된 요청 본문이 {self._max_bytes} bytes를 초과합니다.')
+
+        target[:len(output)] = output
+        return len(output)
+
+class RequestDecompressionMiddleware:
+    """Content-Encoding 요청 본문을 투명하게 해제하는 WSGI 미들웨어"""
+
+    def __init__(self, wsgi_app, max_bytes):
+        self.wsgi_app = wsgi_app
+        self.max_bytes = max_bytes
+
+    def __call__(self, environ, start_response):
+        encoding = environ.get('HTTP_CONTENT_ENCODING', '').strip().lower()
+
+        if encoding and encoding != 'identity':
+            codec = CODECS.get(encoding)
+            if codec is None:
+                return BadRequest(f'지원하지 않는 Content-Encoding: {encoding}')(environ, start_response)
+
+            metrics.increment(f'compression.request.{encoding}')
+            environ['wsgi.input'] = io.BufferedReader(
+                DecompressingStream(codec[1](environ['wsgi.input']), self.max_bytes),
+                READ_CHUNK_SIZE
+            )
+            # 해제 후 길이는 알 수 없으므로 스트림 끝까지 읽게 함
+            environ.pop('CONTENT_LENGTH', None)
+            environ.pop('HTTP_CONTENT_ENCODING', None)
+            environ['wsgi.input_terminated'] = True
+
+        return self.wsgi_app(environ, start_response)
+
+def negotiate_encoding(accept_encoding):
+    """Accept-Encoding에서 지원하는 가장 선호되는 인코딩 선택"""
+    for encoding in RESPONSE_PREFERENCE:
+        if encoding in CODECS and accept_encoding[encoding] > 0:
+            return encoding
+    return None
+
+def compress_response(request, response, min_bytes):
+    """after_request 훅 - JSON/msgpack 응답을 협상된 인코딩으로 압축"""
+    if (response.direct_passthrough
+            or response.status_code < 200 or response.status_code in (204, 304)
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    response.vary.add('Accept-Encoding')
+
+    encoding = negotiate_encoding(request.accept_encodings)
+
+    if response.is_streamed:
+        # 길이를 알고 있고 작으면 그대로, 아니면 본문을 모으지 않고 청크 단위로 압축
+        if encoding is None or (response.content_length is not None and response.content_length < min_bytes):
+            return response
+        response.response = _compress_stream(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+        response.headers['Content-Encoding'] = encoding
+        _suffix_etag(response, encoding)
+        return response
+
+    data = response.get_data()
+    if encoding is None or len(data) < min_bytes:
+        return response
+
+    compressed = CODECS[encoding][0](data)
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+
+    _suffix_etag(response, encoding)
+
+    metrics.increment(f'compression.response.{encoding}')
+    metrics.increment('compression.response.bytes_saved', len(data) - len(compressed))
+    return response
+
+def encoding_etag(etag, encoding):
+    """인코딩마다 다른 표현이므로 강한 ETag를 구분 ("<etag>-<인코딩>")"""
+    return f'{etag}-{encoding}' if encoding else etag
+
+def _suffix_etag(response, encoding):
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(encoding_etag(etag, encoding), weak)
+
+def _compress_stream(chunks, encoding):
+    """응답 청크를 압축하며 전달 (전송이 끝나면 절약한 바이트 집계)"""
+    compress, finish = STREAM_COMPRESSORS[encoding]()
+    original = compressed = 0
+    try:
+        for chunk in chunks:
+            original += len(chunk)
+            output = compress(chunk)
+            if output:
+                compressed += len(output)
+                yield output
+        output = finish()
+        compressed += len(output)
+        yield output
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+    metrics.increment(f'compression.response.{encoding}')
+    metrics.increment('compression.response.bytes_saved', original - compressed)
+
+def compression_settings_from_env():
+    """(해제 후 최대 요청 크기, 응답 압축 최소 크기)"""
+    return (
+        int(os.environ.get('PDF_MAX_REQUEST_BYTES', 50 * 1024 * 1024)),
+        int(os.environ.get('PDF_COMPRESS_MIN_BYTES', 1024))
+    )
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+결정적 출력 모드 - 같은 입력이면 모든 생성기에서 바이트까지 같은 PDF
+
+- 시계 주입: 표지 날짜/헤더 시각/파일명은 now()로 읽음 (결정적 모드에서는 주입한 시각)
+- ReportLab: invariant 모드 (내용 기반 문서 ID, 고정 생성 시각)
+- PyMuPDF: 저장할 때마다 새로 만드는 문서 ID 대신 내용 해시로 만든 고정 ID
+"""
+
+import hashlib
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+# 서버 기본값 (요청의 deterministic으로 덮어쓸 수 있음)
+DETERMINISTIC = os.environ.get('PDF_DETERMINISTIC', 'false').lower() == 'true'
+
+# 시각을 주입하지 않은 결정적 요청에 쓰는 시각 (ReportLab invariant 모드 생성 시각과 같음)
+DEFAULT_FIXED_TIME = datetime.fromisoformat(os.environ.get('PDF_DETERMINISTIC_TIME', '2000-01-01T00:00:00'))
+
+_local = threading.local()
+
+def resolve_fixed_time(deterministic=None, report_time=None):
+    """요청 값 -> 주입할 시각 (결정적 모드가 아니면 None)
+
+    deterministic: 요청의 deterministic (None이면 PDF_DETERMINISTIC)
+    report_time: ISO 8601 시각 (없거나 잘못되면 PDF_DETERMINISTIC_TIME)
+    """
+    if deterministic is None:
+        deterministic = DETERMINISTIC
+    if not deterministic:
+        return None
+
+    if report_time:
+        try:
+            return datetime.fromisoformat(str(report_time)).replace(tzinfo=None)
+        except ValueError:
+            print(f"⚠️ 잘못된 리포트 시각 무시: {report_time}")
+    return DEFAULT_FIXED_TIME
+
+@contextmanager
+def deterministic_scope(fixed_time):
+    """현재 스레드의 렌더링을 결정적 모드로 (fixed_time이 None이면 일반 모드)"""
+    previous = getattr(_local, 'fixed_time', None)
+    _local.fixed_time = fixed_time
+    try:
+        yield fixed_time
+    finally:
+        _local.fixed_time = previous
+
+def enabled():
+    """현재 스레드가 결정적 모드인지"""
+    return getattr(_local, 'fixed_time', None) is not None
+
+def now():
+    """렌더링용 현재 시각 (결정적 모드면 주입한 시각)"""
+    fixed_time = getattr(_local, 'fixed_time', None)
+    return fixed_time if fixed_time is not None else datetime.now()
+
+def fitz_tobytes(doc, **options):
+    """PyMuPDF 문서 -> PDF 바이트 (결정적 모드면 내용 해시로 만든 문서 ID)"""
+    if not enabled():
+        return doc.tobytes(**options)
+
+    # ID 없이 한 번 저장해 내용 해시를 구하고, 그 해시를 ID로 다시 저장
+    digest = hashlib.md5(doc.tobytes(no_new_id=True, **options)).hexdigest().upper()
+    doc.xref_set_key(-1, 'ID', f'[<{digest}><{digest}>]')
+    return doc.tobytes(no_new_id=True, **options)
@@ -5,7 +5,7 @@
 """
 
 from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
+from reportlab.platypus import SimpleDocTemplate, Spacer, Table, TableStyle, PageBreak
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib import colors
@@ -14,9 +14,11 @@ from reportlab.graphics.charts.barcharts import VerticalBarChart
 from reportlab.graphics.charts.piecharts import Pie
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
-from datetime import datetime
 import io
 import os
+import deterministic
+from report_model import build_summary_model
+from layout_cache import CachedParagraph as Paragraph
 
 def register_korean_font():
     """안전한 한글 폰트 등록"""
@@ -178,7 +180,8 @@ def create_enhanced_korean_report(ai_insights, analytics_data):
             rightMargin=50,
             leftMargin=50,
             topMargin=50,
-            bottomMargin=50
+            bottomMargin=50,
+            invariant=deterministic.enabled()
         )
         
         # 스타일 정의
@@ -231,7 +234,7 @@ def create_enhanced_korean_report(ai_insights, analytics_data):
         story.append(Paragraph("AI 기반 분석 리포트", heading_style))
         story.append(Spacer(1, 1*inch))
         
-        now = datetime.now().strftime("%Y년 %m월 %d일")
+        now = deterministic.now().strftime("%Y년 %m월 %d일")
         story.append(Paragraph(f"생성일: {now}", body_style))
         story.append(Paragraph("AI 모델: Claude 4 Sonnet (Amazon Bedrock)", body_style))
         story.append(Spacer(1, 0.5*inch))
@@ -266,7 +269,8 @@ def create_enhanced_korean_report(ai_insights, analytics_data):
         # 주요 지표 분석
         story.append(Paragraph("주요 성과 지표", subheading_style))
         
-        engagement_rate = (analytics_data.get('totalContentViews', 0) / max(analytics_data.get('totalPageViews', 1), 1) * 100)
+        summary = build_summary_model(analytics_data)
+        engagement_rate = summary['engagement_rate']
         
         kpi_insights = [
             f"• 페이지 참여율: {engagement_rate:.1f}%",
@@ -380,7 +384,7 @@ def create_enhanced_korean_report(ai_insights, analytics_data):
         metrics_data = [
             ['지표', '현재값', '목표값', '측정주기'],
             ['페이지 참여율', f"{engagement_rate:.1f}%", '25%+', '주간'],
-            ['세션당 콘텐츠 조회', f"{analytics_data.get('totalContentViews', 0) / max(analytics_data.get('totalPageViews', 1), 1):.1f}회", '2.0회+', '일간'],
+            ['세션당 콘텐츠 조회', f"{summary['content_views_per_page_view']:.1f}회", '2.0회+', '일간'],
             ['카테고리 커버리지', '5개 카테고리', '8개+ 카테고리', '월간'],
             ['사용자 재방문율', '측정 예정', '60%+', '월간']
         ]
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+포크된 렌더링/섹션 프로세스와 부모 사이의 프로세스 상태
+
+- ForkSafeLock: 포크 직후 자식에서 새 락으로 교체
+  (포크 순간 다른 스레드가 잡고 있던 락은 자식에서 영원히 풀리지 않으므로)
+- 변경분 전달: 자식이 렌더링 중 새로 채운 캐시 항목/카운터를 결과와 함께 부모로 돌려주고
+  부모가 자기 캐시에 반영 (take_updates/adopt_updates) - 자식이 끝나도 배운 것이 남음
+"""
+
+import os
+import threading
+from weakref import WeakSet
+
+_locks = WeakSet()
+
+# 이름 -> (변경분 꺼내기, 변경분 반영)
+_carriers = {}
+
+# 포크된 자식 프로세스인지 (부모에서는 변경분을 기록하지 않음)
+_in_forked_child = False
+
+class ForkSafeLock:
+    """threading.Lock과 같은 사용법, 포크된 자식에서는 풀린 새 락으로 시작"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        _locks.add(self)
+
+    def acquire(self, blocking=True, timeout=-1):
+        return self._lock.acquire(blocking, timeout)
+
+    def release(self):
+        self._lock.release()
+
+    def __enter__(self):
+        self._lock.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._lock.release()
+
+    def _reset(self):
+        self._lock = threading.Lock()
+
+def register_carrier(name, take, adopt):
+    """자식 -> 부모로 넘길 상태 등록 (take(): 포크 이후 변경분, adopt(변경분): 반영)"""
+    _carriers[name] = (take, adopt)
+
+def in_forked_child():
+    return _in_forked_child
+
+def take_updates():
+    """포크 이후 이 프로세스에서 생긴 변경분 {이름: 변경분} (자식이 결과와 함께 보냄)"""
+    updates = {}
+    for name, (take, _) in _carriers.items():
+        update = take()
+        if update:
+            updates[name] = update
+    return updates
+
+def adopt_updates(updates):
+    """자식에게서 돌려받은 변경분 반영 (손자 프로세스 것이면 다시 기록되어 위로 전달됨)"""
+    for name, update in (updates or {}).items():
+        carrier = _carriers.get(name)
+        if carrier is not None:
+            carrier[1](update)
+
+class CacheJournal:
+    """포크된 자식에서 캐시에 새로 넣은 (키, 값) 기록 -> 부모에서 put(키, 값)으로 반영"""
+
+    def __init__(self, name, put):
+        self._entries = []
+        register_carrier(name, self.take, lambda entries: [put(key, value) for key, value in entries])
+
+    def record(self, key, value):
+        if _in_forked_child:
+            self._entries.append((key, value))
+
+    def take(self):
+        entries, self._entries = self._entries, []
+        return entries
+
+def _after_fork_in_child():
+    global _in_forked_child
+    _in_forked_child = True
+    for lock in list(_locks):
+        lock._reset()
+    # 부모(렌더링 프로세스)가 이미 기록한 변경분은 부모가 보내므로 버림
+    take_updates()
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
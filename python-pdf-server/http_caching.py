@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+리포트 응답 HTTP 캐싱 - ETag / If-None-Match / Cache-Control
+"""
+
+import hashlib
+from datetime import datetime
+
+from flask import Response
+
+# 생성기 출력이 바뀌면 올려서 기존 ETag를 무효화
+GENERATOR_VERSION = '8.1.0'
+
+# 엔드포인트별 Cache-Control 정책
+CACHE_POLICIES = {
+    'health_check': 'no-store',
+    'liveness_check': 'no-store',
+    'readiness_check': 'no-store',
+    'metrics_endpoint': 'no-store',
+    'debug_profile': 'no-store',
+    # 페이로드가 같으면 재검증(304)으로 재사용
+    'generate_pdf': 'private, no-cache',
+    'report_model': 'private, no-cache',
+    # 저장된 리포트 ID는 내용 기반이므로 보관 기간 동안 불변
+    'download_report': 'private, max-age=3600',
+    'report_preview': 'private, max-age=3600',
+    # 입력이 상수인 테스트 리포트 (표지 날짜가 바뀌므로 하루 이내)
+    'test_pdf': 'public, max-age=3600'
+}
+
+def report_etag(payload_hash, report_time=None):
+    """페이로드 해시 + 생성기 버전 + 표지 날짜 기반 강한 ETag (report_time: 결정적 모드에서 주입한 시각)"""
+    report_date = (report_time or datetime.now()).strftime("%Y%m%d")
+    digest = hashlib.sha256(f"{payload_hash}:{GENERATOR_VERSION}:{report_date}".encode('utf-8')).hexdigest()
+    return digest[:32]
+
+def not_modified_response(request, etag):
+    """If-None-Match가 ETag와 일치하면 304 응답, 아니면 None
+
+    etag는 보낼 표현(형식/압축 접미사 포함)의 ETag 그대로 - 다른 표현의 ETag와는 일치하지 않음
+    """
+    tags = request.if_none_match.as_set(include_weak=True) if request.if_none_match else set()
+    if request.if_none_match.star_tag or etag in tags:
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+    return None
+
+def apply_cache_policy(request, response):
+    """after_request 훅 - 엔드포인트 정책으로 Cache-Control 설정"""
+    policy = CACHE_POLICIES.get(request.endpoint)
+    if policy:
+        # 오류 응답은 엔드포인트 정책과 무관하게 저장하지 않음
+        response.headers['Cache-Control'] = policy if response.status_code < 400 else 'no-store'
+    return response
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+문단 레이아웃 캐시 - 리포트마다 반복되는 문단(글머리 문장, 표 셀, 섹션 제목)의 파싱/줄바꿈 결과 재사용
+
+- 마크업 파싱 결과: (텍스트, 스타일, 글머리) -> 프래그먼트 (문단마다 복제해서 사용)
+- 줄바꿈 결과: (텍스트, 스타일, 글머리, 가용 폭) -> 줄 목록(단어 폭 포함)과 높이
+- 스타일은 객체가 아니라 속성 값으로 비교 (요청마다 새로 만든 스타일도 같은 키)
+- 프로세스 전체에서 공유, 항목 수 기준 LRU
+  (포크된 렌더링 프로세스가 새로 채운 항목은 결과와 함께 부모로 돌려받아 반영)
+"""
+
+import os
+from collections import OrderedDict
+from weakref import WeakKeyDictionary
+
+from reportlab.platypus import Paragraph
+from reportlab.platypus.paragraph import textTransformFrags
+from reportlab.platypus.paraparser import ParaParser
+
+import fork_state
+import metrics
+
+class LayoutCache:
+    """키 -> 값 LRU (스레드 안전)"""
+
+    def __init__(self, name, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = fork_state.ForkSafeLock()
+        self._journal = fork_state.CacheJournal(name, self.put)
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        self._journal.record(key, value)
+
+    def __len__(self):
+        return len(self._entries)
+
+_max_entries = int(os.environ.get('PDF_LAYOUT_CACHE_SIZE', 4096))
+parse_cache = LayoutCache('layout_cache.parse', _max_entries)
+wrap_cache = LayoutCache('layout_cache.wrap', _max_entries)
+
+_style_keys = WeakKeyDictionary()
+
+def style_key(style):
+    """스타일 속성 값으로 만든 키 (부모 스타일에서 상속한 값 포함)"""
+    key = _style_keys.get(style)
+    if key is None:
+        key = repr(tuple(getattr(style, name, None) for name in style.defaults))
+        _style_keys[style] = key
+    return key
+
+class CachedParagraph(Paragraph):
+    """파싱/줄바꿈 결과를 캐시하는 Paragraph
+
+    텍스트로 만든 문단만 캐시한다 (split으로 생긴 조각 문단은 원래대로 계산).
+    캐시된 줄 목록은 그리기에만 쓰고, split할 때는 자기 프래그먼트로 다시 줄바꿈한다.
+    """
+
+    def _setup(self, text, style, bulletText, frags, cleaner):
+        self._layout_key = None
+        if frags is not None or not isinstance(text, str):
+            Paragraph._setup(self, text, style, bulletText, frags, cleaner)
+            return
+
+        key = (text, style_key(style), bulletText if isinstance(bulletText, str) else repr(bulletText), self.caseSensitive)
+        cached = parse_cache.get(key)
+        if cached is None:
+            cleaned = cleaner(text)
+            parser = ParaParser()
+            parser.caseSensitive = self.caseSensitive
+            parsed_style, parsed_frags, bullet_frags = parser.parse(cleaned, style)
+            if parsed_frags is None:
+                raise ValueError("xml parser error (%s) in paragraph beginning\n'%s'" % (parser.errors[0], cleaned[:30]))
+            textTransformFrags(parsed_frags, parsed_style)
+            cached = (cleaned, parsed_style, parsed_frags, bullet_frags or bulletText)
+            parse_cache.put(key, cached)
+            metrics.increment('layout_cache.parse_misses')
+        else:
+            metrics.increment('layout_cache.parse_hits')
+
+        cleaned, parsed_style, parsed_frags, parsed_bullet = cached
+        # 프래그먼트는 줄바꿈/split 중에 바뀔 수 있으므로 문단마다 복제
+        Paragraph._setup(self, cleaned, parsed_style, parsed_bullet, [frag.clone() for frag in parsed_frags], cleaner)
+        self._layout_key = key
+
+    def wrap(self, availWidth, availHeight):
+        if self._layout_key is None or getattr(self, 'autoLeading', None) is not None:
+            return Paragraph.wrap(self, availWidth, availHeight)
+
+        key = (self._layout_key, availWidth)
+        cached = wrap_cache.get(key)
+        if cached is None:
+            # 줄바꿈은 프래그먼트 복제본으로 (breakLines가 self.frags를 단어 목록으로 바꾸고
+            # 캐시에 넣은 줄 목록이 그것을 참조하므로, 이 문단은 원래 프래그먼트를 계속 가짐)
+            frags = self.frags
+            self.frags = [frag.clone() for frag in frags]
+            width, height = Paragraph.wrap(self, availWidth, availHeight)
+            wrap_cache.put(key, (self.blPara, self._wrapWidths, height))
+            self.frags = frags
+            self._shared_lines = True
+            metrics.increment('layout_cache.wrap_misses')
+            return width, height
+
+        self.blPara, wrap_widths, self.height = cached
+        self._wrapWidths = list(wrap_widths)
+        self.width = availWidth
+        self._shared_lines = True
+        metrics.increment('layout_cache.wrap_hits')
+        return self.width, self.height
+
+    def split(self, availWidth, availHeight):
+        # 공유 중인 줄 목록은 split이 바꿀 수 있으므로 자기 프래그먼트로 다시 계산
+        if getattr(self, '_shared_lines', False):
+            Paragraph.wrap(self, availWidth, availHeight)
+            self._shared_lines = False
+        return Paragraph.split(self, availWidth, availHeight)
+
+def to_dict():
+    return {
+        'parsed': len(parse_cache),
+        'wrapped': len(wrap_cache),
+        'max_entries': _max_entries
+    }
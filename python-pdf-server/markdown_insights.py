@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI 인사이트 Markdown 변환 - Bedrock이 돌려준 Markdown을 리포트용 블록으로 한 번에 파싱
+
+- 줄 단위 한 번 훑기 (제목/목록/인용/구분선/코드/표/문단), 정규식은 줄 안에서만 사용 -> 입력 길이에 선형
+- 인라인은 **굵게**, *기울임*, `코드`만 해석 (짝이 없는 표시는 글자 그대로)
+- 파싱 결과(불변 튜플)는 텍스트 해시로 LRU 캐시 -> 같은 인사이트 재렌더링 시 파싱 생략
+- ReportLab 플로어블 변환과 PyMuPDF용 줄바꿈(wrap_runs)을 함께 제공
+"""
+
+import hashlib
+import os
+import re
+from collections import OrderedDict, namedtuple
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.platypus import Spacer, Table, TableStyle
+
+import fork_state
+import metrics
+from layout_cache import CachedParagraph as Paragraph
+
+# kind: heading / paragraph / bullet / ordered / quote / rule / code / table
+# level: 제목 수준 또는 목록 깊이, marker: 번호 목록 표시("1."), runs: Run 튜플 (표는 행 -> 셀 -> Run)
+Block = namedtuple('Block', 'kind level marker runs')
+Run = namedtuple('Run', 'text bold italic code')
+
+_FENCE = re.compile(r'^\s*(```|~~~)')
+_HEADING = re.compile(r'^\s{0,3}(#{1,6})\s+(.*)$')
+_RULE = re.compile(r'^\s{0,3}([-*_])(?:\s*\1){2,}\s*$')
+_BULLET = re.compile(r'^(\s*)[-*+•]\s+(.*)$')
+_ORDERED = re.compile(r'^(\s*)(\d{1,9})[.)]\s+(.*)$')
+_QUOTE = re.compile(r'^\s*>\s?(.*)$')
+_TABLE_SEPARATOR = re.compile(r'^\s*\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?\s*$')
+_EMPHASIS = re.compile(r'(\*\*|\*)')
+
+# 목록 들여쓰기 한 단계 (공백 수)
+LIST_INDENT = 2
+
+def parse_inline(text):
+    """한 줄(문단) 텍스트 -> Run 튜플"""
+    # `코드` 구간 먼저 분리 (백틱이 홀수면 마지막 것은 글자 그대로)
+    pieces = text.split('`')
+    if len(pieces) % 2 == 0:
+        pieces[-2:] = [pieces[-2] + '`' + pieces[-1]]
+
+    # 코드 밖 구간은 [글자, 표시, 글자, 표시, ...]로 나눔
+    segments = [_EMPHASIS.split(piece) if index % 2 == 0 else piece for index, piece in enumerate(pieces)]
+
+    # 짝이 없는 **/* 는 마지막 것을 글자 그대로 취급 (개수를 세어 한 번에 결정)
+    last_position = {}
+    counts = {'**': 0, '*': 0}
+    for index in range(0, len(segments), 2):
+        for part_index in range(1, len(segments[index]), 2):
+            marker = segments[index][part_index]
+            counts[marker] += 1
+            last_position[marker] = (index, part_index)
+    literal = {last_position[marker] for marker, count in counts.items() if count % 2}
+
+    runs = []
+    bold = italic = False
+    for index, segment in enumerate(segments):
+        if index % 2:
+            if segment:
+                runs.append(Run(segment, bold, italic, True))
+            continue
+        for part_index, part in enumerate(segment):
+            if part_index % 2 == 0 or (index, part_index) in literal:
+                if part:
+                    runs.append(Run(part, bold, italic, False))
+            elif part == '**':
+                bold = not bold
+            else:
+                italic = not italic
+    return tuple(runs)
+
+def _table_row(line):
+    cells = line.strip().strip('|').split('|')
+    return tuple(parse_inline(cell.strip()) for cell in cells)
+
+def iter_blocks(lines):
+    """줄 iterable -> Block 스트림 (블록이 끝나는 즉시 내보냄)"""
+    paragraph = []      # 이어지는 문단 줄
+    item = None         # (kind, level, marker, [줄]) - 이어지는 목록 항목
+    table = []          # 표 행
+    code = None         # 코드 블록 줄
+
+    def flush():
+        nonlocal paragraph, item, table
+        if paragraph:
+            yield Block('paragraph', 0, '', parse_inline(' '.join(paragraph)))
+            paragraph = []
+        if item is not None:
+            kind, level, marker, parts = item
+            yield Block(kind, level, marker, parse_inline(' '.join(parts)))
+            item = None
+        if table:
+            yield Block('table', 0, '', tuple(table))
+            table = []
+
+    for raw in lines:
+        line = raw.rstrip()
+
+        if code is not None:
+            if _FENCE.match(line):
+                yield Block('code', 0, '', (Run('\n'.join(code), False, False, True),))
+                code = None
+            else:
+                code.append(raw.rstrip('\r\n'))
+            continue
+
+        if not line.strip():
+            yield from flush()
+            continue
+
+        if _FENCE.match(line):
+            yield from flush()
+            code = []
+            continue
+
+        if line.lstrip().startswith('|'):
+            if paragraph or item is not None:
+                yield from flush()
+            if not _TABLE_SEPARATOR.match(line):
+                table.append(_table_row(line))
+            continue
+        if table:
+            yield from flush()
+
+        match = _HEADING.match(line)
+        if match:
+            yield from flush()
+            yield Block('heading', len(match.group(1)), '', parse_inline(match.group(2).strip()))
+            continue
+
+        if _RULE.match(line):
+            yield from flush()
+            yield Block('rule', 0, '', ())
+            continue
+
+        match = _BULLET.match(line)
+        if match:
+            yield from flush()
+            item = ('bullet', len(match.group(1).expandtabs(4)) // LIST_INDENT, '•', [match.group(2).strip()])
+            continue
+
+        match = _ORDERED.match(line)
+        if match:
+            yield from flush()
+            item = ('ordered', len(match.group(1).expandtabs(4)) // LIST_INDENT, f'{match.group(2)}.', [match.group(3).strip()])
+            continue
+
+        match = _QUOTE.match(line)
+        if match:
+            yield from flush()
+            yield Block('quote', 0, '', parse_inline(match.group(1).strip()))
+            continue
+
+        # 목록 항목 다음의 들여쓴 줄은 항목에 이어 붙이고, 그 외에는 문단
+        if item is not None and raw[:1].isspace():
+            item[3].append(line.strip())
+        else:
+            if item is not None:
+                yield from flush()
+            paragraph.append(line.strip())
+
+    if code is not None:
+        # 닫히지 않은 코드 블록
+        yield Block('code', 0, '', (Run('\n'.join(code), False, False, True),))
+    yield from flush()
+
+class MarkdownCache:
+    """텍스트 해시 -> 파싱된 블록 튜플 LRU"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = fork_state.ForkSafeLock()
+        # 포크된 렌더링 프로세스에서 파싱한 결과는 부모 캐시에도 반영
+        self._journal = fork_state.CacheJournal('markdown', self.put)
+
+    def get_or_parse(self, text):
+        key = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        with self._lock:
+            blocks = self._entries.get(key)
+            if blocks is not None:
+                self._entries.move_to_end(key)
+                metrics.increment('markdown.cache_hits')
+                return blocks
+
+        blocks = tuple(iter_blocks(text.splitlines()))
+        metrics.increment('markdown.parsed')
+        self.put(key, blocks)
+        return blocks
+
+    def put(self, key, blocks):
+        with self._lock:
+            self._entries[key] = blocks
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        self._journal.record(key, blocks)
+
+# 프로세스 전체에서 공유
+markdown_cache = MarkdownCache(int(os.environ.get('PDF_MARKDOWN_CACHE_SIZE', 64)))
+
+def parse_markdown(text):
+    """Markdown 텍스트 -> Block 튜플 (캐시)"""
+    if not text:
+        return ()
+    return markdown_cache.get_or_parse(text)
+
+# === ReportLab 플로어블 ===
+
+def runs_to_markup(runs):
+    """Run 튜플 -> Paragraph 마크업"""
+    parts = []
+    for run in runs:
+        text = escape(run.text)
+        if run.code:
+            text = f'<font face="Courier" backColor="#F2F3F3">{text}</font>'
+        if run.italic:
+            text = f'<i>{text}</i>'
+        if run.bold:
+            text = f'<b>{text}</b>'
+        parts.append(text)
+    return ''.join(parts)
+
+def build_flowables(blocks, styles, korean_font):
+    """Block 목록 -> ReportLab 플로어블 목록 (styles: build_report_styles 결과)"""
+    story = []
+    for block in blocks:
+        if block.kind == 'heading':
+            style = styles['subheading'] if block.level <= 2 else styles['minorheading']
+            story.append(Paragraph(runs_to_markup(block.runs), style))
+        elif block.kind in ('bullet', 'ordered'):
+            style = styles['list'] if block.level == 0 else _nested_list_style(styles['list'], block.level)
+            story.append(Paragraph(runs_to_markup(block.runs), style, bulletText=block.marker))
+        elif block.kind == 'quote':
+            story.append(Paragraph(runs_to_markup(block.runs), styles['quote']))
+        elif block.kind == 'rule':
+            story.append(Spacer(1, 10))
+        elif block.kind == 'code':
+            story.append(Paragraph(escape(block.runs[0].text).replace('\n', '<br/>'), styles['code']))
+        elif block.kind == 'table':
+            story.append(_build_table(block.runs, styles, korean_font))
+            story.append(Spacer(1, 10))
+        else:
+            story.append(Paragraph(runs_to_markup(block.runs), styles['body']))
+    return story
+
+_nested_list_styles = {}
+
+def _nested_list_style(base, level):
+    key = (base.name, level)
+    style = _nested_list_styles.get(key)
+    if style is None:
+        style = base.clone(f'{base.name}{level}', leftIndent=base.leftIndent * (level + 1), bulletIndent=base.bulletIndent + base.leftIndent * level)
+        _nested_list_styles[key] = style
+    return style
+
+def _build_table(rows, styles, korean_font):
+    columns = max(len(row) for row in rows)
+    data = [[Paragraph(runs_to_markup(row[i]) if i < len(row) else '', styles['table']) for i in range(columns)] for row in rows]
+    table = Table(data, repeatRows=1)
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#F2F3F3')),
+        ('FONTNAME', (0, 0), (-1, -1), korean_font),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#AAB7B8'))
+    ]))
+    return table
+
+# === PyMuPDF 줄바꿈 ===
+
+_TOKENS = re.compile(r'\S+|\s+')
+
+def wrap_runs(runs, max_width, measure):
+    """Run 튜플을 단어 단위로 줄바꿈 -> 줄 목록 (각 줄은 [(텍스트, Run), ...], 같은 Run은 합침)
+
+    measure(text, run): 텍스트 폭. 한 줄보다 긴 단어는 그 단어만으로 한 줄.
+    """
+    lines = []
+    line = []
+    width = 0
+    pending_space = False
+
+    for run in runs:
+        for match in _TOKENS.finditer(run.text):
+            token = match.group(0)
+            if token.isspace():
+                pending_space = bool(line)
+                continue
+
+            piece = f' {token}' if pending_space else token
+            piece_width = measure(piece, run)
+            if line and width + piece_width > max_width:
+                lines.append(line)
+                line = []
+                piece = token
+                piece_width = measure(piece, run)
+                width = 0
+            pending_space = False
+
+            if line and line[-1][1] is run:
+                line[-1] = (line[-1][0] + piece, run)
+            else:
+                line.append((piece, run))
+            width += piece_width
+
+    if line:
+        lines.append(line)
+    return lines
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+워커 메모리 감시 - 렌더링마다 RSS 기록, 임계치/렌더링 횟수 초과 시 처리 중인 작업을 비운 뒤 재시작
+"""
+
+import os
+import resource
+import sys
+import threading
+import time
+
+import metrics
+
+# 재시작(exec) 후에도 누적 재시작 횟수를 유지하기 위한 환경 변수
+GENERATION_ENV = 'PDF_WORKER_GENERATION'
+
+def peak_rss_bytes(include_children=False):
+    """현재 프로세스의 최대 RSS (include_children: 기다린 자식 프로세스(섹션 워커) 중 최대값도 포함)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if include_children:
+        peak = max(peak, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # macOS는 바이트, Linux는 KB
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def current_rss_bytes():
+    """현재 프로세스 RSS (Linux는 /proc, 그 외는 최대 RSS로 대체)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return peak_rss_bytes()
+
+class MemoryWatchdog:
+    """렌더링 후 RSS를 확인하고 필요하면 워커를 재시작"""
+
+    def __init__(self, max_rss_mb, max_renders, drain_timeout, start_draining, is_idle):
+        self.max_rss_bytes = max_rss_mb * 1024 * 1024 if max_rss_mb > 0 else None
+        self.max_renders = max_renders if max_renders > 0 else None
+        self.drain_timeout = drain_timeout
+        self._start_draining = start_draining
+        self._is_idle = is_idle
+
+        self._lock = threading.Lock()
+        self.renders = 0
+        self.recycling = False
+        self.recycle_reason = None
+        self.generation = int(os.environ.get(GENERATION_ENV, 0))
+
+        metrics.set_gauge('worker.generation', self.generation)
+        metrics.increment('worker.recycled', self.generation)
+
+    @classmethod
+    def from_env(cls, start_draining, is_idle):
+        """환경 변수로 설정"""
+        return cls(
+            max_rss_mb=int(os.environ.get('PDF_WORKER_MAX_RSS_MB', 1024)),
+            max_renders=int(os.environ.get('PDF_WORKER_MAX_RENDERS', 1000)),
+            drain_timeout=float(os.environ.get('PDF_WORKER_DRAIN_TIMEOUT', 120)),
+            start_draining=start_draining,
+            is_idle=is_idle
+        )
+
+    def record_render(self, render_peak_rss=None):
+        """렌더링 1건 완료 후 호출
+
+        render_peak_rss: 포크된 렌더링 프로세스의 최대 RSS (PDF_RENDER_HARD_KILL) -
+        렌더링 중 늘어난 메모리는 부모 RSS에 보이지 않으므로 둘 중 큰 값으로 판단
+        """
+        rss = current_rss_bytes()
+        metrics.set_gauge('worker.rss_bytes', rss)
+        metrics.increment('worker.renders')
+        if render_peak_rss:
+            metrics.set_gauge('worker.render_peak_rss_bytes', render_peak_rss)
+            rss = max(rss, render_peak_rss)
+
+        with self._lock:
+            self.renders += 1
+            if self.recycling:
+                return
+
+            if self.max_rss_bytes and rss >= self.max_rss_bytes:
+                reason = f'RSS {rss // (1024 * 1024)}MB >= {self.max_rss_bytes // (1024 * 1024)}MB'
+            elif self.max_renders and self.renders >= self.max_renders:
+                reason = f'렌더링 {self.renders}회 >= {self.max_renders}회'
+            else:
+                return
+
+            self.recycling = True
+            self.recycle_reason = reason
+
+        print(f"♻️ 워커 재시작 예약: {reason}")
+        metrics.increment('worker.recycle_requested')
+        threading.Thread(target=self._drain_and_recycle, name='pdf-recycle', daemon=True).start()
+
+    def _drain_and_recycle(self):
+        # 새 렌더링은 거절하고 처리 중인 작업이 끝나길 기다림
+        self._start_draining()
+        deadline = time.monotonic() + self.drain_timeout
+        while not self._is_idle() and time.monotonic() < deadline:
+            time.sleep(0.1)
+
+        if not self._is_idle():
+            print(f"⚠️ 드레인 시간 초과 ({self.drain_timeout:g}초) - 남은 작업을 두고 재시작")
+
+        print(f"♻️ 워커 재시작 (세대 {self.generation} → {self.generation + 1}, 렌더링 {self.renders}회)")
+        sys.stdout.flush()
+        os.environ[GENERATION_ENV] = str(self.generation + 1)
+
+        # werkzeug reloader 자식이면 리슨 소켓을 물려받고, 아니면 새 프로세스가 다시 bind
+        server_fd = os.environ.get('WERKZEUG_SERVER_FD')
+        if server_fd and os.environ.get('WERKZEUG_RUN_MAIN') != 'true':
+            os.set_inheritable(int(server_fd), False)
+
+        os.execv(sys.executable, [sys.executable] + sys.argv)
+
+    def to_dict(self):
+        return {
+            'generation': self.generation,
+            'renders': self.renders,
+            'rss_bytes': current_rss_bytes(),
+            'max_rss_bytes': self.max_rss_bytes,
+            'max_renders': self.max_renders,
+            'recycling': self.recycling,
+            'recycle_reason': self.recycle_reason
+        }
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+프로세스 내 카운터/게이지 - /metrics 엔드포인트로 노출
+
+포크된 렌더링 프로세스의 카운터는 포크 이후 증가분만 부모로 돌려받아 더한다.
+"""
+
+import fork_state
+
+_lock = fork_state.ForkSafeLock()
+_counters = {}
+_gauges = {}
+
+def increment(name, value=1):
+    """카운터 증가"""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+def set_gauge(name, value):
+    """게이지 값 설정"""
+    with _lock:
+        _gauges[name] = value
+
+def snapshot():
+    """현재 카운터/게이지 복사본"""
+    with _lock:
+        return {
+            'counters': dict(_counters),
+            'gauges': dict(_gauges)
+        }
+
+def _take_counters():
+    """포크 이후 증가분 (자식에서는 포크 직후 0부터 다시 셈)"""
+    with _lock:
+        counters = dict(_counters)
+        _counters.clear()
+    return counters
+
+def _adopt_counters(counters):
+    for name, value in counters.items():
+        increment(name, value)
+
+fork_state.register_carrier('metrics', _take_counters, _adopt_counters)
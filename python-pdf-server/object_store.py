@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+S3 호환 저장소 오프로드 - 생성된 PDF를 업로드하고 짧게 유효한 다운로드 URL만 반환
+
+- 커넥션 풀을 공유하는 단일 클라이언트 + 멀티파트 업로드
+- PDF_S3_ENDPOINT_URL로 로컬 S3 호환 서버(MinIO, moto 등)에 연결 가능
+- PDF_CDN_BASE_URL이 있으면 presigned URL 대신 CloudFront 주소 반환
+"""
+
+import io
+import os
+import time
+from urllib.parse import quote
+
+try:
+    import boto3
+    from boto3.s3.transfer import TransferConfig
+    from botocore.config import Config
+    from botocore.exceptions import ClientError
+except ImportError:
+    boto3 = None
+
+import metrics
+
+MB = 1024 * 1024
+
+class ObjectStore:
+    """PDF 결과를 S3 버킷에 저장하고 다운로드 URL 발급"""
+
+    def __init__(self, bucket, prefix='reports/', endpoint_url=None, region=None,
+                 url_ttl=300, max_pool_connections=10, multipart_chunk_mb=8, cdn_base_url=None):
+        self.bucket = bucket
+        self.prefix = prefix
+        self.endpoint_url = endpoint_url
+        self.url_ttl = url_ttl
+        self.cdn_base_url = cdn_base_url.rstrip('/') if cdn_base_url else None
+
+        # 클라이언트는 스레드 안전 - 요청마다 만들지 않고 커넥션 풀 재사용
+        self._client = boto3.client(
+            's3',
+            endpoint_url=endpoint_url,
+            region_name=region,
+            config=Config(
+                max_pool_connections=max_pool_connections,
+                retries={'max_attempts': 3, 'mode': 'standard'},
+                signature_version='s3v4',
+                # 로컬 호환 서버는 가상 호스트 방식 버킷 주소를 지원하지 않는 경우가 많음
+                s3={'addressing_style': 'path' if endpoint_url else 'auto'}
+            )
+        )
+        self._transfer_config = TransferConfig(
+            multipart_threshold=multipart_chunk_mb * MB,
+            multipart_chunksize=multipart_chunk_mb * MB,
+            max_concurrency=max_pool_connections,
+            use_threads=True
+        )
+
+    @classmethod
+    def from_env(cls):
+        """환경 변수로 설정 (버킷이 없거나 boto3가 없으면 None)"""
+        bucket = os.environ.get('PDF_S3_BUCKET')
+        if not bucket:
+            return None
+        if boto3 is None:
+            print("⚠️ PDF_S3_BUCKET이 설정되었지만 boto3가 없어 저장소 오프로드를 사용하지 않습니다.")
+            return None
+
+        return cls(
+            bucket=bucket,
+            prefix=os.environ.get('PDF_S3_PREFIX', 'reports/'),
+            endpoint_url=os.environ.get('PDF_S3_ENDPOINT_URL') or None,
+            region=os.environ.get('PDF_S3_REGION') or os.environ.get('AWS_DEFAULT_REGION'),
+            url_ttl=int(os.environ.get('PDF_S3_URL_TTL', 300)),
+            max_pool_connections=int(os.environ.get('PDF_S3_MAX_POOL_CONNECTIONS', 10)),
+            multipart_chunk_mb=int(os.environ.get('PDF_S3_MULTIPART_CHUNK_MB', 8)),
+            cdn_base_url=os.environ.get('PDF_CDN_BASE_URL') or None
+        )
+
+    def key_for(self, etag):
+        """리포트 ETag 기반 객체 키 (같은 리포트는 같은 키)"""
+        return f'{self.prefix}{etag}.pdf'
+
+    def _exists(self, key, size):
+        try:
+            head = self._client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return False
+            raise
+        return head.get('ContentLength') == size
+
+    def upload(self, key, pdf_bytes, filename):
+        """PDF 업로드 (이미 같은 크기의 객체가 있으면 생략)"""
+        if self._exists(key, len(pdf_bytes)):
+            metrics.increment('object_store.upload_skipped')
+            return
+
+        start = time.monotonic()
+        self._client.upload_fileobj(
+            io.BytesIO(pdf_bytes), self.bucket, key,
+            ExtraArgs={
+                'ContentType': 'application/pdf',
+                'ContentDisposition': _attachment(filename)
+            },
+            Config=self._transfer_config
+        )
+        metrics.increment('object_store.uploads')
+        metrics.increment('object_store.uploaded_bytes', len(pdf_bytes))
+        print(f"☁️ S3 업로드 완료: s3://{self.bucket}/{key} ({len(pdf_bytes)} bytes, {time.monotonic() - start:.2f}초)")
+
+    def download_url(self, key, filename):
+        """CDN 주소 또는 url_ttl초 동안 유효한 presigned GET URL"""
+        if self.cdn_base_url:
+            return f'{self.cdn_base_url}/{key}'
+
+        return self._client.generate_presigned_url(
+            'get_object',
+            Params={
+                'Bucket': self.bucket,
+                'Key': key,
+                'ResponseContentDisposition': _attachment(filename)
+            },
+            ExpiresIn=self.url_ttl
+        )
+
+    def offload(self, etag, pdf_bytes, filename):
+        """업로드 후 응답에 넣을 메타데이터 반환"""
+        key = self.key_for(etag)
+        self.upload(key, pdf_bytes, filename)
+        return {
+            'download_url': self.download_url(key, filename),
+            'expires_in': None if self.cdn_base_url else self.url_ttl,
+            'storage_key': key
+        }
+
+    def to_dict(self):
+        return {
+            'bucket': self.bucket,
+            'prefix': self.prefix,
+            'endpoint_url': self.endpoint_url,
+            'url_ttl': self.url_ttl,
+            'cdn': bool(self.cdn_base_url)
+        }
+
+def _attachment(filename):
+    # 한글 파일명은 RFC 5987 형식으로
+    return f"attachment; filename*=UTF-8''{quote(filename)}"
@@ -11,13 +11,18 @@ import matplotlib.font_manager as fm
 import pandas as pd
 import numpy as np
 import seaborn as sns
-from datetime import datetime
 import json
 import io
 import base64
+import hashlib
+from collections import OrderedDict
 from pathlib import Path
 import os
 
+from markdown_insights import parse_markdown, wrap_runs, Run
+import deterministic
+import fork_state
+
 # 한글 폰트 설정 - macOS 시스템 폰트 사용
 try:
     # macOS 시스템 폰트 경로
@@ -45,22 +50,85 @@ except Exception as e:
     print(f"⚠️ 폰트 설정 경고: {e}")
     plt.rcParams['font.family'] = ['DejaVu Sans']
 
+# 차트 PNG 해상도
+CHART_DPI = 150
+
+class ChartImageCache:
+    """(차트 데이터, 종류, 제목, DPI) -> PNG 바이트 LRU (전체 바이트 수로 제한)"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = fork_state.ForkSafeLock()
+        # 포크된 렌더링 프로세스에서 만든 PNG는 부모 캐시에도 반영
+        self._journal = fork_state.CacheJournal('chart_images', self.put)
+
+    @staticmethod
+    def key_for(chart_data, chart_type, title, dpi):
+        payload = json.dumps([chart_data, chart_type, title, dpi], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            image_bytes = self._entries.get(key)
+            if image_bytes is not None:
+                self._entries.move_to_end(key)
+            return image_bytes
+
+    def put(self, key, image_bytes):
+        if len(image_bytes) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = image_bytes
+            self._total_bytes += len(image_bytes)
+            while self._total_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._total_bytes -= len(evicted)
+        self._journal.record(key, image_bytes)
+
+# Markdown 인라인 스타일 (굵게, 기울임) -> PyMuPDF 기본 14 폰트
+MARKDOWN_FONTS = {
+    (False, False): "helv",
+    (True, False): "hebo",
+    (False, True): "heit",
+    (True, True): "hebi"
+}
+
+# 프로세스 전체에서 공유 (리포트 간 같은 차트 재사용)
+chart_image_cache = ChartImageCache(int(os.environ.get('PDF_CHART_CACHE_MB', 32)) * 1024 * 1024)
+
 class KoreanPDFGenerator:
     def __init__(self):
         self.doc = None
+        # 마지막으로 추가한 페이지 (new_page는 기존 Page 객체를 무효화하므로 항상 이것을 사용)
+        self.page = None
+        # 문서 내 이미지 중복 제거: 차트 캐시 키 -> 이미 삽입된 이미지 xref
+        self._image_xrefs = {}
         self.page_width = 595  # A4 width in points
         self.page_height = 842  # A4 height in points
         self.margin = 50
         self.current_y = self.margin
+        # 헤더 영역 높이 (생성 일시 줄의 아랫부분까지)
+        self.header_height = self.margin + 85
+        # 제목 -> 헤더 템플릿 문서, 생성 일시 (create_new_document마다 초기화)
+        self._header_templates = {}
+        self._generated_at = None
         
     def create_new_document(self):
         """새 PDF 문서 생성"""
         self.doc = fitz.open()
+        self._image_xrefs = {}
+        self.close_header_templates()
+        self._generated_at = deterministic.now().strftime("%Y년 %m월 %d일 %H:%M")
         return self.doc
     
     def add_page(self):
         """새 페이지 추가"""
         page = self.doc.new_page(width=self.page_width, height=self.page_height)
+        self.page = page
         self.current_y = self.margin
         return page
     
@@ -89,8 +157,15 @@ class KoreanPDFGenerator:
                     page.insert_text(point, text)
                     print(f"⚠️ 텍스트 삽입 경고 (최소 옵션 사용): {e3}")
     
-    def add_header(self, page, title):
-        """페이지 헤더 추가 - 안전한 텍스트 삽입"""
+    def _header_template(self, title):
+        """제목별 헤더를 한 번만 그린 1페이지 문서 (문서마다 새로 만듦)"""
+        template = self._header_templates.get(title)
+        if template is not None:
+            return template
+
+        template = fitz.open()
+        page = template.new_page(width=self.page_width, height=self.header_height)
+
         # AWS Demo Factory 로고 영역
         rect = fitz.Rect(self.margin, self.margin, self.page_width - self.margin, self.margin + 40)
         page.draw_rect(rect, color=(0.137, 0.184, 0.243), fill=(0.137, 0.184, 0.243))
@@ -115,16 +190,38 @@ class KoreanPDFGenerator:
             fontname="helv"
         )
         
-        # 생성 일시
-        now = datetime.now().strftime("%Y년 %m월 %d일 %H:%M")
+        # 생성 일시 (문서 안에서는 모든 페이지가 같은 시각)
         self.safe_insert_text(
             page,
             (self.margin, self.margin + 75),
-            f"생성일시: {now}",
+            f"생성일시: {self._generated_at}",
             fontsize=10,
             color=(0.4, 0.4, 0.4),
             fontname="helv"
         )
+
+        self._header_templates[title] = template
+        return template
+
+    def close_header_templates(self):
+        """헤더 템플릿 문서 닫기 (네이티브 MuPDF 메모리를 GC 시점에 맡기지 않음)
+
+        show_pdf_page가 템플릿을 삽입할 때 본문 문서로 복사하므로 닫아도 이미 그린 헤더는 남는다.
+        """
+        templates, self._header_templates = self._header_templates, {}
+        for template in templates.values():
+            template.close()
+
+    def add_header(self, page, title):
+        """페이지 헤더 추가 - 제목별 헤더를 폼 XObject로 한 번 만들고 페이지마다 참조만 삽입"""
+        # show_pdf_page 뒤에 처음 등록하는 폰트는 페이지 리소스에서 빠지므로 본문 폰트를 먼저 등록
+        page.insert_font(fontname="helv")
+        # 같은 원본 페이지는 문서 안에서 같은 XObject로 재사용된다 (show_pdf_page)
+        page.show_pdf_page(
+            fitz.Rect(0, 0, self.page_width, self.header_height),
+            self._header_template(title),
+            0
+        )
         
         self.current_y = self.margin + 100
         return self.current_y
@@ -215,7 +312,87 @@ class KoreanPDFGenerator:
         self.current_y += 10  # 블록 간 여백
         return self.current_y
     
-    def create_chart(self, chart_data, chart_type='bar', title='차트'):
+    def add_markdown_block(self, page, text, max_width=None):
+        """Markdown 텍스트 블록 추가 (제목/목록/인용/코드/표) - 파싱 결과는 텍스트 해시로 캐시"""
+        if max_width is None:
+            max_width = self.page_width - 2 * self.margin
+
+        def font_for(run):
+            return "cour" if run.code else MARKDOWN_FONTS[(run.bold, run.italic)]
+
+        for block in parse_markdown(text):
+            if block.kind == 'rule':
+                self.current_y += 5
+                page.draw_line((self.margin, self.current_y), (self.page_width - self.margin, self.current_y), color=(0.8, 0.8, 0.8), width=0.5)
+                self.current_y += 10
+                continue
+
+            fontsize, line_height, indent, color = 10, 15, 0, (0.2, 0.2, 0.2)
+            runs = block.runs
+            if block.kind == 'heading':
+                fontsize = {1: 14, 2: 13}.get(block.level, 11.5)
+                line_height = fontsize + 6
+                color = (0.137, 0.184, 0.243)
+                runs = tuple(run._replace(bold=True) for run in runs)
+                self.current_y += 4
+            elif block.kind in ('bullet', 'ordered'):
+                indent = 15 * (block.level + 1)
+            elif block.kind == 'quote':
+                indent, color = 12, (0.33, 0.36, 0.39)
+            elif block.kind == 'code':
+                fontsize, line_height = 9, 12
+            elif block.kind == 'table':
+                # 표는 셀을 " | "로 이어 한 줄씩 (첫 행은 굵게)
+                fontsize, line_height = 9, 13
+
+            if block.kind == 'code':
+                lines = [[(line, runs[0])] for line in runs[0].text.split('\n')]
+            elif block.kind == 'table':
+                lines = []
+                for row_index, row in enumerate(runs):
+                    row_runs = []
+                    for cell_index, cell in enumerate(row):
+                        if cell_index:
+                            row_runs.append(Run(' | ', False, False, False))
+                        row_runs.extend(run._replace(bold=True) if row_index == 0 else run for run in cell)
+                    lines.extend(wrap_runs(row_runs, max_width, lambda piece, run: fitz.get_text_length(piece, fontname=font_for(run), fontsize=fontsize)))
+            else:
+                lines = wrap_runs(runs, max_width - indent, lambda piece, run: fitz.get_text_length(piece, fontname=font_for(run), fontsize=fontsize))
+
+            for line_index, line in enumerate(lines):
+                # 페이지 넘김 체크
+                if self.current_y + line_height > self.page_height - self.margin:
+                    page = self.add_page()
+                    self.add_header(page, "AI 분석 리포트 (계속)")
+
+                x = self.margin + indent
+                if line_index == 0 and block.marker:
+                    # 목록 표시는 본문 시작 위치 앞에 오른쪽 정렬
+                    marker_x = x - 4 - fitz.get_text_length(block.marker, fontname="helv", fontsize=fontsize)
+                    self.safe_insert_text(page, (marker_x, self.current_y), block.marker, fontsize=fontsize, color=color, fontname="helv")
+                for piece, run in line:
+                    self.safe_insert_text(page, (x, self.current_y), piece, fontsize=fontsize, color=color, fontname=font_for(run))
+                    x += fitz.get_text_length(piece, fontname=font_for(run), fontsize=fontsize)
+                self.current_y += line_height
+
+            self.current_y += 4 if block.kind in ('bullet', 'ordered', 'table') else 8
+
+        self.current_y += 10  # 블록 간 여백
+        return self.current_y
+    
+    def get_chart_image(self, chart_data, chart_type='bar', title='차트', dpi=CHART_DPI):
+        """캐시된 차트 PNG 반환 (없으면 생성 후 캐시) -> (캐시 키, PNG 바이트)"""
+        key = ChartImageCache.key_for(chart_data, chart_type, title, dpi)
+        image_bytes = chart_image_cache.get(key)
+        if image_bytes is None:
+            image_bytes = self.create_chart(chart_data, chart_type, title, dpi)
+            if image_bytes is not None:
+                chart_image_cache.put(key, image_bytes)
+        else:
+            print(f"♻️ 차트 이미지 캐시 사용: {title}")
+        return key, image_bytes
+    
+    def create_chart(self, chart_data, chart_type='bar', title='차트', dpi=CHART_DPI):
         """차트 생성 및 이미지 반환 - 오류 처리 강화"""
         try:
             plt.figure(figsize=(10, 6))
@@ -256,7 +433,7 @@ class KoreanPDFGenerator:
             
             # 이미지를 바이트로 변환
             img_buffer = io.BytesIO()
-            plt.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight')
+            plt.savefig(img_buffer, format='png', dpi=dpi, bbox_inches='tight')
             img_buffer.seek(0)
             
             image_bytes = img_buffer.getvalue()
@@ -277,8 +454,8 @@ class KoreanPDFGenerator:
                 page = self.add_page()
                 self.add_header(page, "AI 분석 리포트 (계속)")
             
-            # 차트 생성
-            chart_image = self.create_chart(chart_data, chart_type, title)
+            # 차트 생성 (같은 차트는 캐시에서)
+            chart_key, chart_image = self.get_chart_image(chart_data, chart_type, title)
             
             if chart_image is None:
                 print(f"⚠️ 차트 생성 실패, 텍스트로 대체: {title}")
@@ -296,7 +473,12 @@ class KoreanPDFGenerator:
                 self.current_y + 180
             )
             
-            page.insert_image(img_rect, stream=chart_image)
+            # 같은 문서에 이미 들어간 이미지는 xref로 참조만 추가
+            xref = self._image_xrefs.get(chart_key)
+            if xref:
+                page.insert_image(img_rect, xref=xref)
+            else:
+                self._image_xrefs[chart_key] = page.insert_image(img_rect, stream=chart_image)
             self.current_y += 200
             
             return page
@@ -318,7 +500,8 @@ class KoreanPDFGenerator:
             
             # 새 문서 생성
             self.create_new_document()
-            if not self.doc:
+            # 빈 fitz.Document는 len()이 0이라 falsy이므로 None과 비교
+            if self.doc is None:
                 raise Exception("PDF 문서 생성 실패")
             
             page = self.add_page()
@@ -333,7 +516,8 @@ class KoreanPDFGenerator:
             
             # AI 인사이트 섹션
             self.add_section_title(page, "🔍 AI 분석 결과")
-            self.add_text_block(page, ai_insights)
+            self.add_markdown_block(page, ai_insights)
+            page = self.page
             print("✅ AI 인사이트 섹션 추가 완료")
             
             # 데이터 요약 섹션
@@ -346,6 +530,7 @@ class KoreanPDFGenerator:
 AI 모델: Claude 3.5 Sonnet (Amazon Bedrock)
             """.strip()
             self.add_text_block(page, summary_text)
+            page = self.page
             print("✅ 데이터 요약 섹션 추가 완료")
             
             # 차트 섹션 (데이터가 있는 경우)
@@ -386,6 +571,7 @@ AI 모델: Claude 3.5 Sonnet (Amazon Bedrock)
             print(f"🔍 오류 상세:\n{traceback.format_exc()}")
             
             # 문서가 생성된 경우 정리
+            self.close_header_templates()
             if self.doc:
                 try:
                     self.doc.close()
@@ -397,14 +583,20 @@ AI 모델: Claude 3.5 Sonnet (Amazon Bedrock)
     def save_document(self, filename):
         """문서 저장"""
         if self.doc:
-            self.doc.save(filename)
+            if deterministic.enabled():
+                with open(filename, 'wb') as f:
+                    f.write(self.get_document_bytes())
+            else:
+                self.doc.save(filename, garbage=3, deflate=True)
             return filename
         return None
     
     def get_document_bytes(self):
-        """문서를 바이트로 반환"""
+        """문서를 바이트로 반환 (삽입된 이미지는 원본 픽셀로 저장되므로 압축)"""
         if self.doc:
-            return self.doc.write()
+            pdf_bytes = deterministic.fitz_tobytes(self.doc, garbage=3, deflate=True)
+            self.close_header_templates()
+            return pdf_bytes
         return None
 
 def generate_korean_pdf_report(ai_insights, analytics_data, output_path=None):
@@ -459,6 +651,8 @@ def generate_korean_pdf_report(ai_insights, analytics_data, output_path=None):
         
     finally:
         # 리소스 정리
+        if generator:
+            generator.close_header_templates()
         if generator and generator.doc:
             try:
                 generator.doc.close()
@@ -5,7 +5,7 @@
 """
 
 from reportlab.lib.pagesizes import A4, letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image, PageBreak
+from reportlab.platypus import SimpleDocTemplate, Spacer, Table, TableStyle, Image, PageBreak
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib import colors
@@ -13,10 +13,12 @@ from reportlab.graphics.shapes import Drawing, Rect, String
 from reportlab.graphics.charts.barcharts import VerticalBarChart
 from reportlab.graphics.charts.piecharts import Pie
 from reportlab.graphics.charts.linecharts import HorizontalLineChart
-from datetime import datetime
 import io
 import json
 
+import deterministic
+from layout_cache import CachedParagraph as Paragraph
+
 def create_chart_drawing(chart_data, chart_type='bar', width=400, height=200):
     """차트 그리기 함수"""
     try:
@@ -72,7 +74,8 @@ def create_professional_report(ai_insights, analytics_data):
             rightMargin=50,
             leftMargin=50,
             topMargin=50,
-            bottomMargin=50
+            bottomMargin=50,
+            invariant=deterministic.enabled()
         )
         
         # 스타일 정의
@@ -134,7 +137,7 @@ def create_professional_report(ai_insights, analytics_data):
         story.append(Paragraph("AI-Powered Analytics Report", heading_style))
         story.append(Spacer(1, 1*inch))
         
-        now = datetime.now().strftime("%B %d, %Y")
+        now = deterministic.now().strftime("%B %d, %Y")
         story.append(Paragraph(f"Generated on: {now}", body_style))
         story.append(Paragraph("AI Model: Claude 4 Sonnet (Amazon Bedrock)", body_style))
         story.append(Spacer(1, 0.5*inch))
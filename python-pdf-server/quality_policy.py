@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+리포트 품질 자동 조정 - 렌더링 대기열/평균 렌더링 시간이 기준을 넘으면 비필수 요청의 품질을 낮춤
+
+- 1단계(standard): 파이 차트 생략
+- 2단계(draft): 차트/표지/목차 없이 내장 폰트
+- 요청한 품질보다 높이지는 않고, 중요(critical) 요청은 낮추지 않음
+"""
+
+import os
+
+from advanced_korean_report import QUALITY_LEVELS
+
+# 부하 단계별 상한 품질
+_LOAD_CAPS = ('full', 'standard', 'draft')
+
+def is_critical(priority):
+    """priority 값이 'critical'인지 (본문 priority 또는 X-Report-Priority 헤더)"""
+    return str(priority or '').strip().lower() == 'critical'
+
+class QualityPolicy:
+    """대기열 길이/평균 렌더링 시간 -> 허용 품질 상한"""
+
+    def __init__(self, enabled, standard_queue_depth, draft_queue_depth, standard_latency, draft_latency):
+        self.enabled = enabled
+        self.standard_queue_depth = standard_queue_depth
+        self.draft_queue_depth = draft_queue_depth
+        self.standard_latency = standard_latency
+        self.draft_latency = draft_latency
+
+    @classmethod
+    def from_env(cls, max_queued):
+        """환경 변수로 설정 (대기열 기준 기본값은 최대 대기 수의 1/4, 1/2)"""
+        standard_queue_depth = int(os.environ.get('PDF_DEGRADE_QUEUE_DEPTH', max(1, max_queued // 4)))
+        return cls(
+            enabled=os.environ.get('PDF_AUTO_DEGRADE', 'true').lower() == 'true',
+            standard_queue_depth=standard_queue_depth,
+            draft_queue_depth=int(os.environ.get('PDF_DRAFT_QUEUE_DEPTH', max(standard_queue_depth + 1, max_queued // 2))),
+            standard_latency=float(os.environ.get('PDF_DEGRADE_LATENCY_SECONDS', 10)),
+            draft_latency=float(os.environ.get('PDF_DRAFT_LATENCY_SECONDS', 20))
+        )
+
+    def load_level(self, load):
+        """load: AdmissionController.load() -> 0(정상) / 1(standard까지) / 2(draft까지)"""
+        queued, _, avg_render_seconds = load
+        if queued >= self.draft_queue_depth or avg_render_seconds >= self.draft_latency:
+            return 2
+        if queued >= self.standard_queue_depth or avg_render_seconds >= self.standard_latency:
+            return 1
+        return 0
+
+    def effective_quality(self, requested, critical, load):
+        """실제로 렌더링할 품질 (요청 품질과 부하 상한 중 낮은 쪽)"""
+        if not self.enabled or critical:
+            return requested
+
+        cap = _LOAD_CAPS[self.load_level(load)]
+        if QUALITY_LEVELS.index(cap) < QUALITY_LEVELS.index(requested):
+            return cap
+        return requested
+
+    def to_dict(self):
+        return {
+            'enabled': self.enabled,
+            'standard_queue_depth': self.standard_queue_depth,
+            'draft_queue_depth': self.draft_queue_depth,
+            'standard_latency_seconds': self.standard_latency,
+            'draft_latency_seconds': self.draft_latency
+        }
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+렌더링 마감 시간 - 섹션/플로어블 사이 협조적 취소 + 초과 시 렌더링 프로세스 강제 종료
+"""
+
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from contextlib import contextmanager
+
+import fork_state
+import metrics
+import tracing
+from memory_watchdog import peak_rss_bytes
+
+class RenderCancelled(Exception):
+    """마감 시간 초과로 렌더링 중단"""
+
+class Deadline:
+    """monotonic 시계 기준 마감 시각"""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        return time.monotonic() >= self.expires_at
+
+_local = threading.local()
+
+@contextmanager
+def deadline_scope(deadline):
+    """현재 스레드의 렌더링 마감 시간 설정"""
+    previous = getattr(_local, 'deadline', None)
+    _local.deadline = deadline
+    try:
+        yield deadline
+    finally:
+        _local.deadline = previous
+
+def checkpoint():
+    """취소 지점 - 마감 시간이 지났으면 RenderCancelled"""
+    deadline = getattr(_local, 'deadline', None)
+    if deadline is not None and deadline.expired():
+        raise RenderCancelled(f'렌더링 마감 시간 {deadline.seconds:g}초 초과')
+
+class DeadlinePolicy:
+    """서버 마감 시간 정책 (클라이언트는 더 짧게만 요청 가능)"""
+
+    def __init__(self, max_seconds, kill_margin, hard_kill):
+        self.max_seconds = max_seconds
+        self.kill_margin = kill_margin
+        self.hard_kill = hard_kill
+
+    @classmethod
+    def from_env(cls):
+        """환경 변수로 설정
+
+        강제 종료(PDF_RENDER_HARD_KILL)는 기본 꺼짐: 렌더링마다 멀티스레드 서버를 fork하므로
+        포크 순간 다른 스레드가 잡고 있던 락(stdout 버퍼 등 fork_state가 모르는 락)이 자식에서 풀리지 않아
+        마감 시간까지 멈출 수 있다. 요청 스레드가 하나뿐인 워커(예: gunicorn sync)에서만 켠다.
+        """
+        return cls(
+            max_seconds=float(os.environ.get('PDF_RENDER_DEADLINE', 60)),
+            kill_margin=float(os.environ.get('PDF_RENDER_KILL_MARGIN', 5)),
+            hard_kill=os.environ.get('PDF_RENDER_HARD_KILL', 'false').lower() == 'true'
+        )
+
+    def deadline_for(self, requested_seconds=None):
+        """요청된 시간과 서버 상한 중 짧은 쪽으로 Deadline 생성"""
+        seconds = self.max_seconds
+        try:
+            if requested_seconds is not None and float(requested_seconds) > 0:
+                seconds = min(seconds, float(requested_seconds))
+        except (TypeError, ValueError):
+            print(f"⚠️ 잘못된 렌더링 마감 시간 무시: {requested_seconds}")
+        return Deadline(seconds)
+
+    def run(self, fn, deadline):
+        """마감 시간 안에서 fn() 실행 (hard_kill이면 별도 프로세스에서)"""
+        if not self.hard_kill:
+            return _run_cooperative(fn, deadline)
+        return _run_in_child(fn, deadline, self.kill_margin)
+
+def _run_cooperative(fn, deadline):
+    try:
+        with deadline_scope(deadline):
+            return fn()
+    except RenderCancelled:
+        metrics.increment('render.cancelled')
+        raise
+
+def child_peak_rss():
+    """현재 스레드가 마지막으로 기다린 렌더링 프로세스의 최대 RSS (읽으면 지움, 없으면 None)"""
+    peak = getattr(_local, 'child_peak_rss', None)
+    _local.child_peak_rss = None
+    return peak
+
+def _child_main(fn, deadline, conn):
+    """포크된 렌더링 프로세스 본체 (결과와 함께 기록한 추적 span, 캐시 변경분을 돌려줌)"""
+    # 자기 프로세스 그룹 - 강제 종료할 때 섹션 워커(손자 프로세스)까지 한 번에 정리
+    os.setpgrp()
+    try:
+        with deadline_scope(deadline):
+            message = ('ok', fn())
+    except RenderCancelled as e:
+        message = ('cancelled', str(e))
+    except BaseException as e:
+        message = ('error', f'{type(e).__name__}: {e}')
+    try:
+        conn.send(message + (tracing.take_pending(), fork_state.take_updates(), peak_rss_bytes(include_children=True)))
+    finally:
+        conn.close()
+
+def _run_in_child(fn, deadline, kill_margin):
+    # fork로 워밍업된 폰트/정적 페이지 캐시를 그대로 물려받고, 새로 채운 캐시는 돌려받는다
+    # (포크 순간 다른 스레드가 잡고 있던 락은 fork_state.ForkSafeLock이 자식에서 새로 만든다)
+    # (섹션 병렬 렌더링이 다시 자식 프로세스를 만들 수 있도록 daemon으로 두지 않음 - 초과 시 kill로 정리)
+    context = multiprocessing.get_context('fork')
+    recv_conn, send_conn = context.Pipe(duplex=False)
+    process = context.Process(target=_child_main, args=(fn, deadline, send_conn))
+    process.start()
+    send_conn.close()
+
+    try:
+        if not recv_conn.poll(deadline.remaining() + kill_margin):
+            _kill_group(process)
+            metrics.increment('render.hard_killed')
+            print(f"💀 렌더링 프로세스 강제 종료 (pid {process.pid}, 마감 {deadline.seconds:g}초 + {kill_margin:g}초)")
+            raise RenderCancelled(f'렌더링 마감 시간 {deadline.seconds:g}초 초과 (강제 종료)')
+
+        try:
+            status, value, spans, updates, peak_rss = recv_conn.recv()
+        except EOFError:
+            raise RuntimeError(f'렌더링 프로세스가 비정상 종료됨 (exit code {process.exitcode})')
+        _local.child_peak_rss = peak_rss
+        tracing.adopt(spans)
+        fork_state.adopt_updates(updates)
+    finally:
+        recv_conn.close()
+        process.join(timeout=1)
+
+    if status == 'cancelled':
+        metrics.increment('render.cancelled')
+        raise RenderCancelled(value)
+    if status == 'error':
+        raise RuntimeError(value)
+    return value
+
+def _kill_group(process):
+    """렌더링 프로세스와 그 섹션 워커를 모두 SIGKILL (SIGKILL은 finally가 돌지 않아 워커가 남으므로)"""
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        # 아직 setpgrp 전이면 그룹이 없음 - 프로세스만 (워커도 아직 없음)
+        process.kill()
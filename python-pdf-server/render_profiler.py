@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+렌더링 프로파일링 - 느린 페이로드를 cProfile + tracemalloc + 스택 샘플링으로 한 번 렌더링
+
+- 함수별 누적 시간 상위 (cProfile)
+- 줄 단위 메모리 할당 상위 (tracemalloc, 렌더링 전후 스냅샷 비교로 렌더링 중 늘어난 할당) + 최대 추적 메모리
+- tracemalloc은 프로세스 전역이므로 프로파일링은 한 번에 하나씩
+- flamegraph.pl / speedscope에서 열 수 있는 folded 스택 ("a;b;c 횟수")
+  cProfile은 호출 스택을 남기지 않으므로 별도 스레드가 렌더링 스레드의 스택을 주기적으로 샘플링
+"""
+
+import cProfile
+import hmac
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+import fork_state
+
+# 동시 프로파일링이 서로의 tracemalloc을 멈추지 않도록 직렬화
+_profile_lock = fork_state.ForkSafeLock()
+
+_ALLOCATION_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>')
+]
+
+class ProfilingSettings:
+    """/debug/profile 설정 (기본 비활성, 켜려면 토큰 필수)"""
+
+    def __init__(self, enabled, token, top, sample_interval):
+        self.enabled = enabled and bool(token)
+        self.token = token
+        self.top = top
+        self.sample_interval = sample_interval
+
+    @classmethod
+    def from_env(cls):
+        """환경 변수로 설정"""
+        enabled = os.environ.get('PDF_PROFILING_ENABLED', 'false').lower() == 'true'
+        token = os.environ.get('PDF_PROFILING_TOKEN', '')
+        if enabled and not token:
+            print("⚠️ PDF_PROFILING_TOKEN이 없어 프로파일링 엔드포인트 비활성화")
+        return cls(
+            enabled=enabled,
+            token=token,
+            top=int(os.environ.get('PDF_PROFILING_TOP', 30)),
+            sample_interval=float(os.environ.get('PDF_PROFILING_SAMPLE_MS', 5)) / 1000
+        )
+
+    def authorized(self, request):
+        """Authorization: Bearer <토큰> 또는 X-Debug-Token 확인"""
+        if not self.enabled:
+            return False
+        supplied = request.headers.get('X-Debug-Token', '')
+        authorization = request.headers.get('Authorization', '')
+        if authorization.lower().startswith('bearer '):
+            supplied = authorization[7:].strip()
+        return hmac.compare_digest(supplied.encode('utf-8'), self.token.encode('utf-8'))
+
+class StackSampler(threading.Thread):
+    """대상 스레드의 파이썬 스택을 interval초마다 기록 (folded 스택 집계)
+
+    root_code 프레임 아래(렌더링 호출부터)만 기록한다.
+    """
+
+    def __init__(self, thread_id, interval, root_code=None):
+        threading.Thread.__init__(self, daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.root_code = root_code
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None and frame.f_code is not self.root_code:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if names:
+                self.stacks[';'.join(reversed(names))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def folded(self):
+        """flamegraph.pl 입력 형식 (스택별 샘플 수, 많은 순)"""
+        return '\n'.join(f'{stack} {count}' for stack, count in self.stacks.most_common())
+
+def _function_rows(profiler, top):
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, line, name), (primitive_calls, calls, total_time, cumulative_time, _) in stats.stats.items():
+        rows.append({
+            'function': f'{name} ({os.path.basename(filename)}:{line})' if line else name,
+            'file': filename,
+            'calls': calls,
+            'primitive_calls': primitive_calls,
+            'total_seconds': round(total_time, 6),
+            'cumulative_seconds': round(cumulative_time, 6)
+        })
+    rows.sort(key=lambda row: row['cumulative_seconds'], reverse=True)
+    return rows[:top]
+
+def _allocation_rows(snapshot_start, snapshot_end, top):
+    """렌더링 중 늘어난 할당 (줄 단위, 시작 전부터 있던 폰트/캐시 등은 제외)"""
+    diffs = snapshot_end.filter_traces(_ALLOCATION_FILTERS).compare_to(snapshot_start.filter_traces(_ALLOCATION_FILTERS), 'lineno')
+    diffs = sorted((stat for stat in diffs if stat.size_diff > 0), key=lambda stat: stat.size_diff, reverse=True)
+    return [
+        {
+            'location': f'{stat.traceback[0].filename}:{stat.traceback[0].lineno}',
+            'size_bytes': stat.size_diff,
+            'count': stat.count_diff
+        }
+        for stat in diffs[:top]
+    ]
+
+def profile_render(render, top=30, sample_interval=0.005):
+    """render()를 프로파일링하며 실행 -> (결과, 프로파일 dict)
+
+    렌더링과 같은 스레드에서 호출해야 한다 (cProfile/샘플링 대상이 현재 스레드).
+    다른 프로파일링이 진행 중이면 끝날 때까지 기다린다.
+    """
+    with _profile_lock:
+        sampler = StackSampler(threading.get_ident(), sample_interval, profile_render.__code__)
+        profiler = cProfile.Profile()
+
+        # 이미 추적 중이면(PYTHONTRACEMALLOC 등) 그대로 두고 최대값만 다시 잼
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        snapshot_start = tracemalloc.take_snapshot()
+        sampler.start()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            result = render()
+        finally:
+            profiler.disable()
+            elapsed = time.perf_counter() - start
+            sampler.stop()
+            snapshot_end = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            if started:
+                tracemalloc.stop()
+
+    return result, {
+        'render_seconds': round(elapsed, 4),
+        'peak_traced_bytes': peak,
+        'functions': _function_rows(profiler, top),
+        'allocations': _allocation_rows(snapshot_start, snapshot_end, top),
+        'samples': sum(sampler.stacks.values()),
+        'sample_interval_ms': sample_interval * 1000,
+        'folded_stacks': sampler.folded()
+    }
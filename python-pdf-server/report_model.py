@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+리포트 데이터 모델 - 분석 데이터에서 지표/등급/순위를 계산해 순수 데이터(dict)로 반환
+
+PDF 생성기와 /report-model(웹 대시보드)이 같은 모델을 사용한다.
+"""
+
+# 상위 몇 개까지 리포트에 포함할지
+TOP_CATEGORIES = 6
+TOP_CONTENT = 8
+TITLE_MAX_LENGTH = 30
+
+# 참여율 평가 기준 (%)
+ENGAGEMENT_GOOD_THRESHOLD = 20
+
+# (최소 비중 %, 등급 코드, 표시 라벨) - 위에서부터 처음 만족하는 등급
+CATEGORY_GRADES = [
+    (25, 'best', '🔥 최우수'),
+    (15, 'excellent', '⭐ 우수'),
+    (10, 'good', '📈 양호'),
+    (0, 'average', '📊 보통')
+]
+
+# (최소 조회수, 등급 코드, 표시 라벨, 추천도)
+CONTENT_GRADES = [
+    (5, 'best', '🔥 최우수', '⭐⭐⭐'),
+    (3, 'excellent', '📈 우수', '⭐⭐'),
+    (1, 'good', '📊 양호', '⭐'),
+    (0, 'basic', '📋 기본', '-')
+]
+
+def engagement_rate(analytics_data):
+    """콘텐츠 조회 / 페이지뷰 (%)"""
+    return analytics_data.get('totalContentViews', 0) / max(analytics_data.get('totalPageViews', 1), 1) * 100
+
+def _category_grade(percentage):
+    for threshold, code, label in CATEGORY_GRADES:
+        if percentage >= threshold:
+            return code, label
+    return CATEGORY_GRADES[-1][1:]
+
+def _content_grade(views):
+    for threshold, code, label, recommendation in CONTENT_GRADES:
+        if views >= threshold:
+            return code, label, recommendation
+    return CONTENT_GRADES[-1][1:]
+
+def build_summary_model(analytics_data):
+    """1. 전체 현황 요약"""
+    rate = engagement_rate(analytics_data)
+    good = rate >= ENGAGEMENT_GOOD_THRESHOLD
+    page_views = analytics_data.get('totalPageViews', 0)
+    content_views = analytics_data.get('totalContentViews', 0)
+    period = analytics_data.get('period', '전체 기간')
+
+    return {
+        'total_visitors': analytics_data.get('totalVisitors', 0),
+        'total_page_views': page_views,
+        'total_content_views': content_views,
+        'period': period,
+        'engagement_rate': round(rate, 1),
+        'engagement_good': good,
+        'content_views_per_page_view': round(content_views / max(page_views, 1), 1),
+        'metrics': [
+            {'name': '총 페이지뷰', 'value': f"{page_views:,}회", 'evaluation': '📈 양호', 'trend': '↗️ 증가'},
+            {'name': '콘텐츠 조회', 'value': f"{content_views:,}회", 'evaluation': '👀 활성', 'trend': '→ 안정'},
+            {'name': '참여율', 'value': f"{rate:.1f}%", 'evaluation': '🔥 우수' if good else '📊 보통', 'trend': '↗️ 개선'},
+            {'name': '분석 기간', 'value': period, 'evaluation': '📅 완료', 'trend': '✅ 현재'}
+        ]
+    }
+
+def build_category_model(analytics_data):
+    """2. 카테고리별 조회수, 비중, 등급 (상위 TOP_CATEGORIES개)"""
+    category_data = (analytics_data.get('category') or [])[:TOP_CATEGORIES]
+    labels = [item.get('category', '미분류') for item in category_data]
+    values = [item.get('count', 0) for item in category_data]
+    total_views = sum(values)
+
+    rows = []
+    for rank, (category, count) in enumerate(zip(labels, values), 1):
+        percentage = (count / total_views * 100) if total_views > 0 else 0
+        grade, grade_label = _category_grade(percentage)
+        rows.append({
+            'rank': rank,
+            'category': category,
+            'count': count,
+            'percentage': round(percentage, 1),
+            'grade': grade,
+            'grade_label': grade_label
+        })
+
+    return {
+        'chart': {'labels': labels, 'values': values},
+        'total_views': total_views,
+        'rows': rows
+    }
+
+def build_content_model(analytics_data):
+    """3. 상위 콘텐츠 순위와 등급 (상위 TOP_CONTENT개)"""
+    rows = []
+    for rank, item in enumerate((analytics_data.get('content') or [])[:TOP_CONTENT], 1):
+        title = item.get('title', '제목 없음')
+        views = item.get('views', 0)
+        grade, grade_label, recommendation = _content_grade(views)
+        rows.append({
+            'rank': rank,
+            'title': title,
+            'display_title': title[:TITLE_MAX_LENGTH] + '...' if len(title) > TITLE_MAX_LENGTH else title,
+            'views': views,
+            'grade': grade,
+            'grade_label': grade_label,
+            'recommendation': recommendation
+        })
+
+    return {'rows': rows}
+
+def build_time_model(analytics_data):
+    """4. 시간대별 활동"""
+    time_data = analytics_data.get('time') or []
+    labels = [item.get('hour', 0) for item in time_data]
+    values = [item.get('count', 0) for item in time_data]
+    peak = max(range(len(values)), key=values.__getitem__) if values else None
+
+    return {
+        'chart': {'labels': labels, 'values': values},
+        'peak_hour': labels[peak] if peak is not None else None,
+        'peak_count': values[peak] if peak is not None else 0
+    }
+
+def build_report_model(analytics_data):
+    """분석 데이터 -> 리포트 모델 (JSON 직렬화 가능한 dict)"""
+    analytics_data = analytics_data if isinstance(analytics_data, dict) else {}
+    return {
+        'summary': build_summary_model(analytics_data),
+        'categories': build_category_model(analytics_data),
+        'content': build_content_model(analytics_data),
+        'time': build_time_model(analytics_data)
+    }
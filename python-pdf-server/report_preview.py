@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+리포트 페이지 미리보기 - 저장된 PDF의 한 페이지를 요청 폭으로 래스터화 (WebP/PNG)
+
+(리포트 ID, 페이지, 폭, 형식)별로 메모리 LRU 캐시
+"""
+
+import io
+import os
+import threading
+from collections import OrderedDict
+
+try:
+    import fitz  # PyMuPDF - 페이지 래스터화
+except ImportError:
+    fitz = None
+
+try:
+    from PIL import Image, features
+    WEBP_SUPPORTED = features.check('webp')
+except ImportError:
+    Image = None
+    WEBP_SUPPORTED = False
+
+import metrics
+
+DEFAULT_WIDTH = 400
+MIN_WIDTH = 32
+MAX_WIDTH = 2000
+
+class PreviewError(Exception):
+    """미리보기 요청 오류 (status_code: 400/404/501)"""
+
+    def __init__(self, status_code, message):
+        Exception.__init__(self, message)
+        self.status_code = status_code
+
+def parse_preview_args(args):
+    """쿼리 문자열 -> (페이지 번호(1부터), 폭)"""
+    try:
+        page = int(args.get('page', 1))
+        width = int(args.get('width', DEFAULT_WIDTH))
+    except ValueError:
+        raise PreviewError(400, 'page와 width는 정수여야 합니다.')
+    if page < 1:
+        raise PreviewError(400, 'page는 1 이상이어야 합니다.')
+    return page, min(MAX_WIDTH, max(MIN_WIDTH, width))
+
+def negotiate_image_format(request):
+    """Accept에 image/webp가 있고 Pillow가 WebP를 지원하면 WebP, 아니면 PNG"""
+    if WEBP_SUPPORTED and request.accept_mimetypes['image/webp'] > 0:
+        return 'webp'
+    return 'png'
+
+def render_page_image(pdf_path, page_number, width, image_format):
+    """PDF 한 페이지를 폭 width 픽셀 이미지로 (bytes)"""
+    if fitz is None:
+        raise PreviewError(501, 'PyMuPDF가 설치되어 있지 않아 미리보기를 만들 수 없습니다.')
+
+    with fitz.open(pdf_path) as doc:
+        if page_number > doc.page_count:
+            raise PreviewError(404, f'페이지 {page_number}이(가) 없습니다. (전체 {doc.page_count}페이지)')
+        page = doc[page_number - 1]
+        scale = width / page.rect.width
+        pixmap = page.get_pixmap(matrix=fitz.Matrix(scale, scale), alpha=False)
+
+    if image_format == 'png':
+        return pixmap.tobytes('png')
+
+    image = Image.frombytes('RGB', (pixmap.width, pixmap.height), pixmap.samples)
+    buffer = io.BytesIO()
+    image.save(buffer, 'WEBP', quality=80, method=2)
+    return buffer.getvalue()
+
+class PreviewCache:
+    """(리포트 ID, 페이지, 폭, 형식) -> 이미지 bytes LRU"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """환경 변수로 설정"""
+        return cls(int(os.environ.get('PDF_PREVIEW_CACHE_SIZE', 256)))
+
+    def get_or_render(self, key, render):
+        with self._lock:
+            image = self._entries.get(key)
+            if image is not None:
+                self._entries.move_to_end(key)
+                metrics.increment('preview.cache_hits')
+                return image
+
+        image = render()
+        metrics.increment('preview.rendered')
+
+        with self._lock:
+            self._entries[key] = image
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return image
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+동일 요청 합치기 (single-flight) - 같은 페이로드의 동시 렌더링을 한 번으로
+"""
+
+import hashlib
+import json
+import threading
+
+import metrics
+from render_deadline import RenderCancelled
+
+def canonical_payload_hash(payload):
+    """키 순서/공백과 무관한 페이로드 해시 (sha256 hex)"""
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+class _Call:
+    """진행 중인 렌더링 한 건"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+class SingleFlight:
+    """같은 키로 동시에 들어온 호출은 첫 호출의 결과를 함께 받는다"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, deadline=None):
+        """fn()을 키당 한 번만 실행하고 (결과, 공유 여부) 반환
+
+        결과를 기다리는 요청은 자기 deadline까지만 기다리고 RenderCancelled
+        (앞선 렌더링이 멈춰도 함께 묶이지 않음, 앞선 렌더링은 계속 진행).
+        앞선 렌더링이 자기 마감 시간으로 취소되면 시간이 남은 요청이 이어받아 다시 렌더링한다.
+        """
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                if call is not None:
+                    call.waiters += 1
+                    leader = False
+                else:
+                    call = _Call()
+                    self._calls[key] = call
+                    leader = True
+
+            if leader:
+                break
+
+            if not call.done.wait(deadline.remaining() if deadline is not None else None):
+                with self._lock:
+                    call.waiters -= 1
+                metrics.increment('render.cancelled')
+                raise RenderCancelled(f'렌더링 마감 시간 {deadline.seconds:g}초 초과 (동일 요청 결과 대기 중)')
+            if isinstance(call.error, RenderCancelled) and (deadline is None or not deadline.expired()):
+                # 앞선 요청의 마감 시간이 더 짧았을 뿐 - 자기 마감 시간으로 다시 (다른 대기자가 먼저 이어받았으면 합류)
+                metrics.increment('coalescing.takeovers')
+                print(f"🔁 앞선 렌더링 취소, 대기 요청이 이어받음: {key[:12]}")
+                continue
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        if call.waiters:
+            print(f"🔗 동일 요청 {call.waiters}건 합쳐서 처리: {key[:12]}")
+        return call.result, False
+
+    def in_flight(self):
+        """현재 진행 중인 키 개수"""
+        with self._lock:
+            return len(self._calls)
+
+    def pending(self):
+        """렌더링 결과를 기다리는 요청 수 (대기열 깊이)"""
+        with self._lock:
+            return sum(1 + call.waiters for call in self._calls.values())
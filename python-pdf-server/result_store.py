@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+로컬 결과 저장소 - 생성된 PDF를 디스크에 보관 (TTL + 전체 크기 상한으로 정리)
+
+- 리포트 ID는 ETag (같은 페이로드/버전/날짜면 같은 파일) -> 재시도/재다운로드 시 렌더링 생략
+- 다운로드는 파일 경로를 그대로 send_file에 넘겨 서버의 sendfile 경로를 탄다
+"""
+
+import os
+import re
+import tempfile
+import threading
+import time
+
+import metrics
+
+REPORT_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+class ResultStore:
+    """ETag -> PDF 파일 디스크 저장소"""
+
+    def __init__(self, directory, ttl_seconds, max_bytes):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        # 리포트 ID -> (크기, 마지막 접근 시각)
+        self._index = {}
+        self._total_bytes = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    @classmethod
+    def from_env(cls):
+        """환경 변수로 설정"""
+        return cls(
+            directory=os.environ.get('PDF_RESULT_STORE_DIR') or os.path.join(tempfile.gettempdir(), 'aws-demo-factory-reports'),
+            ttl_seconds=float(os.environ.get('PDF_RESULT_TTL', 3600)),
+            max_bytes=int(os.environ.get('PDF_RESULT_STORE_MAX_MB', 512)) * 1024 * 1024
+        )
+
+    def _load_index(self):
+        # 재시작(exec) 후에도 이전 워커가 남긴 파일을 이어서 사용
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith('.tmp'):
+                _remove(path)
+                continue
+            report_id = name[:-4] if name.endswith('.pdf') else None
+            if report_id and REPORT_ID_PATTERN.match(report_id):
+                stat = os.stat(path)
+                self._index[report_id] = (stat.st_size, stat.st_mtime)
+                self._total_bytes += stat.st_size
+        self._evict(time.time())
+
+    def _path(self, report_id):
+        return os.path.join(self.directory, f'{report_id}.pdf')
+
+    def path_for(self, report_id):
+        """유효한(만료되지 않은) 리포트 파일 경로, 없으면 None"""
+        if not REPORT_ID_PATTERN.match(report_id or ''):
+            return None
+
+        now = time.time()
+        with self._lock:
+            entry = self._index.get(report_id)
+            if entry is None:
+                entry = self._adopt_from_disk(report_id)
+            if entry is None:
+                metrics.increment('result_store.misses')
+                return None
+            if now - entry[1] > self.ttl_seconds:
+                self._drop(report_id)
+                metrics.increment('result_store.expired')
+                return None
+            # 접근할 때마다 수명 연장 (크기 초과 시 가장 오래 안 쓴 것부터 정리)
+            self._index[report_id] = (entry[0], now)
+
+        metrics.increment('result_store.hits')
+        return self._path(report_id)
+
+    def _adopt_from_disk(self, report_id):
+        # 다른 워커가 (이 프로세스가 색인을 읽은 뒤) 저장한 파일이면 색인에 추가
+        try:
+            stat = os.stat(self._path(report_id))
+        except FileNotFoundError:
+            return None
+        entry = (stat.st_size, stat.st_mtime)
+        self._index[report_id] = entry
+        self._total_bytes += stat.st_size
+        metrics.increment('result_store.adopted')
+        return entry
+
+    def read(self, report_id):
+        """저장된 PDF 바이트 (없으면 None)"""
+        path = self.path_for(report_id)
+        if path is None:
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            # 다른 워커가 먼저 정리한 경우
+            with self._lock:
+                self._drop(report_id)
+            return None
+
+    def put(self, report_id, pdf_bytes):
+        """PDF 저장 (임시 파일에 쓴 뒤 원자적으로 교체)"""
+        if not REPORT_ID_PATTERN.match(report_id):
+            raise ValueError(f'잘못된 리포트 ID: {report_id}')
+
+        fd, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(pdf_bytes)
+            os.replace(tmp_path, self._path(report_id))
+        except BaseException:
+            _remove(tmp_path)
+            raise
+
+        now = time.time()
+        with self._lock:
+            previous = self._index.get(report_id)
+            if previous is not None:
+                self._total_bytes -= previous[0]
+            self._index[report_id] = (len(pdf_bytes), now)
+            self._total_bytes += len(pdf_bytes)
+            self._evict(now)
+            metrics.set_gauge('result_store.bytes', self._total_bytes)
+            metrics.set_gauge('result_store.reports', len(self._index))
+
+        metrics.increment('result_store.writes')
+
+    def _evict(self, now):
+        # 만료된 파일 먼저, 그래도 크면 가장 오래 안 쓴 파일부터
+        for report_id in [rid for rid, (_, used) in self._index.items() if now - used > self.ttl_seconds]:
+            self._drop(report_id)
+            metrics.increment('result_store.expired')
+
+        if self._total_bytes > self.max_bytes:
+            for report_id, _ in sorted(self._index.items(), key=lambda item: item[1][1]):
+                if self._total_bytes <= self.max_bytes:
+                    break
+                self._drop(report_id)
+                metrics.increment('result_store.evicted')
+
+    def _drop(self, report_id):
+        # 전송 중인 파일은 열린 fd로 끝까지 읽히므로 바로 지워도 된다
+        size, _ = self._index.pop(report_id)
+        self._total_bytes -= size
+        _remove(self._path(report_id))
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'directory': self.directory,
+                'reports': len(self._index),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl_seconds
+            }
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+섹션 병렬 렌더링 - 각 함수를 포크된 프로세스에서 실행하고 결과를 순서대로 반환
+
+ReportLab 레이아웃은 순수 파이썬(GIL)이라 스레드로는 나뉘지 않으므로 프로세스를 사용한다.
+fork로 워밍업된 폰트/정적 페이지 캐시를 그대로 물려받고, 결과(PDF 바이트)만 파이프로 돌려받는다.
+"""
+
+import multiprocessing
+import os
+from multiprocessing.connection import wait
+
+from render_deadline import RenderCancelled, checkpoint
+import fork_state
+import tracing
+
+# 결과 대기 중 취소 지점을 확인하는 간격 (초)
+POLL_INTERVAL = 0.05
+
+def default_workers():
+    """PDF_SECTION_WORKERS (기본: CPU 수)"""
+    return int(os.environ.get('PDF_SECTION_WORKERS', os.cpu_count() or 1))
+
+def _worker_main(fn, conn):
+    try:
+        message = ('ok', fn())
+    except RenderCancelled as e:
+        message = ('cancelled', str(e))
+    except BaseException as e:
+        message = ('error', f'{type(e).__name__}: {e}')
+    try:
+        conn.send(message + (tracing.take_pending(), fork_state.take_updates()))
+    finally:
+        conn.close()
+
+def run_parallel(fns, max_workers):
+    """fns를 최대 max_workers개 프로세스에서 동시에 실행하고 결과 목록 반환 (입력 순서)"""
+    context = multiprocessing.get_context('fork')
+    results = [None] * len(fns)
+    pending = list(enumerate(fns))
+    running = {}
+
+    try:
+        while pending or running:
+            while pending and len(running) < max_workers:
+                index, fn = pending.pop(0)
+                recv_conn, send_conn = context.Pipe(duplex=False)
+                process = context.Process(target=_worker_main, args=(fn, send_conn))
+                process.start()
+                send_conn.close()
+                running[recv_conn] = (index, process)
+
+            for conn in wait(list(running), timeout=POLL_INTERVAL):
+                index, process = running.pop(conn)
+                try:
+                    status, value, spans, updates = conn.recv()
+                    tracing.adopt(spans)
+                    fork_state.adopt_updates(updates)
+                except EOFError:
+                    raise RuntimeError(f'섹션 렌더링 프로세스가 비정상 종료됨 (exit code {process.exitcode})')
+                finally:
+                    conn.close()
+                    process.join()
+
+                if status == 'cancelled':
+                    raise RenderCancelled(value)
+                if status == 'error':
+                    raise RuntimeError(value)
+                results[index] = value
+
+            checkpoint()
+
+        return results
+
+    finally:
+        # 실패/취소 시 남은 워커 정리
+        for conn, (_, process) in running.items():
+            process.kill()
+            process.join()
+            conn.close()
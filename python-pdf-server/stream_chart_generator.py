@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+차트 생성 모듈 - PDF 콘텐츠 스트림 직접 출력 백엔드
+
+ReportLab graphics 객체 트리(chart_generator.py)나 matplotlib PNG(pdf_generator.py)를
+거치지 않고, 미리 계산한 좌표로 PDF 드로잉 연산자(경로, 사각형, 텍스트)를
+페이지 콘텐츠 스트림에 그대로 기록한다.
+"""
+
+import math
+
+from reportlab.platypus import Flowable
+from reportlab.lib import colors
+from reportlab.lib.rl_accel import escapePDF, fp_str
+from reportlab.pdfbase import pdfmetrics
+
+BAR_COLOR = colors.HexColor('#FF9900')
+PIE_COLORS = [
+    colors.HexColor('#FF9900'),  # AWS 오렌지
+    colors.HexColor('#232F3E'),  # AWS 네이비
+    colors.HexColor('#4CAF50'),  # 녹색
+    colors.HexColor('#2196F3')   # 파랑
+]
+
+# 베지어 곡선으로 원호를 근사할 때 쓰는 상수 (90도 기준)
+_ARC_KAPPA = 4.0 / 3.0
+
+class StreamChart(Flowable):
+    """미리 계산된 PDF 연산자를 그대로 출력하는 차트 플로어블"""
+
+    def __init__(self, width, height, ops, texts):
+        Flowable.__init__(self)
+        self.width = width
+        self.height = height
+        self._ops = ops
+        self._texts = texts
+
+    def wrap(self, availWidth, availHeight):
+        return (self.width, self.height)
+
+    def draw(self):
+        doc = self.canv._doc
+        code = ['q', self._ops]
+
+        for size, matrix, fill, runs in self._texts:
+            code.append(f'BT {fill} rg {matrix} Tm')
+            for font_name, encoded in runs:
+                code.append(f'{doc.getInternalFontName(font_name)} {size} Tf ({encoded}) Tj')
+            code.append('ET')
+
+        code.append('Q')
+        self.canv.addLiteral('\n'.join(code))
+
+class _ChartBuilder:
+    """차트 하나의 연산자/텍스트를 모으는 도우미"""
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.ops = []
+        self.texts = []
+
+    @staticmethod
+    def _rgb(color):
+        return fp_str(color.red, color.green, color.blue)
+
+    def rect(self, x, y, w, h, fill=None, stroke=None, line_width=1):
+        self._paint(f'{fp_str(x, y, w, h)} re', fill, stroke, line_width)
+
+    def line(self, x1, y1, x2, y2, stroke=colors.black, line_width=1):
+        self._paint(f'{fp_str(x1, y1)} m {fp_str(x2, y2)} l', None, stroke, line_width)
+
+    def polyline(self, points, stroke=colors.black, line_width=1):
+        path = [f'{fp_str(*points[0])} m'] + [f'{fp_str(x, y)} l' for x, y in points[1:]]
+        self._paint(' '.join(path), None, stroke, line_width)
+
+    def wedge(self, cx, cy, r, start, end, fill=None, stroke=None, line_width=1):
+        """중심에서 start→end(라디안, 시계 방향 음수 허용) 부채꼴"""
+        path = [f'{fp_str(cx, cy)} m', f'{fp_str(cx + r * math.cos(start), cy + r * math.sin(start))} l']
+        segments = max(1, int(math.ceil(abs(end - start) / (math.pi / 2))))
+        step = (end - start) / segments
+        k = _ARC_KAPPA * math.tan(step / 4) * r
+
+        for i in range(segments):
+            a0 = start + i * step
+            a1 = a0 + step
+            x0, y0 = cx + r * math.cos(a0), cy + r * math.sin(a0)
+            x1, y1 = cx + r * math.cos(a1), cy + r * math.sin(a1)
+            path.append(f'{fp_str(x0 - k * math.sin(a0), y0 + k * math.cos(a0), x1 + k * math.sin(a1), y1 - k * math.cos(a1), x1, y1)} c')
+
+        path.append('h')
+        self._paint(' '.join(path), fill, stroke, line_width)
+
+    def _paint(self, path, fill, stroke, line_width):
+        ops = []
+        if fill is not None:
+            ops.append(f'{self._rgb(fill)} rg')
+        if stroke is not None:
+            ops.append(f'{self._rgb(stroke)} RG {fp_str(line_width)} w')
+        ops.append(path)
+        ops.append('B' if fill is not None and stroke is not None else 'f' if fill is not None else 'S')
+        self.ops.append(' '.join(ops))
+
+    def text(self, x, y, text, font_size=10, font_name='Helvetica', anchor='start', angle=0, color=colors.black):
+        text = str(text)
+        text_width = pdfmetrics.stringWidth(text, font_name, font_size)
+        offset = {'start': 0, 'middle': text_width / 2, 'end': text_width}[anchor]
+
+        cos_a = math.cos(math.radians(angle))
+        sin_a = math.sin(math.radians(angle))
+        matrix = fp_str(cos_a, sin_a, -sin_a, cos_a, x - offset * cos_a, y - offset * sin_a)
+
+        font = pdfmetrics.getFont(font_name)
+        runs = [(f.fontName, escapePDF(t)) for f, t in pdfmetrics.unicode2T1(text, [font] + font.substitutionFonts)]
+        self.texts.append((fp_str(font_size), matrix, self._rgb(color), runs))
+
+    def build(self):
+        return StreamChart(self.width, self.height, '\n'.join(self.ops), self.texts)
+
+def _placeholder_chart(width, height, message, fill=colors.lightgrey, stroke=colors.black, font_size=14):
+    """데이터 없음/오류 표시용 차트"""
+    builder = _ChartBuilder(width, height)
+    builder.rect(20, 20, width-40, height-40, fill=fill, stroke=stroke)
+    builder.text(width//2, height//2, message, font_size=font_size, anchor='middle')
+    return builder.build()
+
+def create_stream_bar_chart(data, width=400, height=250):
+    """콘텐츠 스트림 바 차트 (create_working_bar_chart와 같은 배치)"""
+    try:
+        if not data or not data.get('labels') or not data.get('values'):
+            return _placeholder_chart(width, height, "데이터 없음")
+
+        labels = data['labels'][:5]  # 최대 5개
+        values = data['values'][:5]
+
+        if not values or all(v == 0 for v in values):
+            return _placeholder_chart(width, height, "값 없음")
+
+        builder = _ChartBuilder(width, height)
+
+        chart_x = 50
+        chart_y = 50
+        chart_width = width - 100
+        chart_height = height - 100
+        value_max = max(values) * 1.2
+
+        # 값 축 눈금 (5구간)
+        for i in range(6):
+            tick_value = value_max * i / 5
+            tick_y = chart_y + chart_height * i / 5
+            builder.line(chart_x - 5, tick_y, chart_x, tick_y)
+            builder.text(chart_x - 8, tick_y - 3, f"{tick_value:g}" if tick_value == int(tick_value) else f"{tick_value:.1f}",
+                         font_size=10, anchor='end')
+
+        # 바
+        group_width = chart_width / len(values)
+        bar_width = group_width * 0.8
+        for i, (label, value) in enumerate(zip(labels, values)):
+            bar_x = chart_x + i * group_width + (group_width - bar_width) / 2
+            bar_height = (value / value_max) * chart_height
+            builder.rect(bar_x, chart_y, bar_width, bar_height, fill=BAR_COLOR, stroke=colors.black)
+
+            # 카테고리 라벨 (30도 회전, 오른쪽 끝 정렬)
+            label_x = chart_x + (i + 0.5) * group_width
+            builder.text(label_x + 8, chart_y - 12, label, font_size=10, anchor='end', angle=30)
+
+        # 축
+        builder.line(chart_x, chart_y, chart_x + chart_width, chart_y)
+        builder.line(chart_x, chart_y, chart_x, chart_y + chart_height)
+
+        # 제목
+        builder.text(width//2, height-25, "카테고리별 조회수", font_size=14, font_name="Helvetica-Bold", anchor='middle')
+
+        return builder.build()
+
+    except Exception as e:
+        print(f"❌ 스트림 바 차트 생성 오류: {e}")
+        return _placeholder_chart(width, height, f"차트 오류: {str(e)[:30]}", fill=colors.pink, stroke=colors.red, font_size=12)
+
+def create_stream_pie_chart(data, width=350, height=300):
+    """콘텐츠 스트림 파이 차트 (create_working_pie_chart와 같은 배치)"""
+    try:
+        if not data or not data.get('labels') or not data.get('values'):
+            return _placeholder_chart(width, height, "데이터 없음")
+
+        labels = data['labels'][:4]  # 최대 4개
+        values = data['values'][:4]
+
+        if not values or sum(values) == 0:
+            return _placeholder_chart(width, height, "값 없음")
+
+        builder = _ChartBuilder(width, height)
+
+        radius = 80
+        cx = width//2
+        cy = height//2 + 20
+        total = sum(values)
+
+        # 12시 방향에서 시계 방향으로
+        angle = math.pi / 2
+        for i, (label, value) in enumerate(zip(labels, values)):
+            sweep = 2 * math.pi * value / total
+            if sweep > 0:
+                builder.wedge(cx, cy, radius, angle, angle - sweep,
+                              fill=PIE_COLORS[i % len(PIE_COLORS)], stroke=colors.white, line_width=2)
+
+            mid = angle - sweep / 2
+            label_x = cx + radius * 1.2 * math.cos(mid)
+            label_y = cy + radius * 1.2 * math.sin(mid)
+            anchor = 'start' if math.cos(mid) > 0.1 else 'end' if math.cos(mid) < -0.1 else 'middle'
+            builder.text(label_x, label_y, label, font_size=9, anchor=anchor)
+            builder.text(label_x, label_y - 11, f"({value})", font_size=9, anchor=anchor)
+
+            angle -= sweep
+
+        # 제목
+        builder.text(width//2, height-30, "카테고리 분포", font_size=14, font_name="Helvetica-Bold", anchor='middle')
+
+        return builder.build()
+
+    except Exception as e:
+        print(f"❌ 스트림 파이 차트 생성 오류: {e}")
+        return _placeholder_chart(width, height, f"파이차트 오류: {str(e)[:30]}", fill=colors.pink, stroke=colors.red, font_size=12)
+
+def create_stream_line_chart(data, width=400, height=200):
+    """콘텐츠 스트림 라인 차트 (create_simple_line_chart와 같은 배치)"""
+    try:
+        if not data or not data.get('labels') or not data.get('values'):
+            return _placeholder_chart(width, height, "시간대 데이터 없음")
+
+        labels = data['labels']
+        values = data['values']
+
+        if not values or max(values) == 0:
+            return _placeholder_chart(width, height, "시간대 값 없음")
+
+        builder = _ChartBuilder(width, height)
+
+        # 차트 영역
+        chart_x = 60
+        chart_y = 40
+        chart_width = width - 120
+        chart_height = height - 80
+
+        # 축 그리기
+        builder.line(chart_x, chart_y, chart_x + chart_width, chart_y)  # X축
+        builder.line(chart_x, chart_y, chart_x, chart_y + chart_height)  # Y축
+
+        max_value = max(values)
+        point_width = chart_width / (len(values) - 1) if len(values) > 1 else chart_width
+        points = [
+            (chart_x + i * point_width, chart_y + (value / max_value) * chart_height)
+            for i, value in enumerate(values)
+        ]
+
+        # 라인 연결 (하나의 경로)
+        if len(points) > 1:
+            builder.polyline(points, stroke=BAR_COLOR, line_width=2)
+
+        for (x, y), label, value in zip(points, labels, values):
+            builder.rect(x-3, y-3, 6, 6, fill=BAR_COLOR, stroke=colors.black)
+            builder.text(x, chart_y - 15, label, font_size=9, anchor='middle')
+            builder.text(x, y + 10, value, font_size=9, anchor='middle')
+
+        # 제목
+        builder.text(width//2, height-20, "시간대별 활동", font_size=14, font_name="Helvetica-Bold", anchor='middle')
+
+        return builder.build()
+
+    except Exception as e:
+        print(f"❌ 스트림 라인 차트 생성 오류: {e}")
+        return _placeholder_chart(width, height, "라인차트 오류", fill=colors.pink, stroke=colors.red, font_size=12)
+
+if __name__ == "__main__":
+    # 테스트
+    test_data = {
+        'labels': ['Manufacturing', 'Generative AI', 'Retail/CPG', 'Finance'],
+        'values': [9, 7, 6, 6]
+    }
+
+    print("스트림 차트 생성 테스트 시작...")
+    bar_chart = create_stream_bar_chart(test_data)
+    pie_chart = create_stream_pie_chart(test_data)
+    line_chart = create_stream_line_chart({'labels': [14, 15, 16], 'values': [13, 11, 4]})
+    print("스트림 차트 생성 테스트 완료")
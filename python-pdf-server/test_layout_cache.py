@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+레이아웃 캐시 테스트 - 포크된 렌더링(PDF_RENDER_HARD_KILL=true)에서 채운 캐시가
+부모에 남아 다음 요청이 캐시를 쓰는지 확인
+
+실행: python -m pytest -q test_layout_cache.py (또는 python test_layout_cache.py)
+"""
+
+import layout_cache
+import metrics
+from advanced_korean_report import create_advanced_korean_report
+from render_deadline import DeadlinePolicy
+
+INSIGHTS = "레이아웃 캐시 테스트용 인사이트입니다.\n\n- 같은 문단은 두 번째 요청부터 캐시 사용"
+
+ANALYTICS_DATA = {
+    'totalVisitors': 3,
+    'totalPageViews': 40,
+    'totalContentViews': 7,
+    'period': '캐시 테스트',
+    'category': [
+        {'category': 'Manufacturing', 'count': 4},
+        {'category': 'Finance', 'count': 3}
+    ],
+    'content': [
+        {'title': '레이아웃 캐시 테스트 콘텐츠', 'views': 5}
+    ],
+    'time': [
+        {'hour': 10, 'count': 6},
+        {'hour': 11, 'count': 2}
+    ]
+}
+
+def _counter(name):
+    return metrics.snapshot()['counters'].get(name, 0)
+
+def test_second_forked_render_hits_layout_cache():
+    policy = DeadlinePolicy(max_seconds=120, kill_margin=5, hard_kill=True)
+
+    def render():
+        return create_advanced_korean_report(INSIGHTS, ANALYTICS_DATA)
+
+    assert policy.run(render, policy.deadline_for())
+    parsed = layout_cache.to_dict()['parsed']
+    misses = _counter('layout_cache.parse_misses')
+    hits = _counter('layout_cache.parse_hits')
+    assert parsed > 0, '포크된 렌더링이 채운 캐시가 부모에 없음'
+
+    assert policy.run(render, policy.deadline_for())
+    assert layout_cache.to_dict()['parsed'] == parsed
+    assert _counter('layout_cache.parse_misses') == misses
+    assert _counter('layout_cache.parse_hits') > hits
+
+if __name__ == '__main__':
+    test_second_forked_render_hits_layout_cache()
+    print("✅ 레이아웃 캐시 테스트 통과")
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+분산 추적 - W3C traceparent 전파 + OpenTelemetry(OTLP/JSON) 형식 span 내보내기
+
+- 들어온 traceparent(프록시가 만든 span)를 이어받아 요청 span과 단계별 자식 span
+  (parse, model, font, markdown, section, chart, build, merge, encode, admission.wait, render) 기록
+- 내보내기: PDF_TRACE_EXPORTER=otlp (collector OTLP/HTTP JSON) 또는 file (OTLP JSON 한 줄에 한 묶음)
+- 포크된 렌더링/섹션 프로세스는 span을 내보내지 않고 결과와 함께 부모로 돌려준다 (take_pending/adopt)
+- 비활성(기본)이거나 진행 중인 요청 span이 없으면 span()은 아무것도 기록하지 않음
+"""
+
+import atexit
+import json
+import os
+import random
+import secrets
+import tempfile
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+
+# OTLP SpanKind / StatusCode
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+_local = threading.local()
+
+class Span:
+    """진행 중인 span (끝나면 OTLP dict로 변환해 대기열에 넣음)"""
+
+    __slots__ = ('trace_id', 'span_id', 'parent_id', 'name', 'kind', 'sampled', 'start_ns', 'end_ns', 'attributes', 'error')
+
+    def __init__(self, trace_id, parent_id, name, kind, sampled, attributes):
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.sampled = sampled
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes)
+        self.error = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def traceparent(self):
+        """자식 요청에 넘길 traceparent 헤더 값"""
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def to_otlp(self):
+        span = {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': self.kind,
+            'startTimeUnixNano': str(self.start_ns),
+            'endTimeUnixNano': str(self.end_ns),
+            'attributes': [_attribute(key, value) for key, value in self.attributes.items() if value is not None],
+            'status': {'code': STATUS_ERROR, 'message': self.error} if self.error else {'code': STATUS_OK}
+        }
+        if self.parent_id:
+            span['parentSpanId'] = self.parent_id
+        return span
+
+def _attribute(key, value):
+    if isinstance(value, bool):
+        return {'key': key, 'value': {'boolValue': value}}
+    if isinstance(value, int):
+        return {'key': key, 'value': {'intValue': str(value)}}
+    if isinstance(value, float):
+        return {'key': key, 'value': {'doubleValue': value}}
+    return {'key': key, 'value': {'stringValue': str(value)}}
+
+def parse_traceparent(header):
+    """'00-<trace id 32자>-<parent id 16자>-<flags>' -> (trace_id, parent_id, sampled), 잘못되면 None"""
+    parts = (header or '').strip().lower().split('-')
+    if len(parts) < 4 or len(parts[0]) != 2 or parts[0] == 'ff':
+        return None
+    version, trace_id, parent_id, flags = parts[:4]
+    if len(trace_id) != 32 or len(parent_id) != 16 or len(flags) != 2:
+        return None
+    try:
+        int(trace_id, 16), int(parent_id, 16)
+        sampled = bool(int(flags, 16) & 1)
+    except ValueError:
+        return None
+    if trace_id == '0' * 32 or parent_id == '0' * 16:
+        return None
+    return trace_id, parent_id, sampled
+
+class FileExporter:
+    """OTLP JSON 묶음을 파일에 한 줄씩 추가 (collector의 otlpjsonfile 수신기 형식)"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, payload):
+        line = json.dumps(payload, ensure_ascii=False, separators=(',', ':')) + '\n'
+        with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line)
+
+    def describe(self):
+        return f'file:{self.path}'
+
+class OTLPHttpExporter:
+    """OTLP/HTTP JSON으로 collector에 전송"""
+
+    def __init__(self, endpoint, timeout):
+        self.endpoint = endpoint
+        self.timeout = timeout
+
+    def export(self, payload):
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(payload, separators=(',', ':')).encode('utf-8'),
+            headers={'Content-Type': 'application/json'},
+            method='POST'
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+    def describe(self):
+        return f'otlp:{self.endpoint}'
+
+class Tracer:
+    """span 생성/대기열/주기적 내보내기"""
+
+    # 대기열이 이 수를 넘으면 오래된 span부터 버림 (collector 장애 시 메모리 보호)
+    MAX_PENDING = 10000
+
+    def __init__(self, exporter, service_name, sample_ratio, flush_interval):
+        self.exporter = exporter
+        self.service_name = service_name
+        self.sample_ratio = sample_ratio
+        self.flush_interval = flush_interval
+        self.enabled = exporter is not None
+
+        self._pending = []
+        self._lock = threading.Lock()
+        self._flusher = None
+        # 포크된 자식은 내보내지 않고 부모로 돌려줌
+        self._exporting = True
+        self.exported = 0
+        self.dropped = 0
+
+        if self.enabled:
+            os.register_at_fork(after_in_child=self._after_fork_in_child)
+            atexit.register(self.flush)
+
+    @classmethod
+    def from_env(cls):
+        """환경 변수로 설정"""
+        kind = os.environ.get('PDF_TRACE_EXPORTER', 'none').lower()
+        if kind == 'file':
+            exporter = FileExporter(os.environ.get('PDF_TRACE_FILE') or os.path.join(tempfile.gettempdir(), 'pdf-server-traces.jsonl'))
+        elif kind == 'otlp':
+            exporter = OTLPHttpExporter(
+                os.environ.get('PDF_TRACE_OTLP_ENDPOINT', 'http://localhost:4318/v1/traces'),
+                float(os.environ.get('PDF_TRACE_EXPORT_TIMEOUT', 2))
+            )
+        else:
+            exporter = None
+        return cls(
+            exporter=exporter,
+            service_name=os.environ.get('PDF_TRACE_SERVICE_NAME', 'demo-factory-pdf-server'),
+            sample_ratio=float(os.environ.get('PDF_TRACE_SAMPLE_RATIO', 1.0)),
+            flush_interval=float(os.environ.get('PDF_TRACE_FLUSH_SECONDS', 2))
+        )
+
+    def _after_fork_in_child(self):
+        self._pending = []
+        self._lock = threading.Lock()
+        self._flusher = None
+        self._exporting = False
+
+    def start_span(self, name, parent=None, kind=SPAN_KIND_INTERNAL, traceparent=None, attributes=()):
+        """span 시작 (parent: 부모 Span, traceparent: 원격 부모 헤더 - 둘 다 없으면 새 trace)"""
+        if parent is not None:
+            return Span(parent.trace_id, parent.span_id, name, kind, parent.sampled, attributes)
+        remote = parse_traceparent(traceparent)
+        if remote is not None:
+            trace_id, parent_id, sampled = remote
+            return Span(trace_id, parent_id, name, kind, sampled, attributes)
+        return Span(secrets.token_hex(16), None, name, kind, random.random() < self.sample_ratio, attributes)
+
+    def end_span(self, span):
+        """span 종료 (여러 번 불러도 한 번만 기록)"""
+        if span is None or span.end_ns is not None:
+            return
+        span.end_ns = time.time_ns()
+        if span.sampled:
+            self._enqueue([span.to_otlp()])
+
+    def _enqueue(self, spans):
+        with self._lock:
+            self._pending.extend(spans)
+            overflow = len(self._pending) - self.MAX_PENDING
+            if overflow > 0:
+                del self._pending[:overflow]
+                self.dropped += overflow
+            if self._exporting and self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, name='trace-exporter', daemon=True)
+                self._flusher.start()
+
+    def take_pending(self):
+        """아직 내보내지 않은 span(OTLP dict) 꺼내기 - 포크된 자식이 부모로 돌려줄 때"""
+        if not self.enabled:
+            return []
+        with self._lock:
+            spans, self._pending = self._pending, []
+        return spans
+
+    def adopt(self, spans):
+        """자식 프로세스에서 돌려받은 span을 대기열에 추가"""
+        if spans:
+            self._enqueue(spans)
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def flush(self):
+        """대기 중인 span 내보내기 (실패하면 버림)"""
+        if not self._exporting:
+            return
+        spans = self.take_pending()
+        if not spans:
+            return
+        try:
+            self.exporter.export({
+                'resourceSpans': [{
+                    'resource': {'attributes': [_attribute('service.name', self.service_name)]},
+                    'scopeSpans': [{'scope': {'name': 'python-pdf-server'}, 'spans': spans}]
+                }]
+            })
+            self.exported += len(spans)
+        except Exception as e:
+            self.dropped += len(spans)
+            print(f"⚠️ 추적 span 내보내기 실패 ({len(spans)}개 버림): {e}")
+
+    def to_dict(self):
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            'enabled': self.enabled,
+            'exporter': self.exporter.describe() if self.exporter else None,
+            'sample_ratio': self.sample_ratio,
+            'pending': pending,
+            'exported': self.exported,
+            'dropped': self.dropped
+        }
+
+# 프로세스 전체에서 공유
+tracer = Tracer.from_env()
+
+def current_span():
+    """현재 스레드에서 진행 중인 span"""
+    return getattr(_local, 'span', None)
+
+def start_request_span(name, traceparent=None, attributes=()):
+    """요청 span 시작 후 현재 스레드의 span으로 설정 (비활성이면 None)"""
+    if not tracer.enabled:
+        return None
+    span = tracer.start_span(name, kind=SPAN_KIND_SERVER, traceparent=traceparent, attributes=attributes)
+    _local.span = span
+    return span
+
+def detach_request_span():
+    """요청 처리가 끝난 스레드에서 현재 span 해제 (종료는 finish_request_span)"""
+    _local.span = None
+
+def finish_request_span(span, status_code=None, error=None):
+    """요청 span 종료 (응답 전송이 끝난 뒤 다른 스레드에서 불려도 됨)"""
+    if span is None:
+        return
+    if status_code is not None:
+        span.set_attribute('http.status_code', status_code)
+        if status_code >= 500:
+            span.error = f'HTTP {status_code}'
+    if error is not None:
+        span.error = f'{type(error).__name__}: {error}'
+    tracer.end_span(span)
+
+@contextmanager
+def span(name, **attributes):
+    """현재 span의 자식 span (진행 중인 요청 span이 없으면 기록하지 않음)"""
+    parent = current_span()
+    if parent is None:
+        yield None
+        return
+
+    child = tracer.start_span(name, parent=parent, attributes=attributes)
+    _local.span = child
+    try:
+        yield child
+    except BaseException as e:
+        child.error = f'{type(e).__name__}: {e}'
+        raise
+    finally:
+        _local.span = parent
+        tracer.end_span(child)
+
+def start_span(name, **attributes):
+    """현재 span을 바꾸지 않는 자식 span 시작 (end_span으로 종료, 구간이 with 블록과 맞지 않을 때)"""
+    parent = current_span()
+    if parent is None:
+        return None
+    return tracer.start_span(name, parent=parent, attributes=attributes)
+
+def end_span(span):
+    tracer.end_span(span)
+
+def take_pending():
+    return tracer.take_pending()
+
+def adopt(spans):
+    tracer.adopt(spans)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+서버 워밍업 - 지연 import, 폰트 파싱, ReportLab 내부 캐시를 첫 요청 전에 채운다
+"""
+
+import threading
+import time
+from datetime import datetime
+
+from advanced_korean_report import CHART_BACKENDS, create_advanced_korean_report, prerender_static_pages
+
+WARMUP_INSIGHTS = "워밍업용 대표 리포트입니다."
+
+WARMUP_ANALYTICS_DATA = {
+    'totalVisitors': 10,
+    'totalPageViews': 120,
+    'totalContentViews': 30,
+    'period': '워밍업',
+    'category': [
+        {'category': 'Manufacturing', 'count': 9},
+        {'category': 'Generative AI', 'count': 7},
+        {'category': 'Retail/CPG', 'count': 6},
+        {'category': 'Finance', 'count': 6}
+    ],
+    'content': [
+        {'title': 'AWS 제조업 솔루션 종합 가이드', 'views': 6},
+        {'title': 'Generative AI 실무 적용 사례', 'views': 3}
+    ],
+    'time': [
+        {'hour': 14, 'count': 13},
+        {'hour': 15, 'count': 11},
+        {'hour': 16, 'count': 4}
+    ]
+}
+
+def _warm_korean_pdf_generator():
+    # matplotlib/pandas import 비용까지 워밍업에 포함되도록 단계 안에서 import
+    from pdf_generator import generate_korean_pdf_report
+    return generate_korean_pdf_report(WARMUP_INSIGHTS, WARMUP_ANALYTICS_DATA)
+
+def _warm_enhanced_report():
+    from enhanced_report_generator import create_enhanced_korean_report
+    return create_enhanced_korean_report(WARMUP_INSIGHTS, WARMUP_ANALYTICS_DATA)
+
+def _warm_professional_report():
+    from professional_report_generator import create_professional_report
+    return create_professional_report(WARMUP_INSIGHTS, WARMUP_ANALYTICS_DATA)
+
+class WarmupState:
+    """워커 하나의 워밍업 진행 상태"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = None
+        self.finished_at = None
+        self.timings = {}
+        self.errors = {}
+
+    @property
+    def ready(self):
+        return self.finished_at is not None
+
+    def start(self):
+        """백그라운드 스레드에서 워밍업 시작 (한 번만)"""
+        with self._lock:
+            if self.started_at is not None:
+                return False
+            self.started_at = datetime.now()
+
+        threading.Thread(target=self._run, name='pdf-warmup', daemon=True).start()
+        return True
+
+    def _run(self):
+        print("🔥 워밍업 시작...")
+        steps = [('static_pages', prerender_static_pages)]
+        for backend in CHART_BACKENDS:
+            steps.append((f'advanced_report:{backend}',
+                          lambda backend=backend: create_advanced_korean_report(WARMUP_INSIGHTS, WARMUP_ANALYTICS_DATA, backend)))
+        # 나머지 생성기도 대표 리포트 한 번씩 (첫 실제 호출이 콜드 스타트 비용을 내지 않도록)
+        steps += [
+            ('korean_pdf_generator', _warm_korean_pdf_generator),
+            ('enhanced_report', _warm_enhanced_report),
+            ('professional_report', _warm_professional_report)
+        ]
+
+        for name, step in steps:
+            start = time.perf_counter()
+            try:
+                if step() is None:
+                    self.errors[name] = '결과 없음'
+            except Exception as e:
+                self.errors[name] = str(e)
+                print(f"⚠️ 워밍업 단계 실패 ({name}): {e}")
+            self.timings[name] = round((time.perf_counter() - start) * 1000, 1)
+
+        self.finished_at = datetime.now()
+        total = sum(self.timings.values())
+        print(f"✅ 워밍업 완료: {total:.1f}ms {self.timings}")
+
+    def to_dict(self):
+        return {
+            'ready': self.ready,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'timings_ms': dict(self.timings),
+            'errors': dict(self.errors)
+        }
@@ -72,6 +72,26 @@ async function createS3Bucket() {
     await s3.putBucketVersioning(versioningParams).promise();
     console.log('✅ S3 버전 관리 활성화 완료');
 
+    // PDF 서버가 오프로드한 리포트는 임시 파일 - 하루 뒤 만료, 중단된 멀티파트 업로드 정리
+    const lifecycleParams = {
+      Bucket: S3_BUCKET,
+      LifecycleConfiguration: {
+        Rules: [
+          {
+            ID: 'expire-pdf-reports',
+            Filter: { Prefix: process.env.PDF_S3_PREFIX || 'reports/' },
+            Status: 'Enabled',
+            Expiration: { Days: 1 },
+            NoncurrentVersionExpiration: { NoncurrentDays: 1 },
+            AbortIncompleteMultipartUpload: { DaysAfterInitiation: 1 }
+          }
+        ]
+      }
+    };
+
+    await s3.putBucketLifecycleConfiguration(lifecycleParams).promise();
+    console.log('✅ S3 리포트 수명 주기 설정 완료');
+
   } catch (error) {
     console.error('❌ S3 버킷 생성 실패:', error.message);
     throw error;
@@ -1,9 +1,12 @@
 #!/usr/bin/env node
 
 const http = require('http');
+const https = require('https');
 const fs = require('fs');
+const os = require('os');
 const path = require('path');
 const url = require('url');
+const crypto = require('crypto');
 
 const PORT = process.env.PORT || 3000;
 const BUILD_DIR = path.join(__dirname, 'build');
@@ -21,6 +24,103 @@ const mimeTypes = {
   '.ico': 'image/x-icon'
 };
 
+// 분산 추적 - 프록시 구간 span 기록 + 백엔드로 traceparent 전파 (TRACE_EXPORTER=otlp|file, 기본 비활성)
+// span은 OpenTelemetry OTLP/JSON 형식으로 collector에 보내거나 파일에 한 줄씩 추가
+const TRACE_EXPORTER = (process.env.TRACE_EXPORTER || 'none').toLowerCase();
+const TRACE_FILE = process.env.TRACE_FILE || path.join(os.tmpdir(), 'static-server-traces.jsonl');
+const TRACE_OTLP_ENDPOINT = process.env.TRACE_OTLP_ENDPOINT || 'http://localhost:4318/v1/traces';
+const TRACE_SERVICE_NAME = process.env.TRACE_SERVICE_NAME || 'demo-factory-static-server';
+const TRACE_FLUSH_MS = 2000;
+const TRACEPARENT_PATTERN = /^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$/;
+
+let pendingSpans = [];
+
+// 들어온 traceparent를 이어받아 (없으면 새 trace) 프록시 span 시작
+const startProxySpan = (req, targetPort, targetPath) => {
+  if (TRACE_EXPORTER === 'none') return null;
+  const match = TRACEPARENT_PATTERN.exec((req.headers.traceparent || '').trim().toLowerCase());
+  const valid = match && !/^0+$/.test(match[1]) && !/^0+$/.test(match[2]);
+  return {
+    traceId: valid ? match[1] : crypto.randomBytes(16).toString('hex'),
+    spanId: crypto.randomBytes(8).toString('hex'),
+    parentSpanId: valid ? match[2] : undefined,
+    flags: valid ? match[3] : '01',
+    name: `${req.method} proxy :${targetPort}`,
+    startUnixNano: BigInt(Date.now()) * 1000000n,
+    startHrtime: process.hrtime.bigint(),
+    attributes: {
+      'http.method': req.method,
+      'http.target': req.url,
+      'proxy.target': `localhost:${targetPort}${targetPath}`
+    }
+  };
+};
+
+const traceparentFor = (span) => `00-${span.traceId}-${span.spanId}-${span.flags}`;
+
+const endProxySpan = (span, statusCode, errorMessage) => {
+  if (!span || span.ended) return;
+  span.ended = true;
+  if (!(parseInt(span.flags, 16) & 1)) return;
+
+  const endUnixNano = span.startUnixNano + (process.hrtime.bigint() - span.startHrtime);
+  const attributes = { ...span.attributes, 'http.status_code': statusCode };
+  const failed = errorMessage || statusCode >= 500;
+  pendingSpans.push({
+    traceId: span.traceId,
+    spanId: span.spanId,
+    ...(span.parentSpanId ? { parentSpanId: span.parentSpanId } : {}),
+    name: span.name,
+    kind: 3, // CLIENT (백엔드 호출)
+    startTimeUnixNano: span.startUnixNano.toString(),
+    endTimeUnixNano: endUnixNano.toString(),
+    attributes: Object.entries(attributes).map(([key, value]) => (
+      typeof value === 'number'
+        ? { key, value: { intValue: String(value) } }
+        : { key, value: { stringValue: String(value) } }
+    )),
+    status: failed ? { code: 2, message: errorMessage || `HTTP ${statusCode}` } : { code: 1 }
+  });
+};
+
+const flushSpans = () => {
+  if (pendingSpans.length === 0) return;
+  const spans = pendingSpans;
+  pendingSpans = [];
+  const body = JSON.stringify({
+    resourceSpans: [{
+      resource: { attributes: [{ key: 'service.name', value: { stringValue: TRACE_SERVICE_NAME } }] },
+      scopeSpans: [{ scope: { name: 'simple-static-server' }, spans }]
+    }]
+  });
+
+  if (TRACE_EXPORTER === 'file') {
+    try {
+      fs.appendFileSync(TRACE_FILE, body + '\n');
+    } catch (err) {
+      console.warn(`⚠️ [Trace] span 파일 기록 실패 (${spans.length}개 버림):`, err.message);
+    }
+    return;
+  }
+
+  const endpoint = new URL(TRACE_OTLP_ENDPOINT);
+  const exportReq = (endpoint.protocol === 'https:' ? https : http).request(endpoint, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json', 'Content-Length': Buffer.byteLength(body) },
+    timeout: 2000
+  }, (exportRes) => exportRes.resume());
+  exportReq.on('timeout', () => exportReq.destroy(new Error('timeout')));
+  exportReq.on('error', (err) => {
+    console.warn(`⚠️ [Trace] span 전송 실패 (${spans.length}개 버림):`, err.message);
+  });
+  exportReq.end(body);
+};
+
+if (TRACE_EXPORTER !== 'none') {
+  setInterval(flushSpans, TRACE_FLUSH_MS).unref();
+  console.log(`🔭 분산 추적 활성화: ${TRACE_EXPORTER === 'file' ? TRACE_FILE : TRACE_OTLP_ENDPOINT}`);
+}
+
 // 범용 프록시 함수
 const proxyToPort = (req, res, targetPort, pathPrefix = null) => {
   // 경로 변환: /api/prefix를 제거하여 백엔드 서버로 전달
@@ -39,7 +139,7 @@ const proxyToPort = (req, res, targetPort, pathPrefix = null) => {
     console.log(`✅ [Proxy] OPTIONS 요청 처리: ${req.headers.origin}`);
     res.setHeader('Access-Control-Allow-Origin', req.headers.origin || '*');
     res.setHeader('Access-Control-Allow-Methods', 'GET, POST, PUT, DELETE, OPTIONS, PATCH');
-    res.setHeader('Access-Control-Allow-Headers', 'Content-Type, Authorization, X-Requested-With, Accept, Origin, Cache-Control, X-File-Name');
+    res.setHeader('Access-Control-Allow-Headers', 'Content-Type, Authorization, X-Requested-With, Accept, Origin, Cache-Control, X-File-Name, If-None-Match, Content-Encoding, traceparent, tracestate');
     res.setHeader('Access-Control-Allow-Credentials', 'true');
     res.setHeader('Access-Control-Max-Age', '86400');
     res.writeHead(200);
@@ -47,23 +147,33 @@ const proxyToPort = (req, res, targetPort, pathPrefix = null) => {
     return;
   }
   
+  // 프록시 구간 span (백엔드는 traceparent로 이 span의 자식이 됨)
+  const span = startProxySpan(req, targetPort, targetPath);
+  
   const options = {
     hostname: 'localhost',
     port: targetPort,
     path: targetPath,
     method: req.method,
-    headers: req.headers
+    headers: span ? { ...req.headers, traceparent: traceparentFor(span) } : req.headers
   };
   
   const proxyReq = http.request(options, (proxyRes) => {
     console.log(`✅ [Proxy] 백엔드 응답: ${proxyRes.statusCode} ${req.url} (port ${targetPort})`);
     
+    // 응답 전송이 끝나야 span 종료 (큰 PDF 응답 전달 시간 포함)
+    if (span) {
+      res.on('finish', () => endProxySpan(span, proxyRes.statusCode));
+      res.on('close', () => endProxySpan(span, proxyRes.statusCode, res.writableFinished ? undefined : 'client closed'));
+    }
+    
     // CORS 헤더 추가 (백엔드 응답 헤더와 병합)
     const responseHeaders = { ...proxyRes.headers };
     responseHeaders['Access-Control-Allow-Origin'] = req.headers.origin || '*';
     responseHeaders['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS, PATCH';
-    responseHeaders['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, X-Requested-With, Accept, Origin, Cache-Control, X-File-Name';
+    responseHeaders['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, X-Requested-With, Accept, Origin, Cache-Control, X-File-Name, If-None-Match, Content-Encoding, traceparent, tracestate';
     responseHeaders['Access-Control-Allow-Credentials'] = 'true';
+    responseHeaders['Access-Control-Expose-Headers'] = 'ETag, X-Report-Quality, traceresponse';
     
     res.writeHead(proxyRes.statusCode, responseHeaders);
     proxyRes.pipe(res);
@@ -72,6 +182,7 @@ const proxyToPort = (req, res, targetPort, pathPrefix = null) => {
   proxyReq.on('error', (err) => {
     console.error(`❌ [Proxy] 백엔드 API 오류 (${req.url} -> :${targetPort}):`, err.message);
     console.error(`❌ [Proxy] 백엔드 서버 상태 확인 필요: localhost:${targetPort}`);
+    endProxySpan(span, 500, err.message);
     
     // CORS 헤더 설정
     res.setHeader('Access-Control-Allow-Origin', req.headers.origin || '*');
@@ -111,7 +222,7 @@ const server = http.createServer((req, res) => {
   res.setHeader('Access-Control-Allow-Origin', req.headers.origin || '*');
   res.setHeader('Access-Control-Allow-Credentials', 'true');
   res.setHeader('Access-Control-Allow-Methods', 'GET, POST, PUT, DELETE, OPTIONS, PATCH');
-  res.setHeader('Access-Control-Allow-Headers', 'Content-Type, Authorization, X-Requested-With, Accept, Origin, Cache-Control, X-File-Name');
+  res.setHeader('Access-Control-Allow-Headers', 'Content-Type, Authorization, X-Requested-With, Accept, Origin, Cache-Control, X-File-Name, If-None-Match, Content-Encoding, traceparent, tracestate');
   
   const parsedUrl = url.parse(req.url);
   let pathname = parsedUrl.pathname;
@@ -186,6 +297,7 @@ server.listen(PORT, '0.0.0.0', () => {
 // 프로세스 종료 처리
 process.on('SIGTERM', () => {
   console.log('🛑 Server shutting down...');
+  flushSpans();
   server.close(() => {
     process.exit(0);
   });
@@ -193,6 +305,7 @@ process.on('SIGTERM', () => {
 
 process.on('SIGINT', () => {
   console.log('🛑 Server shutting down...');
+  flushSpans();
   server.close(() => {
     process.exit(0);
   });
@@ -34,29 +34,59 @@ export const checkPythonPdfServerStatus = async () => {
   }
 };
 
+// 이 크기 이상의 요청 본문만 gzip 압축
+const REQUEST_COMPRESSION_MIN_BYTES = 1024;
+
+/**
+ * 큰 JSON 요청 본문을 gzip으로 압축 (CompressionStream 미지원 브라우저는 그대로 전송)
+ * @param {string} json - 직렬화된 요청 본문
+ * @returns {Promise<{body: (string|ArrayBuffer), encoding: (string|null)}>}
+ */
+const compressRequestBody = async (json) => {
+  if (typeof CompressionStream === 'undefined' || json.length < REQUEST_COMPRESSION_MIN_BYTES) {
+    return { body: json, encoding: null };
+  }
+  
+  try {
+    const stream = new Blob([json]).stream().pipeThrough(new CompressionStream('gzip'));
+    const body = await new Response(stream).arrayBuffer();
+    return { body, encoding: 'gzip' };
+  } catch (error) {
+    console.warn('⚠️ 요청 본문 압축 실패, 원본 전송:', error);
+    return { body: json, encoding: null };
+  }
+};
+
 /**
  * AI 기반 한글 PDF 리포트 생성
  * @param {string} aiInsights - AI가 생성한 한글 인사이트
  * @param {Object} analyticsData - 분석 데이터
  * @param {string} reportType - 리포트 타입 (full, content, author)
+ * @param {string} delivery - 'inline' (응답에 PDF 포함) 또는 'url' (저장소 다운로드 URL)
+ * @param {string} quality - 'draft' / 'standard' / 'full' (서버 부하가 높으면 낮아질 수 있음, 결과의 quality 참고)
  * @returns {Promise<Object>} - 생성 결과
  */
-export const generateKoreanPdfReport = async (aiInsights, analyticsData, reportType = 'full') => {
+export const generateKoreanPdfReport = async (aiInsights, analyticsData, reportType = 'full', delivery = 'inline', quality = 'full') => {
   try {
     console.log('📄 한글 PDF 리포트 생성 요청...');
     console.log('🤖 AI 인사이트 길이:', aiInsights.length);
     console.log('📊 분석 데이터:', Object.keys(analyticsData));
     
+    const { body, encoding } = await compressRequestBody(JSON.stringify({
+      aiInsights,
+      analyticsData,
+      reportType,
+      delivery,
+      quality
+    }));
+    
     const response = await fetch(`${PYTHON_PDF_API_BASE_URL}/generate-pdf`, {
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
+        ...(encoding ? { 'Content-Encoding': encoding } : {})
       },
-      body: JSON.stringify({
-        aiInsights,
-        analyticsData,
-        reportType
-      })
+      body
     });
 
     if (!response.ok) {
@@ -73,6 +103,9 @@ export const generateKoreanPdfReport = async (aiInsights, analyticsData, reportT
     console.log('✅ 한글 PDF 생성 성공');
     console.log('📄 파일명:', result.filename);
     console.log('📊 파일 크기:', (result.size / 1024).toFixed(2), 'KB');
+    if (result.degraded) {
+      console.warn(`⚠️ 서버 부하로 리포트 품질 하향: ${result.requested_quality} -> ${result.quality}`);
+    }
     
     return result;
   } catch (error) {
@@ -81,6 +114,42 @@ export const generateKoreanPdfReport = async (aiInsights, analyticsData, reportT
   }
 };
 
+/**
+ * 리포트 지표/등급/순위만 조회 (PDF 렌더링 없이 대시보드 표시용)
+ * @param {Object} analyticsData - 분석 데이터
+ * @returns {Promise<Object>} - 리포트 모델 (summary, categories, content, time)
+ */
+export const fetchReportModel = async (analyticsData) => {
+  const response = await fetch(`${PYTHON_PDF_API_BASE_URL}/report-model`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ analyticsData })
+  });
+
+  const result = await response.json();
+  if (!response.ok || !result.success) {
+    throw new Error(result.error || `HTTP error! status: ${response.status}`);
+  }
+
+  return result.model;
+};
+
+/**
+ * 저장소 다운로드 URL로 PDF 다운로드 (presigned URL 또는 CloudFront)
+ * @param {string} downloadUrl - 다운로드 URL
+ * @param {string} filename - 파일명
+ */
+export const downloadPdfFromUrl = (downloadUrl, filename) => {
+  const link = document.createElement('a');
+  link.href = downloadUrl;
+  link.download = filename;
+  document.body.appendChild(link);
+  link.click();
+  document.body.removeChild(link);
+  
+  console.log('✅ PDF 다운로드 시작:', filename);
+};
+
 /**
  * Base64 PDF 데이터를 파일로 다운로드
  * @param {string} pdfBase64 - Base64 인코딩된 PDF 데이터
@@ -286,8 +355,12 @@ export const generateAndDownloadAIReport = async (analyticsData, aiInsights) =>
     // PDF 생성
     const result = await generateKoreanPdfReport(aiInsights, pythonData, 'full');
     
-    // 다운로드
-    downloadPdfFromBase64(result.pdf_data, result.filename);
+    // 다운로드 (서버가 저장소로 오프로드했으면 URL에서 직접)
+    if (result.download_url) {
+      downloadPdfFromUrl(result.download_url, result.filename);
+    } else {
+      downloadPdfFromBase64(result.pdf_data, result.filename);
+    }
     
     return true;
   } catch (error) {
@@ -299,7 +372,9 @@ export const generateAndDownloadAIReport = async (analyticsData, aiInsights) =>
 export default {
   checkPythonPdfServerStatus,
   generateKoreanPdfReport,
+  fetchReportModel,
   downloadPdfFromBase64,
+  downloadPdfFromUrl,
   prepareChartDataForPython,
   generateAndDownloadAIReport
 };
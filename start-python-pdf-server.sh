@@ -33,8 +33,13 @@ fi
 echo "🚀 Python PDF 서버 시작 중..."
 cd python-pdf-server
 
-# 백그라운드에서 서버 실행
-python3 app.py &
+# 백그라운드에서 서버 실행 (PDF_SERVER_MODE=asgi면 uvicorn ASGI 진입점 사용)
+if [ "$PDF_SERVER_MODE" = "asgi" ]; then
+    echo "⚡ ASGI 모드 (uvicorn)"
+    python3 asgi_app.py &
+else
+    python3 app.py &
+fi
 
 # 서버 PID 저장
 PYTHON_PID=$!